@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+JSON codec benchmark on Sitefinity-shaped OData payloads
+
+Builds "value" collections of news items (HTML content, GUIDs, dates, taxonomy
+arrays) and times, for every codec installed:
+- decoding the upstream response body (what make_request does)
+- encoding the decoded collection (what the FastAPI response class does)
+
+Usage:
+    python benchmarks/bench_codec.py [--items 100 1000 10000] [--runs 7]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tahubu_sf.utils.codec import available_codecs, get_codec
+
+PARAGRAPH = (
+    "<p>Sitefinity makes it easy to publish <strong>news</strong>, events and "
+    "<a href=\"https://www.example.com/blog\">blog posts</a> across sites &amp; languages.</p>"
+)
+
+def news_item(rng: random.Random) -> dict:
+    """One news item with the properties the OData content API returns"""
+    title = f"Quarterly update {rng.randint(1, 99999)}"
+    return {
+        "Id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "LastModified": "2024-05-01T10:15:30.123Z",
+        "PublicationDate": "2024-04-30T08:00:00Z",
+        "DateCreated": "2024-04-29T16:45:12.5Z",
+        "UrlName": title.lower().replace(" ", "-"),
+        "Title": title,
+        "Summary": "A short summary of the update with a few details about what changed.",
+        "Content": PARAGRAPH * rng.randint(3, 12),
+        "Author": "Communications Team",
+        "SourceName": "",
+        "AllowComments": rng.random() < 0.5,
+        "IncludeInSitemap": True,
+        "ViewsCount": rng.randint(0, 100000),
+        "Tags": [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(rng.randint(0, 4))],
+        "Category": [str(uuid.UUID(int=rng.getrandbits(128)))],
+        "ItemDefaultUrl": f"/{title.lower().replace(' ', '-')}",
+        "Provider": "OpenAccessDataProvider",
+    }
+
+def collection(items: int) -> dict:
+    rng = random.Random(items)
+    return {
+        "@odata.context": "https://www.example.com/api/default/$metadata#newsitems",
+        "@odata.count": items,
+        "value": [news_item(rng) for _ in range(items)],
+    }
+
+def best_ms(func, runs: int) -> float:
+    """Median of `runs` timings of func(), in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs on OData payloads")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000], help="Collection sizes")
+    parser.add_argument("--runs", type=int, default=7, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    codecs = [get_codec(name) for name in available_codecs()]
+    baseline = get_codec("json")
+    print(f"Codecs: {', '.join(c.name for c in codecs)}")
+
+    for items in args.items:
+        payload = collection(items)
+        body = baseline.dumps(payload)
+        print(f"\n{items} items, {len(body) / 1024 / 1024:.2f} MiB")
+        print(f"{'codec':<10}{'decode ms':>12}{'encode ms':>12}{'decode x':>10}{'encode x':>10}")
+
+        stdlib_decode = best_ms(lambda: baseline.loads(body), args.runs)
+        stdlib_encode = best_ms(lambda: baseline.dumps(payload), args.runs)
+        for codec in codecs:
+            if codec.loads(body) != payload:
+                raise RuntimeError(f"{codec.name} did not round-trip the payload")
+            decode = best_ms(lambda: codec.loads(body), args.runs)
+            encode = best_ms(lambda: codec.dumps(payload), args.runs)
+            print(f"{codec.name:<10}{decode:>12.2f}{encode:>12.2f}"
+                  f"{stdlib_decode / decode:>10.1f}{stdlib_encode / encode:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Bytes-on-wire benchmark for the supported content encodings
+
+Compares, for every encoding installed, the size and compression time of:
+- the upstream OData response body (what Sitefinity sends with Accept-Encoding)
+- the JSON records a listing tool returns (what the FastAPI and FastMCP HTTP
+  transports send through CompressionMiddleware)
+
+Usage:
+    python benchmarks/bench_compression.py [--items 100 1000 10000] [--runs 7]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_codec import best_ms, collection
+from tahubu_sf.models import NewsItem
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.compression import available_encodings, compress
+
+def report(label: str, body: bytes, runs: int) -> None:
+    print(f"\n{label}")
+    print(f"{'encoding':<10}{'bytes':>12}{'ratio':>8}{'compress ms':>14}")
+    print(f"{'identity':<10}{len(body):>12}{1:>8.1f}{0:>14.2f}")
+    for encoding in available_encodings():
+        compressed = compress(body, encoding)
+        elapsed = best_ms(lambda: compress(body, encoding), runs)
+        print(f"{encoding:<10}{len(compressed):>12}{len(body) / len(compressed):>8.1f}{elapsed:>14.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression on OData payloads")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000], help="Collection sizes")
+    parser.add_argument("--runs", type=int, default=7, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    print(f"Encodings: {', '.join(available_encodings())}")
+    for items in args.items:
+        payload = collection(items)
+        upstream = codec.dumps(payload)
+        records = codec.dumps([NewsItem.from_odata(item).to_dict() for item in payload["value"]])
+        report(f"{items} items, upstream OData body", upstream, args.runs)
+        report(f"{items} items, get_news JSON result", records, args.runs)
+
+if __name__ == "__main__":
+    main()
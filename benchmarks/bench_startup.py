@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Startup benchmark for the STDIO MCP server
+
+Measures, in fresh interpreter processes:
+- import time of tahubu_sf.app plus create_app() (what run.py does before serving)
+- the extra time eager registration would cost by importing every tool module
+- time from spawning `python run.py` to receiving the MCP initialize response
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE_APP = (
+    "import time; t = time.perf_counter(); "
+    "from tahubu_sf.app import create_app; create_app(); "
+    "print((time.perf_counter() - t) * 1000)"
+)
+EAGER_TOOLS = (
+    "import time; from tahubu_sf.app import create_app; create_app(); "
+    "from tahubu_sf.catalog import TOOL_TARGETS, load_tool; t = time.perf_counter(); "
+    "[load_tool(target) for target in TOOL_TARGETS]; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "1.0"},
+    },
+}
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("SITEFINITY_SITE_PREFIX", "http://sitefinity.test")
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+def time_snippet(code: str) -> float:
+    """Run a snippet in a fresh interpreter and return the milliseconds it prints"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=PROJECT_ROOT, env=_env(),
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def time_handshake() -> float:
+    """Spawn run.py and return milliseconds until the initialize response arrives"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "run.py"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT, env=_env(), text=True,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE) + "\n")
+        process.stdin.flush()
+        line = process.stdout.readline()
+        elapsed = (time.perf_counter() - started) * 1000
+        if '"result"' not in line:
+            raise RuntimeError(f"Unexpected initialize response: {line!r}")
+        return elapsed
+    finally:
+        process.kill()
+        process.wait()
+
+def summarize(label: str, samples) -> None:
+    print(f"{label:<40} median {statistics.median(samples):8.1f} ms   "
+          f"min {min(samples):8.1f} ms   max {max(samples):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STDIO server startup")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes per measurement")
+    args = parser.parse_args()
+
+    summarize("import + create_app (lazy tools)", [time_snippet(CREATE_APP) for _ in range(args.runs)])
+    summarize("importing all tool modules (saved)", [time_snippet(EAGER_TOOLS) for _ in range(args.runs)])
+    summarize("spawn run.py -> initialize response", [time_handshake() for _ in range(args.runs)])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+"""
+Per-tool benchmark suite with stored baselines and a regression gate
+
+Calls every tool registered by tahubu_sf.app.create_app through an in-memory MCP
+client, against mock_sitefinity served in process, at several collection sizes.
+Each size runs in a fresh interpreter so peak RSS is per size. For every tool it
+records the latency distribution over --runs calls and the peak traced
+allocation of one call. Both include the mock's own work, which is the same
+from run to run, so differences against the baseline come from the tools.
+
+Usage:
+    python benchmarks/bench_tools.py run [--sizes small medium large] [--runs 20] [--repeat 1] [--output results.json]
+    python benchmarks/bench_tools.py compare results.json [--baseline benchmarks/baselines/tools.json] [--threshold 0.25]
+    python benchmarks/bench_tools.py run --update-baseline
+
+`compare` (and `run --compare`) exits with status 1 when a tool's fastest call or
+peak allocation regressed by more than the threshold relative to the baseline.
+The fastest call is gated rather than the median because background load only
+ever adds time, which makes it the most repeatable latency figure. For the same
+reason `run --compare` re-measures a size whose latency looks regressed (up to
+--confirm times) and keeps each tool's fastest call across the attempts before
+reporting it.
+"""
+import argparse
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+BASELINE_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "baselines", "tools.json")
+
+# Items per collection for each size label
+SIZES = {"small": 10, "medium": 200, "large": 2000}
+
+# Collection holding the parent items each create tool needs
+CREATE_PARENTS = {
+    "create_blog_post": "blogs",
+    "create_list_item": "lists",
+    "create_event": "calendars",
+    "create_image": "albums",
+    "create_document": "documentlibraries",
+    "create_video": "videolibraries",
+}
+
+# Numbers the titles of created items, which must be unique to pass pre-flight checks
+_titles = itertools.count(1)
+
+# Latency differences below this many milliseconds are treated as noise
+LATENCY_SLACK_MS = 1.0
+# Allocation differences below this many KiB are treated as noise
+ALLOCATION_SLACK_KIB = 64
+
+def tool_arguments(tool, store) -> dict:
+    """Arguments for one benchmark call of a catalog tool; titles differ from call to call"""
+    arguments = {}
+    for param in tool.parameters:
+        if param.default is not inspect.Parameter.empty:
+            continue
+        name = param.name
+        if name == "parent_id":
+            arguments[name] = store.items(CREATE_PARENTS[tool.name])[0]["Id"]
+        elif name == "post_id":
+            arguments[name] = store.items("blogposts")[0]["Id"]
+        elif name in ("eventstart", "eventend"):
+            arguments[name] = "2024-06-01T09:00:00Z" if name == "eventstart" else "2024-06-01T17:00:00Z"
+        elif name == "content":
+            arguments[name] = "<p>Benchmark content</p>" * 20
+        elif name == "title":
+            arguments[name] = f"Benchmark title {next(_titles)}"
+        elif name == "content_type":
+            arguments[name] = "newsitems"
+        elif name == "fields":
+            arguments[name] = {"Title": f"Benchmark title {next(_titles)}"}
+        else:
+            arguments[name] = f"Benchmark {name}"
+    return arguments
+
+def calibrate(runs: int) -> float:
+    """
+    Time a fixed CPU-bound workload, in milliseconds.
+
+    Latencies are compared after scaling by the ratio of the run's and the
+    baseline's calibration, so a slower or busier machine is not reported as a
+    regression.
+    """
+    payload = [{"Title": f"Item {i}", "Content": "<p>text</p>" * 20, "Tags": list(range(10))} for i in range(500)]
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        json.loads(json.dumps(payload))
+        sorted(str(item) for item in payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+async def measure_size(items: int, runs: int) -> dict:
+    """Benchmark every tool against a mock holding `items` items per collection"""
+    # Requests never leave the process, but the settings need a site to rebase onto
+    os.environ["SITEFINITY_SITE_PREFIX"] = "http://mock-sitefinity.local"
+
+    import httpx
+    from fastmcp import Client
+
+    from mock_sitefinity import MockConfig, create_app as create_mock
+    from tahubu_sf.app import create_app
+    from tahubu_sf.catalog import load_catalog
+    from tahubu_sf.config import settings
+    from tahubu_sf.utils import http
+
+    mock = create_mock(MockConfig(
+        items=items,
+        frontend_path=settings.SITEFINITY_FRONTEND_API_PATH,
+        backend_path=settings.SITEFINITY_BACKEND_API_PATH,
+    ))
+    http.set_transport_factory(lambda: httpx.ASGITransport(app=mock))
+    store = mock.state.store
+    # Reads first, so created items do not change the collections being read
+    tools = sorted(load_catalog(), key=lambda tool: tool.name.startswith("create_"))
+
+    results = {}
+    calibrations = []
+    async with Client(create_app()) as client:
+        for tool in tools:
+            # Calibrate alongside every tool so background load affects both alike
+            calibrations.append(calibrate(runs=3))
+            await client.call_tool(tool.name, tool_arguments(tool, store))  # warm-up: imports, pools, lazy state
+
+            samples = []
+            for _ in range(runs):
+                arguments = tool_arguments(tool, store)
+                started = time.perf_counter()
+                await client.call_tool(tool.name, arguments)
+                samples.append((time.perf_counter() - started) * 1000)
+
+            arguments = tool_arguments(tool, store)
+            tracemalloc.start()
+            await client.call_tool(tool.name, arguments)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[tool.name] = {
+                "min_ms": round(min(samples), 3),
+                "p50_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(percentile(samples, 0.95), 3),
+                "p99_ms": round(percentile(samples, 0.99), 3),
+                "mean_ms": round(statistics.fmean(samples), 3),
+                "alloc_peak_kib": round(peak / 1024, 1),
+            }
+    return {
+        "items": items,
+        "calibration_ms": round(statistics.median(calibrations), 3),
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tools": results,
+    }
+
+def run_size(label: str, runs: int) -> dict:
+    """Benchmark one size in a fresh interpreter"""
+    print(f"Benchmarking {label} ({SIZES[label]} items per collection)...", file=sys.stderr)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "_worker", "--items", str(SIZES[label]), "--runs", str(runs)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_suite(sizes, runs: int, repeat: int = 1) -> dict:
+    """
+    Run each size in a fresh interpreter and collect the results.
+
+    Args:
+        sizes: Size labels to run
+        runs: Timed calls per tool
+        repeat: Measurements per size; each tool's fastest call is the median across them
+
+    Returns:
+        dict: The report, keyed by size label under "sizes"
+    """
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "sizes": {},
+    }
+    for label in sizes:
+        attempts = [run_size(label, runs) for _ in range(repeat)]
+        size = attempts[0]
+        for tool, metrics in size["tools"].items():
+            metrics["min_ms"] = statistics.median(attempt["tools"][tool]["min_ms"] for attempt in attempts)
+        size["calibration_ms"] = statistics.median(attempt["calibration_ms"] for attempt in attempts)
+        report["sizes"][label] = size
+    return report
+
+def merge_fastest(size: dict, retry: dict) -> None:
+    """Keep each tool's fastest call across two measurements of the same size"""
+    for tool, metrics in retry["tools"].items():
+        if tool in size["tools"]:
+            size["tools"][tool]["min_ms"] = min(size["tools"][tool]["min_ms"], metrics["min_ms"])
+    size["calibration_ms"] = max(size["calibration_ms"], retry["calibration_ms"])
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare a run against the baseline.
+
+    Returns:
+        list: One (size, tool, metric, detail) tuple per regression; empty when the run is within the threshold
+    """
+    regressions = []
+    for label, size in results["sizes"].items():
+        base_size = baseline.get("sizes", {}).get(label)
+        if base_size is None:
+            continue
+        # Only ever loosen the limits: a fast calibration must not turn noise into failures
+        speed = max(1.0, size["calibration_ms"] / base_size["calibration_ms"])
+        for tool, metrics in size["tools"].items():
+            base = base_size["tools"].get(tool)
+            if base is None:
+                continue
+            for key, scale, slack in (("min_ms", speed, LATENCY_SLACK_MS), ("alloc_peak_kib", 1.0, ALLOCATION_SLACK_KIB)):
+                limit = base[key] * scale * (1 + threshold) + slack
+                if metrics[key] > limit:
+                    regressions.append((label, tool, key, f"{metrics[key]} > {base[key]} (+{threshold:.0%})"))
+    return regressions
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    for label, size in report["sizes"].items():
+        print(f"\n{label}: {size['items']} items per collection, peak RSS {size['peak_rss_mib']} MiB, "
+              f"calibration {size['calibration_ms']} ms")
+        print(f"{'tool':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'alloc KiB':>11}{'vs base':>9}")
+        base_tools = (baseline or {}).get("sizes", {}).get(label, {}).get("tools", {})
+        for tool, m in size["tools"].items():
+            base = base_tools.get(tool)
+            delta = f"{m['p50_ms'] / base['p50_ms'] - 1:+.0%}" if base and base["p50_ms"] else ""
+            print(f"{tool:<26}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}{m['alloc_peak_kib']:>11.1f}{delta:>9}")
+
+def load_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every MCP tool against the mock Sitefinity")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite")
+    run.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES), help="Collection sizes")
+    run.add_argument("--runs", type=int, default=20, help="Timed calls per tool")
+    run.add_argument("--output", help="Write the results to this JSON file")
+    run.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    run.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    run.add_argument("--repeat", type=int, help="Measurements per size (default 3 with --update-baseline, else 1)")
+    run.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    run.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression")
+    run.add_argument("--confirm", type=int, default=2, help="Re-measurements of a size before reporting a latency regression")
+
+    check = commands.add_parser("compare", help="Compare a results file with the baseline")
+    check.add_argument("results", help="Results JSON written by `run --output`")
+    check.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    check.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression")
+
+    worker = commands.add_parser("_worker", help=argparse.SUPPRESS)
+    worker.add_argument("--items", type=int, required=True)
+    worker.add_argument("--runs", type=int, required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "_worker":
+        import logging
+        logging.disable(logging.WARNING)
+        print(json.dumps(asyncio.run(measure_size(args.items, args.runs))))
+        return
+
+    if args.command == "run":
+        results = run_suite(args.sizes, args.runs, args.repeat or (3 if args.update_baseline else 1))
+        if args.output:
+            write_json(args.output, results)
+        if args.update_baseline:
+            write_json(args.baseline, results)
+            print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    else:
+        results = load_json(args.results)
+
+    baseline = load_json(args.baseline) if os.path.exists(args.baseline) else None
+    print_report(results, baseline)
+
+    if args.command == "compare" or args.compare:
+        if baseline is None:
+            sys.exit(f"No baseline at {args.baseline}; create one with `run --update-baseline`")
+        regressions = compare(results, baseline, args.threshold)
+        for _ in range(args.confirm if args.command == "run" else 0):
+            retry = sorted({label for label, _, key, _ in regressions if key == "min_ms"})
+            if not retry:
+                break
+            for label in retry:
+                merge_fastest(results["sizes"][label], run_size(label, args.runs))
+            regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(f"{label} {tool} {key}: {detail}" for label, tool, key, detail in regressions))
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
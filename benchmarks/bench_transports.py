@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Per-call overhead of the stdio, streamable-http, SSE and REST transports
+
+Runs the same sequential tool calls through every transport against one mock
+Sitefinity (python -m mock_sitefinity, started here on a free port):
+
+- in-memory: fastmcp.Client on the tahubu_sf app in this process (baseline)
+- stdio: run.py as a subprocess
+- streamable-http and sse: fastmcp_custom/server.py
+- rest: the FastAPI server's POST /api/run-tool
+
+All servers share the upstream, and by default its responses are cached
+(CACHE_TTL_SECONDS), so after the warm-up every call does the same tool work.
+The difference from the in-memory baseline is then the cost of the
+transport's framing, serialization and process hop. Pass --no-cache to
+include the upstream round trip.
+
+Usage:
+    python benchmarks/bench_transports.py [--transports stdio streamable-http sse rest] [--runs 200]
+                                          [--items 200] [--no-cache]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+TRANSPORTS = ("in-memory", "stdio", "streamable-http", "sse", "rest")
+
+# A small, fixed-size result and a result that grows with the collection
+WORKLOADS = {
+    "get_sites": {},
+    "get_news": {"format": "json"},
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout} s")
+
+def start(command: list, env: dict, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port, process)
+    return process
+
+async def time_calls(call, runs: int, warmup: int) -> dict:
+    """Latency of `runs` sequential calls after `warmup` untimed ones"""
+    for _ in range(warmup):
+        size = len(await call())
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(samples)
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+        "result_chars": size,
+    }
+
+def result_text(result) -> str:
+    return "".join(getattr(block, "text", "") for block in result.content)
+
+async def measure_mcp(client_target, runs: int, warmup: int) -> dict:
+    from fastmcp import Client
+    results = {}
+    async with Client(client_target) as client:
+        for tool, arguments in WORKLOADS.items():
+            async def call():
+                return result_text(await client.call_tool(tool, arguments))
+            results[tool] = await time_calls(call, runs, warmup)
+    return results
+
+async def measure_rest(url: str, runs: int, warmup: int) -> dict:
+    import httpx
+    results = {}
+    async with httpx.AsyncClient(timeout=60) as client:
+        for tool, arguments in WORKLOADS.items():
+            name = "".join(part if i == 0 else part.capitalize() for i, part in enumerate(tool.split("_")))
+            async def call():
+                response = await client.post(f"{url}/api/run-tool", json={"name": name, "params": arguments})
+                response.raise_for_status()
+                return response.content
+            results[tool] = await time_calls(call, runs, warmup)
+    return results
+
+def measure(transport: str, env: dict, runs: int, warmup: int) -> dict:
+    """Start the server for a transport (if any) and time the workloads through it"""
+    from fastmcp.client.transports import PythonStdioTransport
+
+    if transport == "in-memory":
+        from tahubu_sf.app import create_app
+        return asyncio.run(measure_mcp(create_app(), runs, warmup))
+    if transport == "stdio":
+        with open(os.devnull, "w") as log_file:
+            stdio = PythonStdioTransport(
+                os.path.join(PROJECT_ROOT, "run.py"), env=env, cwd=PROJECT_ROOT, python_cmd=sys.executable, log_file=log_file
+            )
+            return asyncio.run(measure_mcp(stdio, runs, warmup))
+
+    port = free_port()
+    if transport == "rest":
+        command = [sys.executable, "-m", "uvicorn", "fastapi_server.main:app", "--port", str(port), "--log-level", "warning"]
+    else:
+        command = [sys.executable, "fastmcp_custom/server.py", "--transport", transport, "--port", str(port)]
+    server = start(command, env, port)
+    try:
+        if transport == "rest":
+            return asyncio.run(measure_rest(f"http://127.0.0.1:{port}", runs, warmup))
+        path = "mcp" if transport == "streamable-http" else "sse"
+        return asyncio.run(measure_mcp(f"http://127.0.0.1:{port}/{path}", runs, warmup))
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call overhead of the MCP and REST transports")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS[1:], default=list(TRANSPORTS[1:]), help="Transports to compare")
+    parser.add_argument("--items", type=int, default=200, help="Items per mock collection")
+    parser.add_argument("--runs", type=int, default=200, help="Timed calls per tool")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls per tool")
+    parser.add_argument("--no-cache", action="store_true", help="Include the upstream round trip in every call")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    mock_port = free_port()
+    mock = start([sys.executable, "-m", "mock_sitefinity", "--port", str(mock_port), "--items", str(args.items)], dict(os.environ), mock_port)
+    env = dict(
+        os.environ,
+        SITEFINITY_SITE_PREFIX=f"http://127.0.0.1:{mock_port}",
+        CACHE_TTL_SECONDS="0" if args.no_cache else "300",
+    )
+    # The in-memory baseline reads the same settings in this process
+    os.environ.update(env)
+    try:
+        print(f"{args.items} items per collection ({'upstream included' if args.no_cache else 'upstream cached'})")
+        print(f"{'transport':<17}{'tool':<12}{'p50 ms':>9}{'p95 ms':>9}{'overhead ms':>13}{'result chars':>14}")
+        baseline = None
+        for transport in ("in-memory", *args.transports):
+            results = measure(transport, env, args.runs, args.warmup)
+            baseline = baseline or results
+            for tool, m in results.items():
+                overhead = m["p50_ms"] - baseline[tool]["p50_ms"]
+                print(f"{transport:<17}{tool:<12}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{overhead:>+13.2f}{m['result_chars']:>14}")
+    finally:
+        mock.terminate()
+        mock.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""
+Concurrency load test for the FastAPI and FastMCP HTTP servers
+
+Runs closed-loop virtual users at each --concurrency level for --duration
+seconds. Every user repeatedly picks a tool from the mix and waits for its
+result before calling the next one. The FastAPI target posts to
+/api/run-tool through one shared connection pool. The MCP target gives every
+user its own streamable-http session. For each level it reports throughput,
+p50/p95/p99 latency and the error rate. It also reports the saturation knee:
+the lowest concurrency that reaches 90% of the peak throughput.
+
+Point the server under test at the mock (python -m mock_sitefinity) to leave
+Sitefinity out of the picture, then compare configurations by running the
+same sweep with different --label values:
+
+Usage:
+    python benchmarks/loadtest.py run --target fastapi --url http://127.0.0.1:8000 --label cache-on --output on.json
+    python benchmarks/loadtest.py run --target mcp --url http://127.0.0.1:3000/mcp [--concurrency 1 4 16 64]
+                                      [--duration 10] [--mix reads|writes|mixed|get_news=3,get_pages=1]
+    python benchmarks/loadtest.py compare on.json off.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+# Weighted tool mixes; writes are created as drafts under the first parent found
+MIXES = {
+    "reads": {
+        "get_news": 3, "get_blog_posts": 3, "get_pages": 2, "get_events": 2, "get_list_items": 2,
+        "get_documents": 1, "get_images": 1, "get_taxonomies": 1, "get_sites": 1, "get_forms": 1,
+    },
+    "writes": {"create_news_item": 2, "create_blog_post": 2, "create_event": 1, "create_list_item": 1},
+    "mixed": {"get_news": 4, "get_blog_posts": 4, "get_pages": 2, "get_events": 2, "create_news_item": 1, "create_blog_post": 1},
+}
+
+# Tool listing the parents each create tool needs
+PARENT_TOOLS = {
+    "create_blog_post": "get_parent_blogs",
+    "create_list_item": "get_parent_lists",
+    "create_event": "get_calendars",
+    "create_image": "get_albums",
+    "create_document": "get_document_libraries",
+    "create_video": "get_video_libraries",
+}
+
+# A level's throughput within this fraction of the peak counts as saturated
+KNEE_FRACTION = 0.9
+
+def parse_mix(value: str) -> dict:
+    """A named mix, or custom weights given as tool=weight,tool=weight"""
+    if value in MIXES:
+        return MIXES[value]
+    weights = {}
+    for entry in value.split(","):
+        name, _, weight = entry.partition("=")
+        try:
+            weights[name.strip()] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight in {entry!r}")
+    return weights
+
+def rest_name(tool: str) -> str:
+    """The /api/run-tool name of a tool, e.g. get_blog_posts -> getBlogPosts"""
+    first, *rest = tool.split("_")
+    name = first + "".join(part.capitalize() for part in rest)
+    return f"{name}Draft" if tool.startswith("create_") else name
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] if ordered else 0.0
+
+class FastAPITarget:
+    """Calls tools through POST /api/run-tool"""
+
+    def __init__(self, url: str, tenant: str = None, timeout: float = 60):
+        self.url = url.rstrip("/") + "/api/run-tool"
+        self.tenant = tenant
+        self.timeout = timeout
+        self.client = None
+
+    async def open(self, users: int) -> None:
+        import httpx
+        limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+        self.client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def call(self, user: int, tool: str, arguments: dict):
+        body = {"name": rest_name(tool), "params": arguments}
+        if self.tenant:
+            body["tenant"] = self.tenant
+        response = await self.client.post(self.url, json=body)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return response.json()["result"]
+
+class MCPTarget:
+    """Calls tools over streamable-http, one MCP session per virtual user"""
+
+    def __init__(self, url: str, tenant: str = None, timeout: float = 60):
+        self.url = url
+        self.tenant = tenant
+        self.timeout = timeout
+        self.sessions = []
+
+    async def open(self, users: int) -> None:
+        from fastmcp import Client
+        for _ in range(users):
+            session = Client(self.url, timeout=self.timeout)
+            await session.__aenter__()
+            self.sessions.append(session)
+
+    async def close(self) -> None:
+        for session in self.sessions:
+            await session.__aexit__(None, None, None)
+        self.sessions.clear()
+
+    async def call(self, user: int, tool: str, arguments: dict):
+        if self.tenant:
+            arguments = dict(arguments, tenant=self.tenant)
+        result = await self.sessions[user].call_tool(tool, arguments, raise_on_error=False)
+        if result.is_error:
+            raise RuntimeError("tool error")
+        return result.data
+
+TARGETS = {"fastapi": FastAPITarget, "mcp": MCPTarget}
+
+async def tool_arguments(target, mix: dict) -> dict:
+    """Arguments for every tool in the mix, looking up a parent for each create tool"""
+    arguments = {}
+    for tool in mix:
+        if not tool.startswith("create_"):
+            arguments[tool] = {}
+            continue
+        params = {"title": "Load test draft", "content": "<p>Load test content</p>"}
+        if tool == "create_event":
+            params.update(eventstart="2024-06-01T09:00:00Z", eventend="2024-06-01T17:00:00Z")
+        if tool in PARENT_TOOLS:
+            parents = await target.call(0, PARENT_TOOLS[tool], {})
+            if not parents:
+                raise SystemExit(f"{tool} needs a parent, but {PARENT_TOOLS[tool]} returned none")
+            params["parent_id"] = next(iter(parents))
+        arguments[tool] = params
+    return arguments
+
+async def run_level(target_class, args, mix: dict, users: int, seed: int) -> dict:
+    """Run `users` virtual users for the warm-up and the measured duration"""
+    target = target_class(args.url, args.tenant, args.timeout)
+    await target.open(users)
+    try:
+        arguments = await tool_arguments(target, mix)
+        tools, weights = list(mix), list(mix.values())
+        latencies, errors, calls = [], Counter(), Counter()
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        stop_at = measure_from + args.duration
+
+        async def user(index: int) -> None:
+            rng = random.Random(seed * 10007 + index)
+            while True:
+                tool = rng.choices(tools, weights)[0]
+                began = time.perf_counter()
+                if began >= stop_at:
+                    return
+                try:
+                    await target.call(index, tool, arguments[tool])
+                    error = None
+                except Exception as e:
+                    error = f"{tool}: {e}" if str(e) else f"{tool}: {type(e).__name__}"
+                finished = time.perf_counter()
+                # Only calls that start and finish inside the window are counted
+                if began >= measure_from and finished <= stop_at:
+                    calls[tool] += 1
+                    latencies.append((finished - began) * 1000)
+                    if error:
+                        errors[error] += 1
+
+        await asyncio.gather(*(user(i) for i in range(users)))
+    finally:
+        await target.close()
+
+    completed = len(latencies)
+    return {
+        "concurrency": users,
+        "requests": completed,
+        "throughput_rps": round(completed / args.duration, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "error_rate": round(sum(errors.values()) / completed, 4) if completed else 0.0,
+        "errors": dict(errors.most_common(5)),
+        "calls": dict(calls),
+    }
+
+def find_knee(levels: list):
+    """The lowest concurrency reaching KNEE_FRACTION of the peak throughput"""
+    if not levels:
+        return None
+    peak = max(level["throughput_rps"] for level in levels)
+    for level in sorted(levels, key=lambda level: level["concurrency"]):
+        if level["throughput_rps"] >= KNEE_FRACTION * peak:
+            return level["concurrency"]
+    return None
+
+async def sweep(args) -> dict:
+    mix = args.mix
+    levels = []
+    for seed, users in enumerate(args.concurrency):
+        print(f"Concurrency {users}...", file=sys.stderr)
+        levels.append(await run_level(TARGETS[args.target], args, mix, users, seed))
+        print_level(levels[-1])
+    return {
+        "label": args.label,
+        "target": args.target,
+        "url": args.url,
+        "mix": mix,
+        "duration_s": args.duration,
+        "python": platform.python_version(),
+        "levels": levels,
+        "peak_rps": max((level["throughput_rps"] for level in levels), default=0.0),
+        "knee_concurrency": find_knee(levels),
+    }
+
+def print_level(level: dict) -> None:
+    print(f"  {level['concurrency']:>5} users {level['throughput_rps']:>9.1f} req/s  p50 {level['p50_ms']:>8.1f}  "
+          f"p95 {level['p95_ms']:>8.1f}  p99 {level['p99_ms']:>8.1f} ms  errors {level['error_rate']:.1%}")
+    for error, count in level["errors"].items():
+        print(f"        {count} x {error}")
+
+def print_comparison(reports: list) -> None:
+    """Throughput and p95 latency of each report, per concurrency level"""
+    names = [report.get("label") or report["target"] for report in reports]
+    print(f"{'users':>6}" + "".join(f"{name[:22]:>24}" for name in names))
+    by_level = [{level["concurrency"]: level for level in report["levels"]} for report in reports]
+    for users in sorted({users for levels in by_level for users in levels}):
+        cells = []
+        for levels in by_level:
+            level = levels.get(users)
+            cells.append(f"{level['throughput_rps']:>9.1f}/s {level['p95_ms']:>7.1f}ms" if level else "-")
+        print(f"{users:>6}" + "".join(f"{cell:>24}" for cell in cells))
+    print(f"{'knee':>6}" + "".join(f"{str(report['knee_concurrency']):>24}" for report in reports))
+    print(f"{'peak':>6}" + "".join(f"{report['peak_rps']:>22.1f}/s" for report in reports))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FastAPI or FastMCP HTTP server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Sweep concurrency levels against a running server")
+    run.add_argument("--target", choices=list(TARGETS), default="fastapi", help="Server type")
+    run.add_argument("--url", help="Server base URL (FastAPI) or MCP endpoint URL")
+    run.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Virtual users per level")
+    run.add_argument("--duration", type=float, default=10, help="Measured seconds per level")
+    run.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each level")
+    run.add_argument("--mix", type=parse_mix, default="reads",
+                     help=f"Tool mix: {', '.join(MIXES)} or weights such as get_news=3,get_pages=1")
+    run.add_argument("--tenant", help="Sitefinity tenant to run the tools against")
+    run.add_argument("--timeout", type=float, default=60, help="Per-call timeout in seconds")
+    run.add_argument("--label", help="Name of the configuration under test, shown by compare")
+    run.add_argument("--output", help="Write the results to this JSON file")
+
+    check = commands.add_parser("compare", help="Compare results files side by side")
+    check.add_argument("results", nargs="+", help="JSON files written by `run --output`")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        reports = []
+        for path in args.results:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        print_comparison(reports)
+        return
+
+    if not args.url:
+        args.url = "http://127.0.0.1:8000" if args.target == "fastapi" else "http://127.0.0.1:3000/mcp"
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+    print(f"{args.target} at {args.url}, mix {args.mix}", file=sys.stderr)
+    report = asyncio.run(sweep(args))
+    print(f"\nPeak {report['peak_rps']} req/s, knee at {report['knee_concurrency']} users")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,16 @@
 """
 FastAPI server for the TahubuSF MCP tools that can be deployed to Azure App Service
 """
+import asyncio
 import os
 import logging
 import re
+from contextlib import asynccontextmanager
 from typing import Dict, Any
 
 import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -22,11 +24,20 @@ from tahubu_sf.api.news import get_news, create_news_item
 from tahubu_sf.api.blog_posts import get_blog_posts, get_blog_post_by_id
 from tahubu_sf.api.pages import get_pages, get_page_templates
 from tahubu_sf.api.sites import get_sites
-from tahubu_sf.config.settings import APP_NAME, AUTH_TYPE, API_KEY, USERNAME, AUTH_KEY
+from tahubu_sf.api.digest import digests
+from tahubu_sf.config.settings import APP_NAME, AUTH_TYPE, API_KEY, USERNAME, AUTH_KEY, CLIENT_ID
+from tahubu_sf.utils.tracing import start_span, TRACEPARENT_HEADER
+from tahubu_sf.utils.metrics import metrics
+from tahubu_sf.utils.compression import CompressionMiddleware, COMPRESSION_MIN_BYTES
+from tahubu_sf.config.tenants import use_tenant, get_registry
+from tahubu_sf.utils.http import close_pools, prefetch_auth_tokens
+from tahubu_sf.utils.loop_monitor import monitor_event_loop
+from tahubu_sf.utils.profiling import PROFILE_HEADER, PROFILING_TOKEN, profiles, profiling_authorized
 
 # Import local modules
 from fastapi_server.routes import router
 from fastapi_server.config import settings
+from fastapi_server.responses import CodecJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -35,11 +46,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger("tahubu_sf.fastapi")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Measure event-loop lag and report calls that block the loop
+    async with monitor_event_loop():
+        # Fetch OIDC tokens up front so the first tool calls do not wait for the token endpoint
+        await prefetch_auth_tokens()
+        try:
+            # Build the site digest in the background and keep it fresh
+            async with digests.running():
+                yield
+        finally:
+            # Close upstream connections and stop token refreshes
+            await close_pools()
+
 # Create FastAPI app
 app = FastAPI(
     title=f"{APP_NAME} API",
     description="REST API for Sitefinity MCP tools",
     version=settings.API_VERSION,
+    default_response_class=CodecJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS for browser access
@@ -51,6 +78,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses of at least COMPRESSION_MIN_BYTES with zstd, brotli or gzip
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# Open a root span per request, continuing any trace context sent by the caller
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with start_span(
+        f"http {request.method} {request.url.path}",
+        traceparent=request.headers.get(TRACEPARENT_HEADER),
+        method=request.method,
+        path=request.url.path,
+    ) as span:
+        response = await call_next(request)
+        if span is not None:
+            span.set_attribute("status_code", response.status_code)
+        return response
+
+# Select the Sitefinity tenant named by the X-Sitefinity-Tenant header for the request
+@app.middleware("http")
+async def select_tenant(request: Request, call_next):
+    try:
+        with use_tenant(request.headers.get("X-Sitefinity-Tenant")):
+            return await call_next(request)
+    except KeyError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e.args[0])})
+
 # Mount static files
 app.mount("/media", StaticFiles(directory=settings.MEDIA_DIR), name="media")
 app.mount("/inspector/css", StaticFiles(directory=os.path.join(settings.INSPECTOR_DIR, "css")), name="inspector_css")
@@ -70,29 +123,61 @@ async def health_check():
             AUTH_TYPE == "anonymous" or
             (AUTH_TYPE == "apikey" and API_KEY) or
             (AUTH_TYPE == "accesskey" and AUTH_KEY) or
-            (AUTH_TYPE == "authenticated" and AUTH_KEY)  # For backward compatibility
+            (AUTH_TYPE == "authenticated" and AUTH_KEY) or  # For backward compatibility
+            (AUTH_TYPE == "oidc" and CLIENT_ID)
         ) else False
     }
     
     return {
         "status": "healthy",
         "version": settings.API_VERSION,
-        "authentication": auth_status
+        "authentication": auth_status,
+        "tenants": get_registry().names()
     }
 
+# Expose in-process metrics (Sitefinity call phases, body sizes, error counts)
+@app.get("/metrics")
+async def get_metrics():
+    """Return a snapshot of all collected metrics"""
+    return metrics.snapshot()
+
+def _require_profiling_token(request: Request) -> None:
+    """Hide the profile endpoints unless profiling is configured and the token matches"""
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiling_authorized(request.headers.get(PROFILE_HEADER)):
+        raise HTTPException(status_code=403, detail=f"Missing or invalid {PROFILE_HEADER} header")
+
+@app.get("/admin/profiles")
+async def list_profiles(request: Request):
+    """List the stored tool-call profiles, newest first"""
+    _require_profiling_token(request)
+    return profiles.list()
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, request: Request):
+    """Return one profile as collapsed stacks (flamegraph.pl, speedscope, inferno)"""
+    _require_profiling_token(request)
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}")
+    return profile.collapsed()
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
 # Define root endpoint to serve the home page
 @app.get("/", response_class=HTMLResponse)
 async def get_home():
     """Serve the home page with links to docs and inspector"""
-    with open(settings.HOME_HTML_PATH, "r", encoding="utf-8") as f:
-        return f.read()
+    return await asyncio.to_thread(_read_text, settings.HOME_HTML_PATH)
 
 # Serve the inspector UI from /inspector/ path
 @app.get("/inspector/", response_class=HTMLResponse)
 async def get_inspector():
     """Serve the Inspector UI from /inspector/ path"""
-    with open(settings.UI_HTML_PATH, "r", encoding="utf-8") as f:
-        return f.read()
+    return await asyncio.to_thread(_read_text, settings.UI_HTML_PATH)
 
 def start():
     """Start the server (used for production)"""
@@ -108,6 +193,8 @@ def start():
         auth_info += f", API Key: {'configured' if API_KEY else 'not configured'}"
     elif AUTH_TYPE == "accesskey":
         auth_info += f", Auth Key: {'configured' if AUTH_KEY else 'not configured'}" 
+    elif AUTH_TYPE == "oidc":
+        auth_info += f", OIDC client: {'configured' if CLIENT_ID else 'not configured'}"
     logger.info(auth_info)
     
     uvicorn.run(
@@ -131,6 +218,8 @@ if __name__ == "__main__":
         auth_info += f", API Key: {'configured' if API_KEY else 'not configured'}"
     elif AUTH_TYPE == "accesskey":
         auth_info += f", Auth Key: {'configured' if AUTH_KEY else 'not configured'}"
+    elif AUTH_TYPE == "oidc":
+        auth_info += f", OIDC client: {'configured' if CLIENT_ID else 'not configured'}"
     logger.info(auth_info)
     
     start()
\ No newline at end of file
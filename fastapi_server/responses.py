@@ -0,0 +1,14 @@
+"""
+Response classes for the FastAPI server
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from tahubu_sf.utils import codec
+
+class CodecJSONResponse(JSONResponse):
+    """JSON response rendered with the configured codec (orjson or msgspec when installed)"""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
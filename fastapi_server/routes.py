@@ -6,19 +6,24 @@ import json
 from typing import Dict, Any, List, Union, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse
+import httpx
+from fastapi import APIRouter, Request, Response, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # Import tool functions
 from tahubu_sf.api.news import get_news, create_news_item  # Assuming create_news_item is defined
-from tahubu_sf.api.blog_posts import create_blog_post, get_blog_posts, get_blog_post_by_id, get_parent_blogs
+from tahubu_sf.api.blog_posts import (
+    create_blog_post, get_blog_posts, get_blog_post_by_id, get_blog_post_by_id_raw, get_parent_blogs,
+)
 from tahubu_sf.api.lists import get_list_items
 from tahubu_sf.api.list_items import create_list_item, get_parent_lists
 from tahubu_sf.api.calendars import get_events
 from tahubu_sf.api.events import get_calendars, create_event
 from tahubu_sf.api.pages import get_pages, get_page_templates
 from tahubu_sf.api.sites import get_sites
+from tahubu_sf.api.digest import get_site_digest
+from tahubu_sf.api.content import create_content, get_content_types, query_content
 from tahubu_sf.api.shared_content import get_shared_content
 from tahubu_sf.api.albums import get_images
 from tahubu_sf.api.images import create_image, get_albums
@@ -30,6 +35,12 @@ from tahubu_sf.api.search_indexes import get_search_indexes
 from tahubu_sf.api.taxonomies import get_taxonomies
 from tahubu_sf.api.section_presets import get_section_presets
 from tahubu_sf.api.forms import get_forms
+from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
+from tahubu_sf.utils.http import RawResponse, make_raw_request
+from tahubu_sf.utils.odata_query import ODataQueryError, normalize_query
+from tahubu_sf.utils.tracing import start_span
+from tahubu_sf.config.tenants import use_tenant
+from tahubu_sf.utils.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, profiling_authorized, run_profiled
 
 # Configure logging
 logger = logging.getLogger("tahubu_sf.fastapi.routes")
@@ -60,6 +71,10 @@ TOOL_MAP = {
     "getSearchIndexes": get_search_indexes,
     "getTaxonomies": get_taxonomies,
     "getSectionPresets": get_section_presets,
+    "getSiteDigest": get_site_digest,
+    "getContentTypes": get_content_types,
+    "queryContent": query_content,
+    "createContent": create_content,
     "createBlogPostDraft": create_blog_post,
     "createNewsItemDraft": create_news_item,
     "createListItemDraft": create_list_item,
@@ -73,11 +88,18 @@ TOOL_MAP = {
     "createBlogPost": create_blog_post,
 }
 
+# Tools whose result is the Sitefinity JSON unchanged. run-tool forwards their
+# upstream bytes instead of decoding and re-encoding them.
+PASSTHROUGH_TOOLS = {
+    "getBlogPostById": get_blog_post_by_id_raw,
+}
+
 # Data models
 class ToolRequest(BaseModel):
     """Request model for tool execution"""
     name: str
     params: Dict[str, Any] = {}
+    tenant: Optional[str] = Field(default=None, description="Sitefinity tenant to run the tool against")
 
 class ToolResponse(BaseModel):
     """Response model for tool execution"""
@@ -164,6 +186,15 @@ TOOL_SCHEMAS = {
             "parent_id": {"type": "string", "description": "The ID of the parent video library (use getVideoLibraries to find)"}
         },
         "required": ["title", "content", "parent_id"]
+    },
+    "createContent": {
+        "type": "object",
+        "properties": {
+            "content_type": {"type": "string", "description": "The content type, e.g. a dynamic module's type (use getContentTypes to find)"},
+            "fields": {"type": "object", "description": "The item's properties by name, e.g. {\"Title\": \"...\", \"ParentId\": \"...\"}"},
+            "draft": {"type": "boolean", "description": "Whether to save the item as a draft", "default": True}
+        },
+        "required": ["content_type", "fields"]
     }
 }
 
@@ -222,6 +253,38 @@ async def _execute_tool(tool_name: str, params: Dict[str, Any]) -> Dict[str, Any
     Internal function that executes any tool with given parameters.
     This is the single source of truth for tool execution logic.
     """
+    with start_span(f"tool.{tool_name}", tool=tool_name, transport="rest"):
+        return await _dispatch_tool(tool_name, params)
+
+def _passthrough_response(raw: RawResponse, envelope: bool = False) -> StreamingResponse:
+    """
+    Stream an undecoded Sitefinity body to the client.
+    
+    Args:
+        raw: The upstream response
+        envelope: Wrap the body as {"result": ...}, the shape of run-tool responses
+    """
+    async def body():
+        try:
+            if envelope:
+                yield b'{"result":'
+            async for chunk in raw:
+                yield chunk
+            if envelope:
+                yield b'}'
+        finally:
+            await raw.aclose()
+    
+    if envelope:
+        length = raw.length + len(b'{"result":}') if raw.length is not None else None
+        media_type = "application/json"
+    else:
+        length, media_type = raw.length, raw.content_type
+    headers = {"Content-Length": str(length)} if length is not None else None
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+async def _dispatch_tool(tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate parameters and call the tool implementation for _execute_tool"""
     logger.info(f"Executing tool: {tool_name} with params: {params}")
     
     if tool_name not in TOOL_MAP:
@@ -452,11 +515,16 @@ async def _execute_tool(tool_name: str, params: Dict[str, Any]) -> Dict[str, Any
         return result
 
 @router.post("/run-tool")
-async def run_tool(request: ToolRequest):
+async def run_tool(request: ToolRequest, http_request: Request, response: Response):
     """
     Execute any MCP tool directly with provided parameters.
     
     This is the MCP-compatible unified endpoint that handles all 28 tools.
+    The Sitefinity tenant is taken from the `tenant` field or the
+    X-Sitefinity-Tenant header, falling back to the default tenant.
+    A request carrying the configured X-Profile-Token is profiled; the
+    X-Profile-Id response header names the stored profile. Results of
+    PASSTHROUGH_TOOLS are streamed from Sitefinity without being decoded.
     Use this endpoint for:
     - MCP client integration
     - Multi-tool automation
@@ -468,9 +536,25 @@ async def run_tool(request: ToolRequest):
     - etc.
     """
     try:
-        result = await _execute_tool(request.name, request.params)
+        with use_tenant(request.tenant):
+            if profiling_authorized(http_request.headers.get(PROFILE_HEADER)):
+                result, profile = await run_profiled(
+                    request.name,
+                    lambda: _execute_tool(request.name, request.params),
+                    http_request.headers.get("X-Request-ID"),
+                )
+                response.headers[PROFILE_ID_HEADER] = profile.id
+            elif request.name in PASSTHROUGH_TOOLS:
+                with start_span(f"tool.{request.name}", tool=request.name, transport="rest", passthrough=True):
+                    raw = await PASSTHROUGH_TOOLS[request.name](**request.params)
+                return _passthrough_response(raw, envelope=True)
+            else:
+                result = await _execute_tool(request.name, request.params)
         return {"result": result}
         
+    except KeyError as e:
+        # Unknown tenant
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
     except HTTPException:
         # Re-raise HTTP exceptions (they have proper status codes)
         raise
@@ -653,6 +737,63 @@ async def create_video_draft(request: VideoDraftRequest):
             detail=f"Error creating video draft: {str(e)}"
         )
 
+@router.get("/blog-posts/{post_id}")
+async def get_blog_post(post_id: str):
+    """
+    Get a single blog post, streamed as Sitefinity returned it.
+    
+    The upstream JSON is forwarded byte for byte (from the response cache when
+    enabled) instead of being decoded and re-encoded.
+    """
+    try:
+        return _passthrough_response(await get_blog_post_by_id_raw(post_id))
+    except Exception as e:
+        cause = e.__cause__
+        if isinstance(cause, httpx.HTTPStatusError) and cause.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Blog post {post_id} not found")
+        logger.exception(f"Error getting blog post: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting blog post: {str(e)}"
+        )
+
+# Collections the OData proxy may read
+ODATA_PROXY_TYPES = frozenset(vars(CONTENT_TYPES).values())
+
+@router.get("/odata/{content_type}")
+async def query_odata(content_type: str, request: Request):
+    """
+    Read a Sitefinity collection with arbitrary OData query options.
+    
+    Supports $filter, $select, $orderby, $top, $skip and $count on the
+    collections in CONTENT_TYPES. Queries are normalized first, so equivalent
+    queries share one cache entry and one upstream request; the response is
+    streamed as Sitefinity returned it.
+    """
+    if content_type not in ODATA_PROXY_TYPES:
+        raise HTTPException(status_code=404, detail=f"Unknown content type: {content_type}")
+    try:
+        params = normalize_query(request.query_params.multi_items())
+    except ODataQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        with start_span("odata.proxy", content_type=content_type):
+            raw = await make_raw_request(f"{ENDPOINTS.content}/{content_type}", params=params)
+        return _passthrough_response(raw)
+    except httpx.HTTPStatusError as e:
+        # Sitefinity rejects unknown properties and malformed filters with a 4xx
+        status = e.response.status_code
+        if 400 <= status < 500:
+            raise HTTPException(status_code=status, detail=f"Sitefinity rejected the query: {e.response.text}")
+        logger.exception(f"Error querying {content_type}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error querying {content_type}: {str(e)}")
+    except Exception as e:
+        logger.exception(f"Error querying {content_type}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error querying {content_type}: {str(e)}"
+        )
+
 @router.get("/blog-parents", response_model=Dict[str, str])
 async def get_blog_parents():
     """Get a list of available parent blogs"""
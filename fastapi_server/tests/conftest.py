@@ -0,0 +1,57 @@
+"""
+Shared test configuration
+"""
+import os
+
+# Settings are read at import time; point them at a placeholder site so the
+# suite runs without a .env file. Tests never reach this host.
+os.environ.setdefault("SITEFINITY_SITE_PREFIX", "http://sitefinity.test")
+
+import httpx
+import pytest
+
+from mock_sitefinity.server import MockConfig, create_app as create_mock
+from tahubu_sf.api.digest import digests
+from tahubu_sf.utils import http, odata_metadata
+
+def _reset_upstream_state() -> None:
+    http.set_transport_factory(None)
+    http.response_cache.invalidate()
+    odata_metadata.clear_schemas()
+    digests.digests.clear()
+
+@pytest.fixture
+def sitefinity_handler():
+    """
+    Answer Sitefinity requests with a handler instead of the network.
+
+    Call the fixture with a function taking an httpx.Request and returning an
+    httpx.Response (or a coroutine of one). Pools, cached responses, OData
+    schemas and site digests are dropped before and after the test, so no
+    state leaks between tests.
+    """
+    def install(handler):
+        http.set_transport_factory(lambda: httpx.MockTransport(handler))
+
+    _reset_upstream_state()
+    yield install
+    _reset_upstream_state()
+
+@pytest.fixture
+def mock_sitefinity():
+    """
+    Answer Sitefinity requests with an in-process mock_sitefinity app.
+
+    Call the fixture with the number of items per collection and any other
+    MockConfig options; it returns the mock, whose state.requests counts the
+    requests it served. Pools, cached responses, OData schemas and site digests
+    are dropped before and after the test.
+    """
+    def install(items: int = 5, **options):
+        mock = create_mock(MockConfig(items=items, **options))
+        http.set_transport_factory(lambda: httpx.ASGITransport(app=mock))
+        return mock
+
+    _reset_upstream_state()
+    yield install
+    _reset_upstream_state()
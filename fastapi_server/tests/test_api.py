@@ -37,6 +37,14 @@ def test_list_tools_endpoint():
     assert "name" in tool
     assert "description" in tool
 
+def test_create_content_schema_is_listed():
+    """Test the generic create tool declares its parameters"""
+    response = client.get("/api/list-tools")
+    tools = {tool["name"]: tool for tool in response.json()["tools"]}
+    schema = tools["createContent"]["schema"]
+    assert schema["required"] == ["content_type", "fields"]
+    assert schema["properties"]["draft"]["type"] == "boolean"
+
 def test_run_tool_endpoint_invalid_tool():
     """Test running non-existent tool"""
     response = client.post(
@@ -0,0 +1,107 @@
+"""
+Tests for OpenID Connect token caching and refresh
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from tahubu_sf.config import settings
+from tahubu_sf.config.tenants import TenantRegistry, set_registry, use_tenant
+from tahubu_sf.utils import http
+
+@pytest.fixture
+def oidc(tmp_path, monkeypatch, sitefinity_handler):
+    """An OIDC tenant whose token endpoint issues numbered tokens"""
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({
+        "default": "secure",
+        "tenants": {
+            "secure": {
+                "site_prefix": "http://secure.test", "auth_type": "oidc",
+                "client_id": "mcp", "client_secret": "s3cret", "username": "ann", "password": "pw",
+            },
+        },
+    }))
+    set_registry(TenantRegistry.from_file(str(path)))
+
+    state = {"grants": [], "api": [], "reject": set(), "expires_in": 3600}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/connect/token"):
+            form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+            state["grants"].append(form)
+            await asyncio.sleep(0.01)
+            number = len(state["grants"])
+            return httpx.Response(200, json={
+                "access_token": f"token-{number}", "token_type": "Bearer",
+                "expires_in": state["expires_in"], "refresh_token": f"refresh-{number}",
+            }, request=request)
+        authorization = request.headers.get("Authorization")
+        state["api"].append(authorization)
+        if authorization in state["reject"]:
+            return httpx.Response(401, request=request)
+        return httpx.Response(200, json={"value": []}, request=request)
+
+    sitefinity_handler(handler)
+    monkeypatch.setattr(http, "MIN_WAIT", 0)
+    yield state
+    set_registry(None)
+
+URL = f"{settings.ENDPOINTS.content}/newsitems"
+
+def test_concurrent_requests_share_one_token(oidc):
+    async def main():
+        with use_tenant("secure"):
+            await asyncio.gather(*(http.make_request(URL) for _ in range(10)))
+            await http.make_request(URL)
+
+    asyncio.run(main())
+    assert len(oidc["grants"]) == 1
+    assert oidc["grants"][0]["grant_type"] == "password"
+    assert oidc["grants"][0]["client_id"] == "mcp" and oidc["grants"][0]["username"] == "ann"
+    assert oidc["api"] == ["Bearer token-1"] * 11
+
+def test_token_is_refreshed_in_background_before_expiry(oidc):
+    oidc["expires_in"] = 0.2
+
+    async def main():
+        with use_tenant("secure"):
+            pool = http.get_pool(http.current_tenant())
+            pool.tokens.refresh_margin = 0.1
+            await http.make_request(URL)
+            await asyncio.sleep(0.15)
+            return await http.get_auth_token()
+
+    assert asyncio.run(main()) == {"Authorization": "Bearer token-2"}
+    assert [grant["grant_type"] for grant in oidc["grants"]] == ["password", "refresh_token"]
+    assert oidc["grants"][1]["refresh_token"] == "refresh-1"
+
+def test_rejected_token_is_replaced_on_retry(oidc):
+    oidc["reject"].add("Bearer token-1")
+
+    async def main():
+        with use_tenant("secure"):
+            await http.make_request(URL)
+
+    asyncio.run(main())
+    assert oidc["api"] == ["Bearer token-1", "Bearer token-2"]
+
+def test_discarded_pools_are_closed(oidc):
+    async def main():
+        with use_tenant("secure"):
+            await http.make_request(URL)
+            replaced = http.get_pool(http.current_tenant())
+            http.set_transport_factory(http._transport_factory)
+            await http.make_request(URL)
+            current = http.get_pool(http.current_tenant())
+            timer = current.tokens._timer
+            await http.close_pools()
+            await asyncio.sleep(0)
+            return replaced, current, timer
+
+    replaced, current, timer = asyncio.run(main())
+    assert replaced.client.is_closed and replaced.tokens._timer is None
+    assert current.client.is_closed and timer.cancelled()
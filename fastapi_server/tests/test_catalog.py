@@ -0,0 +1,45 @@
+"""
+Tests for the static tool catalog and lazy tool registration
+"""
+import asyncio
+import inspect
+import json
+import subprocess
+import sys
+
+from tahubu_sf import catalog
+
+def test_catalog_matches_implementations():
+    """tool_catalog.json must be regenerated whenever a tool signature or docstring changes"""
+    with open(catalog.CATALOG_PATH, "r", encoding="utf-8") as f:
+        assert json.load(f) == json.loads(json.dumps(catalog.build_catalog()))
+
+def test_lazy_tool_keeps_signature_and_calls_implementation(monkeypatch):
+    """Proxies expose the catalog signature and forward calls to the implementation"""
+    spec = next(s for s in catalog.load_catalog() if s.name == "create_blog_post")
+    calls = []
+
+    async def fake_create_blog_post(title, content, parent_id, summary=None, allow_comments=True, draft=True):
+        calls.append((title, content, parent_id, summary, allow_comments, draft))
+        return {"Id": "1"}
+
+    monkeypatch.setitem(catalog._loaded, spec.target, fake_create_blog_post)
+    proxy = catalog.lazy_tool(spec)
+
+    assert proxy.__name__ == "create_blog_post"
+    assert list(inspect.signature(proxy).parameters) == [
+        "title", "content", "parent_id", "summary", "allow_comments", "draft", "tenant"
+    ]
+    assert asyncio.run(proxy("Hello", "<p>Hi</p>", parent_id="blog")) == {"Id": "1"}
+    assert calls == [("Hello", "<p>Hi</p>", "blog", None, True, True)]
+
+def test_create_app_does_not_import_tool_modules():
+    """Building the MCP app must not import tool implementations or httpx"""
+    code = (
+        "import sys; from tahubu_sf.app import create_app; create_app(); "
+        "print(any(m.startswith('tahubu_sf.api.') for m in sys.modules), 'httpx' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert output == "False False"
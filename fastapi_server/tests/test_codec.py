@@ -0,0 +1,26 @@
+"""
+Tests for the pluggable JSON codec
+"""
+import sys
+from datetime import datetime
+
+import pytest
+
+from tahubu_sf.utils.codec import available_codecs, get_codec
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_codecs_round_trip_compact_utf8(name):
+    codec = get_codec(name)
+    body = codec.dumps({"Title": "Café", "When": datetime(2024, 1, 2, 3, 4, 5), "Tags": [1, 2.5, None, True]})
+    assert body == '{"Title":"Café","When":"2024-01-02T03:04:05","Tags":[1,2.5,null,true]}'.encode()
+    assert codec.loads(body)["Title"] == "Café"
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+def test_missing_backend_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    assert get_codec("orjson").name == "json"
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        get_codec("simplejson")
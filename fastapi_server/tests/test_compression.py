@@ -0,0 +1,80 @@
+"""
+Tests for content-encoding negotiation and the response compression middleware
+"""
+import asyncio
+import gzip
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from tahubu_sf.utils.compression import CompressionMiddleware, negotiate
+
+BIG = {"value": [{"Title": f"Item {i}", "Content": "<p>Hello</p>" * 10} for i in range(50)]}
+
+def _app(minimum_size=500):
+    async def big(request):
+        return JSONResponse(BIG)
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def events(request):
+        async def stream():
+            yield b"data: " + b"x" * 2000 + b"\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def chunked(request):
+        async def stream():
+            for _ in range(10):
+                yield b"line of text\n" * 100
+        return StreamingResponse(stream(), media_type="text/plain")
+
+    app = Starlette(routes=[Route(path, handler) for path, handler in
+                            [("/big", big), ("/small", small), ("/events", events), ("/chunked", chunked)]])
+    return CompressionMiddleware(app, minimum_size=minimum_size, encodings=["gzip"])
+
+def _get(path, accept="gzip"):
+    async def call():
+        transport = httpx.ASGITransport(app=_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers={"Accept-Encoding": accept})
+    return asyncio.run(call())
+
+def test_negotiate_honours_quality_and_server_preference():
+    offered = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", offered) == "br"
+    assert negotiate("br;q=0.5, gzip", offered) == "gzip"
+    assert negotiate("*", offered) == "zstd"
+    assert negotiate("identity", offered) is None
+    assert negotiate("gzip;q=0", offered) is None
+    assert negotiate(None, offered) is None
+
+def test_large_json_is_compressed_and_small_is_not():
+    response = _get("/big")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == BIG
+    assert int(response.headers["content-length"]) < len(response.content)
+
+    assert "content-encoding" not in _get("/small").headers
+    assert "content-encoding" not in _get("/big", accept="identity").headers
+
+def test_streams_are_compressed_incrementally_except_event_streams():
+    response = _get("/chunked")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "line of text\n" * 1000
+
+    response = _get("/events")
+    assert "content-encoding" not in response.headers
+    assert response.text.startswith("data: ")
+
+def test_compressed_body_is_standard_gzip():
+    async def call():
+        transport = httpx.ASGITransport(app=_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("GET", "/big", headers={"Accept-Encoding": "gzip"}) as response:
+                return b"".join([chunk async for chunk in response.aiter_raw()])
+    assert gzip.decompress(asyncio.run(call())).startswith(b'{"value":')
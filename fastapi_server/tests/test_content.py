@@ -0,0 +1,91 @@
+"""
+Tests for the $metadata cache and the generic content tools
+"""
+import asyncio
+
+import pytest
+
+from tahubu_sf import models
+from tahubu_sf.api import content
+from tahubu_sf.utils import odata_metadata, odata_query, workers
+from tahubu_sf.utils.metrics import metrics
+
+def test_queries_select_short_properties_of_any_type(mock_sitefinity):
+    mock = mock_sitefinity()
+
+    async def scenario():
+        news = await content.query_content("newsitems", format="json", max_items=1)
+        products = await content.query_content("products", filter="Price ge 0", select="Title,Price", format="json")
+        return news, products
+
+    news, products = asyncio.run(scenario())
+    assert "Title" in news["value"][0] and "Content" not in news["value"][0] and "Tags" not in news["value"][0]
+    assert len(products) == 5 and set(products[0]) == {"Title", "Price"}
+    assert mock.state.requests["GET $metadata"] == 1
+
+def test_invalid_calls_fail_before_reaching_sitefinity(mock_sitefinity):
+    mock = mock_sitefinity()
+
+    async def scenario():
+        with pytest.raises(ValueError, match="Nope is not a property"):
+            await content.query_content("products", filter="Nope eq 1")
+        with pytest.raises(ValueError, match="Title is required; Price must be a number"):
+            await content.create_content("products", {"Price": "cheap"})
+        with pytest.raises(ValueError, match="Unknown content type"):
+            await content.create_content("product", {"Title": "x"})
+        return await content.create_content("products", {"Title": "New product", "Price": 9.5})
+
+    created = asyncio.run(scenario())
+    assert created["UrlName"] == "new-product"
+    assert mock.state.requests == {"GET $metadata": 1, "POST products": 1}
+
+def test_metadata_is_revalidated(monkeypatch, mock_sitefinity):
+    mock = mock_sitefinity()
+    monkeypatch.setattr(odata_metadata, "ODATA_METADATA_TTL_SECONDS", 0)
+    revalidated = metrics.counter("odata.metadata.revalidated", tenant="default")
+    before = revalidated.snapshot()["value"]
+
+    async def scenario():
+        first = await odata_metadata.get_schema()
+        return first, await odata_metadata.get_schema()
+
+    first, second = asyncio.run(scenario())
+    assert second is first and "products" in first.entity_sets
+    assert mock.state.requests["GET $metadata"] == 2
+    assert revalidated.snapshot()["value"] == before + 1
+
+def test_queries_are_not_capped_at_the_proxy_page_size(monkeypatch, mock_sitefinity):
+    mock_sitefinity(items=80)
+    monkeypatch.setattr(odata_query, "ODATA_PROXY_MAX_TOP", 50)
+
+    async def scenario():
+        everything = await content.query_content("products", select="Id,Title", format="json")
+        first = await content.query_content("products", select="Id,Title", format="json", max_items=60)
+        rest = await content.query_content("products", select="Id,Title", format="json", cursor=first["next_cursor"])
+        return everything, first, rest
+
+    everything, first, rest = asyncio.run(scenario())
+    assert len(everything) == 80
+    assert len(first["value"]) == 60 and first["next_cursor"]
+    assert [item["Id"] for item in first["value"] + rest] == [item["Id"] for item in everything]
+
+def test_dotnet_timestamps_are_valid():
+    published = odata_metadata.PropertyInfo("PublicationDate", "Edm.DateTimeOffset")
+    entity = odata_metadata.EntityInfo("newsitems", "", ("Id",), {"PublicationDate": published})
+    assert odata_metadata.validate_payload(entity, {"PublicationDate": "2024-05-01T09:00:00.1234567Z"}) == []
+    assert odata_metadata.parse_datetime_offset("2024-05-01T09:00:00.1234567Z").microsecond == 123456
+    assert odata_metadata.validate_payload(entity, {"PublicationDate": "2024-05-01T25:00:00Z"}) == [
+        "PublicationDate is not a valid date and time"
+    ]
+
+def test_large_queries_render_in_a_process_pool(monkeypatch, mock_sitefinity):
+    mock_sitefinity(items=10)
+    monkeypatch.setattr(workers, "WORKER_POOL_KIND", "process")
+    monkeypatch.setattr(workers, "WORKER_POOL_SIZE", 1)
+    monkeypatch.setattr(models, "OFFLOAD_MIN_ITEMS", 5)
+    workers.shutdown_workers()
+    try:
+        products = asyncio.run(content.query_content("products", select="Title,Price", format="json"))
+    finally:
+        workers.shutdown_workers()
+    assert len(products) == 10 and set(products[0]) == {"Title", "Price"}
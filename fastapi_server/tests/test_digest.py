@@ -0,0 +1,48 @@
+"""
+Tests for the site digest
+"""
+import asyncio
+
+from tahubu_sf.api import digest
+from tahubu_sf.api.blog_posts import create_blog_post
+
+def test_digest_counts_container_items(mock_sitefinity):
+    mock_sitefinity(items=20)
+
+    async def scenario():
+        return await digest.get_site_digest(format="json", max_chars=100_000)
+
+    sections = {part["section"]: part for part in asyncio.run(scenario())["sections"]}
+    assert list(sections) == [section.name for section in digest.SECTIONS]
+    blogs = sections["blogs"]
+    assert blogs["summary"] == "5 blogs, 20 posts"
+    assert sum(entry["count"] for entry in blogs["entries"]) == 20
+    assert len(sections["recent"]["entries"]) == digest.DIGEST_MAX_ENTRIES
+
+def test_digest_fits_its_size_limit(mock_sitefinity):
+    mock_sitefinity(items=20)
+
+    async def scenario():
+        return await digest.get_site_digest(), await digest.get_site_digest(max_chars=600)
+
+    full, short = asyncio.run(scenario())
+    assert full.startswith("Sites: ") and "Blogs: 5 blogs, 20 posts" in full
+    assert len(short) <= 600 and "... and" in short
+
+def test_writes_rebuild_only_affected_sections(mock_sitefinity):
+    mock_sitefinity(items=20)
+
+    async def scenario():
+        await digest.get_site_digest()
+        site_digest = next(iter(digest.digests.digests.values()))
+        built = dict(site_digest.built)
+        blogs = site_digest.sections["blogs"]["entries"]
+        await create_blog_post(title="New", content="<p>x</p>", parent_id=blogs[0]["id"])
+        stale = set(site_digest.stale)
+        await site_digest.refresh()
+        changed = {name for name in built if site_digest.built[name] != built[name]}
+        return stale, changed, site_digest.sections["blogs"]["summary"]
+
+    stale, changed, summary = asyncio.run(scenario())
+    assert stale == changed == {"blogs", "recent"}
+    assert summary == "5 blogs, 21 posts"
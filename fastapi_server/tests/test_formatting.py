@@ -0,0 +1,41 @@
+"""
+Tests for text and JSON rendering of listing tools
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from tahubu_sf.api.albums import get_images
+from tahubu_sf.api.taxonomies import get_taxonomies
+from tahubu_sf.utils.formatting import render
+
+IMAGE = {
+    "Title": "Logo", "EmbedUrl": "https://cdn.test/logo.png", "PublicationDate": "2024-01-01T00:00:00Z",
+    "Extension": ".png", "TotalSize": 2048, "Width": 64, "Height": 32, "AlternativeText": "", "Id": "1",
+}
+
+@pytest.fixture
+def sitefinity(sitefinity_handler):
+    """Answer every request with the given "value" array"""
+    def serve(value):
+        sitefinity_handler(lambda request: httpx.Response(200, json={"value": value}, request=request))
+    return serve
+
+def test_text_output_is_unchanged(sitefinity):
+    sitefinity([IMAGE, IMAGE])
+    expected = (
+        "Title: Logo\n EmbedUrl: https://cdn.test/logo.png\n Publication Date: 2024-01-01T00:00:00Z\n"
+        " Extension: .png\n Total Size: 2048\n Width: 64\n Height: 32\n Alternative Text: \n\n"
+    ) * 2
+    assert asyncio.run(get_images()) == expected
+
+def test_json_output_keeps_types(sitefinity):
+    sitefinity([{"Title": "Tags", "TaxonName": "Tag", "Type": "Flat", "TaxonomySharedWith": 3}])
+    assert asyncio.run(get_taxonomies(format="json")) == [
+        {"Title": "Tags", "TaxonName": "Tag", "Type": "Flat", "UseCount": 3}
+    ]
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported format"):
+        render([], format="xml")
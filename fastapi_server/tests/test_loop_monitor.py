@@ -0,0 +1,40 @@
+"""
+Tests for the event-loop lag monitor
+"""
+import asyncio
+import logging
+import time
+
+from tahubu_sf.utils.loop_monitor import LoopMonitor
+from tahubu_sf.utils.metrics import metrics
+
+def blocking_call():
+    time.sleep(0.25)
+
+def test_blocking_call_is_reported_with_its_stack(caplog):
+    async def scenario():
+        monitor = LoopMonitor(interval_ms=10, threshold_ms=50, dump_stacks=True)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    with caplog.at_level(logging.WARNING, logger="tahubu_sf.utils.loop_monitor"):
+        monitor = asyncio.run(scenario())
+
+    assert monitor.blocked == 1
+    assert monitor.max_lag_ms >= 150
+    assert "blocking_call" in caplog.text
+    assert metrics.snapshot()["event_loop.lag_ms"]["count"] > 0
+
+def test_idle_loop_is_not_reported():
+    async def scenario():
+        monitor = LoopMonitor(interval_ms=10, threshold_ms=200)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    assert asyncio.run(scenario()).blocked == 0
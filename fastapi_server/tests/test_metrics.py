@@ -0,0 +1,44 @@
+"""
+Tests for the metrics registry and upstream phase timing
+"""
+import asyncio
+import logging
+
+import httpx
+
+from tahubu_sf.utils import http
+from tahubu_sf.utils.metrics import MetricsRegistry, Histogram
+
+def test_histogram_percentiles_use_bucket_bounds():
+    """Percentiles are estimated from buckets and never exceed the observed max"""
+    histogram = Histogram(buckets=(10, 100, float("inf")))
+    for value in (1, 2, 3, 50, 500):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["p50"] == 10
+    assert snapshot["p99"] == 500
+
+def test_registry_splits_metrics_by_label():
+    """Labels produce distinct series in the snapshot"""
+    registry = MetricsRegistry()
+    registry.counter("requests", status=200).inc()
+    registry.counter("requests", status=500).inc(2)
+
+    snapshot = registry.snapshot()
+    assert snapshot["requests{status=200}"]["value"] == 1
+    assert snapshot["requests{status=500}"]["value"] == 2
+
+def test_slow_calls_are_logged_with_phases(monkeypatch, caplog, sitefinity_handler):
+    """A call above the threshold produces a structured slow-call record"""
+    sitefinity_handler(lambda request: httpx.Response(200, json={"value": [1, 2, 3]}))
+    monkeypatch.setattr(http, "SLOW_REQUEST_THRESHOLD_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger=http.logger.name):
+        asyncio.run(http.make_request("http://sitefinity.test/api/default/newsitems"))
+
+    records = [r.getMessage() for r in caplog.records if "Slow Sitefinity call" in r.getMessage()]
+    assert len(records) == 1
+    assert '"total":' in records[0]
+    assert '"response_bytes": 17' in records[0]
@@ -0,0 +1,66 @@
+"""
+Tests for the mock Sitefinity server
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mock_sitefinity import MockConfig, create_app
+from mock_sitefinity.odata import ODataError, parse_filter
+from tahubu_sf.api.news import get_news
+
+def test_query_options_and_next_link():
+    client = TestClient(create_app(MockConfig(items=30, page_size=10)))
+    data = client.get("/api/default/newsitems", params={"$count": "true", "$select": "Id,Title", "$top": "15"}).json()
+    assert data["@odata.count"] == 30
+    assert len(data["value"]) == 10 and set(data["value"][0]) == {"Id", "Title"}
+
+    rest = client.get(data["@odata.nextLink"]).json()
+    assert len(rest["value"]) == 5 and "@odata.nextLink" not in rest
+
+    title = data["value"][3]["Title"]
+    found = client.get("/api/default/newsitems", params={"$filter": f"Title eq '{title}' or contains(Title,'zzz')"}).json()
+    assert [item["Title"] for item in found["value"]] == [title]
+    assert client.get("/api/default/newsitems", params={"$filter": "Title eq"}).status_code == 400
+
+def test_filter_expressions():
+    item = {"Title": "It's here", "Views": 10, "Draft": False}
+    assert parse_filter("Views gt 5 and not (Draft eq true)")(item)
+    assert parse_filter("startswith(Title,'It''s')")(item)
+    assert not parse_filter("Views le 9 or endswith(Title,'x')")(item)
+    with pytest.raises(ODataError):
+        parse_filter("Views like 5")
+
+def test_items_etags_creates_and_batch():
+    client = TestClient(create_app(MockConfig(items=3)))
+    post = client.get("/api/default/blogposts").json()["value"][0]
+    blogs = {blog["Id"] for blog in client.get("/api/default/blogs").json()["value"]}
+    assert post["ParentId"] in blogs
+
+    response = client.get(f"/api/default/blogposts({post['Id']})")
+    assert response.json()["Id"] == post["Id"]
+    assert client.get(f"/api/default/blogposts({post['Id']})", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    created = client.post("/sf/system/newsitems", json={"Title": "New"})
+    assert created.status_code == 201
+    batch = client.post("/api/default/$batch", json={"requests": [
+        {"id": "1", "method": "GET", "url": "newsitems?$count=true&$top=0"},
+        {"id": "2", "method": "GET", "url": "nothing"},
+    ]}).json()["responses"]
+    assert batch[0]["body"]["@odata.count"] == 4
+    assert batch[1]["status"] == 404
+
+def test_injected_throttling_and_runtime_config():
+    client = TestClient(create_app(MockConfig(throttle_rate=1.0, retry_after=7)))
+    response = client.get("/api/default/newsitems")
+    assert response.status_code == 429 and response.headers["retry-after"] == "7"
+    client.put("/_mock/config", json={"throttle_rate": 0})
+    assert client.get("/api/default/newsitems").status_code == 200
+    assert client.put("/_mock/config", json={"items": 5}).status_code == 400
+
+def test_tools_run_against_the_mock_in_process(mock_sitefinity):
+    mock = mock_sitefinity()
+    text = asyncio.run(get_news())
+    assert text.count("Title: ") == 5
+    assert mock.state.requests["GET newsitems"] == 1
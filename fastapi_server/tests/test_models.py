@@ -0,0 +1,36 @@
+"""
+Tests for typed content records
+"""
+import asyncio
+
+import httpx
+
+from tahubu_sf.api.news import get_news
+from tahubu_sf.models import NewsItem, Parent, Taxonomy
+
+NEWS = {
+    "Id": "1", "Title": "Hello", "Summary": "Short", "Author": "Ann", "PublicationDate": "2024-01-01T00:00:00Z",
+    "Content": "<p>unused</p>", "UrlName": "hello", "Tags": [],
+}
+
+def test_records_keep_only_declared_fields():
+    item = NewsItem.from_odata(NEWS)
+    assert not hasattr(item, "__dict__")
+    assert item.title == "Hello" and item.publication_date == "2024-01-01T00:00:00Z"
+    assert item.to_dict() == {"Title": "Hello", "Summary": "Short", "Author": "Ann", "PublicationDate": "2024-01-01T00:00:00Z"}
+
+def test_select_lists_record_properties():
+    assert NewsItem.select() == "Title,Summary,Author,PublicationDate"
+    assert Parent.select() == "Id,Title"
+    assert Taxonomy.select() is None
+
+def test_tools_request_only_needed_properties(sitefinity_handler):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"value": [NEWS]}, request=request)
+
+    sitefinity_handler(handler)
+    assert asyncio.run(get_news()) == "Title: Hello\n Summary: Short\n Author: Ann\n Publication Date: 2024-01-01T00:00:00Z\n\n"
+    assert seen[0].url.params["$select"] == "Title,Summary,Author,PublicationDate"
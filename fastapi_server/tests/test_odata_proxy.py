@@ -0,0 +1,58 @@
+"""
+Tests for the read-only OData proxy
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_server import main
+from tahubu_sf.config.tenants import current_tenant
+from tahubu_sf.utils.odata_query import ODataQueryError, normalize_filter, normalize_query
+
+def test_equivalent_queries_normalize_alike():
+    first = normalize_query([
+        ("$filter", "contains( Title ,'A  b')  AND (Views GT 5)"),
+        ("$select", "Title, Id"),
+        ("$orderby", "Title asc,  PublicationDate DESC"),
+        ("$skip", "0"),
+        ("$count", "False"),
+    ])
+    second = normalize_query([
+        ("$select", "Id,Title"),
+        ("$filter", "CONTAINS(Title,'A  b') and (Views gt 5)"),
+        ("$orderby", "Title,PublicationDate desc"),
+    ])
+    assert first == second == {
+        "$filter": "contains(Title,'A  b') and (Views gt 5)",
+        "$select": "Id,Title",
+        "$orderby": "Title,PublicationDate desc",
+        "$top": "500",
+    }
+    assert normalize_filter("not (Id eq 1)") == "not (Id eq 1)"
+
+@pytest.mark.parametrize("items", [
+    [("$expand", "Tags")],
+    [("$top", "1"), ("$top", "2")],
+    [("$top", "100000")],
+    [("$filter", "Title eq 'a'; drop")],
+    [("$filter", "(Title eq 'a'")],
+    [("$select", "Title,1bad")],
+])
+def test_invalid_queries_are_rejected(items):
+    with pytest.raises(ODataQueryError):
+        normalize_query(items)
+
+def test_proxy_shares_cached_responses(monkeypatch, mock_sitefinity):
+    mock = mock_sitefinity(items=20)
+    monkeypatch.setattr(current_tenant(), "cache_ttl_seconds", 60)
+    client = TestClient(main.app)
+    first = client.get("/api/odata/newsitems", params={"$select": "Title,Id", "$top": "3", "$orderby": "Title"})
+    second = client.get("/api/odata/newsitems", params={"$orderby": "Title asc", "$top": "3", "$select": "Id, Title"})
+    unknown = client.get("/api/odata/secrets")
+    invalid = client.get("/api/odata/newsitems", params={"$format": "xml"})
+
+    assert first.status_code == 200 and first.content == second.content
+    items = first.json()["value"]
+    assert len(items) == 3 and set(items[0]) == {"Id", "Title"}
+    assert [item["Title"] for item in items] == sorted(item["Title"] for item in items)
+    assert mock.state.requests == {"GET newsitems": 1}
+    assert unknown.status_code == 404 and invalid.status_code == 400
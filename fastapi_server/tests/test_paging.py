@@ -0,0 +1,64 @@
+"""
+Tests for size budgets and continuation cursors on the listing tools
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from tahubu_sf.api.shared_content import SHAREDCONTENT_CONTENT_ENDPOINT, get_shared_content
+from tahubu_sf.utils.paging import Budget, decode_cursor, encode_cursor
+
+ITEMS = [
+    {"Title": f"Item {i}", "Content": "<p>" + "x" * 200 + "</p>", "PublicationDate": "2024-01-01T00:00:00Z"}
+    for i in range(10)
+]
+
+@pytest.fixture
+def upstream(sitefinity_handler):
+    """Serve ITEMS honouring $skip and $top, recording each request"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        skip = int(request.url.params.get("$skip", 0))
+        top = int(request.url.params.get("$top", len(ITEMS)))
+        return httpx.Response(200, json={"value": ITEMS[skip:skip + top]}, request=request)
+
+    sitefinity_handler(handler)
+    return seen
+
+def test_cursor_round_trip_and_rejection():
+    cursor = encode_cursor("SharedContent:/api/default/contentitems", 40)
+    assert decode_cursor(cursor, "SharedContent:/api/default/contentitems") == 40
+    assert decode_cursor(None, "anything") == 0
+    with pytest.raises(ValueError, match="different collection"):
+        decode_cursor(cursor, "NewsItem:/api/default/newsitems")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not-a-cursor!", "anything")
+    assert Budget(max_tokens=100, max_chars=1000).char_limit == 400
+    with pytest.raises(ValueError):
+        Budget(max_items=0)
+
+def test_max_items_pages_through_collection(upstream):
+    page = asyncio.run(get_shared_content(format="json", max_items=4))
+    assert [item["Title"] for item in page["value"]] == ["Item 0", "Item 1", "Item 2", "Item 3"]
+    assert upstream[0].url.params["$top"] == "5"
+
+    titles = [item["Title"] for item in page["value"]]
+    while isinstance(page, dict):
+        page = asyncio.run(get_shared_content(format="json", max_items=4, cursor=page["next_cursor"]))
+        titles += [item["Title"] for item in (page["value"] if isinstance(page, dict) else page)]
+    assert titles == [item["Title"] for item in ITEMS]
+    assert upstream[-1].url.params["$skip"] == "8"
+
+def test_max_chars_truncates_text_with_cursor(upstream):
+    text = asyncio.run(get_shared_content(max_chars=600))
+    assert text.count("Title: ") == 2
+    assert "[Showing items 1-2." in text
+    cursor = text.rsplit('cursor="', 1)[1].split('"')[0]
+    assert decode_cursor(cursor, f"SharedContent:{SHAREDCONTENT_CONTENT_ENDPOINT}") == 2
+
+    # A single item larger than the budget is clipped rather than dropped
+    clipped = asyncio.run(get_shared_content(format="json", max_chars=60))
+    assert len(clipped["value"]) == 1 and clipped["value"][0]["Content"].endswith("…")
@@ -0,0 +1,48 @@
+"""
+Tests for forwarding Sitefinity JSON without decoding it
+"""
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from fastapi_server import main
+from tahubu_sf.api.blog_posts import get_blog_post_by_id
+from tahubu_sf.config.tenants import current_tenant
+from tahubu_sf.utils import http
+
+def test_blog_post_bytes_are_forwarded_unchanged(mock_sitefinity):
+    mock_sitefinity()
+    client = TestClient(main.app)
+    post_id = client.post("/api/run-tool", json={"name": "getBlogPosts", "params": {}}).json()["result"]["posts"][0]["Id"]
+    expected = asyncio.run(get_blog_post_by_id(post_id))
+
+    wrapped = client.post("/api/run-tool", json={"name": "getBlogPostById", "params": {"post_id": post_id}})
+    raw = client.get(f"/api/blog-posts/{post_id}", headers={"Accept-Encoding": "identity"})
+
+    assert wrapped.status_code == 200 and wrapped.json() == {"result": expected}
+    assert raw.status_code == 200 and raw.headers["content-type"].startswith("application/json")
+    assert json.loads(raw.content) == expected
+
+def test_cached_bodies_are_shared(monkeypatch, sitefinity_handler):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=b'{"Id": "1"}', headers={"Content-Type": "application/json"})
+
+    monkeypatch.setattr(current_tenant(), "cache_ttl_seconds", 60)
+    sitefinity_handler(handler)
+
+    async def read():
+        raw = await http.make_raw_request("http://sitefinity.test/api/default/blogposts(1)")
+        return b"".join([chunk async for chunk in raw]), raw.length
+
+    async def main_():
+        return await asyncio.gather(read(), read(), read())
+
+    results = asyncio.run(main_())
+
+    assert results == [(b'{"Id": "1"}', 11)] * 3
+    assert len(requests) == 1
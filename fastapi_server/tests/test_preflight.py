@@ -0,0 +1,68 @@
+"""
+Tests for the pre-flight checks of new items and the retry policy
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from tahubu_sf.api.blog_posts import create_blog_post, get_parent_blogs
+from tahubu_sf.api.events import create_event, get_calendars
+from tahubu_sf.utils import http
+
+def test_unknown_parent_is_rejected_without_posting(mock_sitefinity):
+    mock = mock_sitefinity(items=10)
+
+    async def scenario():
+        with pytest.raises(Exception, match="is not an item of blogs"):
+            await create_blog_post(title="Orphan", content="<p>x</p>", parent_id="2b5e4f1c-0000-4000-8000-000000000000")
+        with pytest.raises(Exception, match="ParentId must be a GUID"):
+            await create_blog_post(title="Orphan", content="<p>x</p>", parent_id="not-a-guid")
+
+    asyncio.run(scenario())
+    assert "POST blogposts" not in mock.state.requests
+
+def test_url_name_must_be_unique_under_its_parent(mock_sitefinity):
+    mock = mock_sitefinity(items=10)
+
+    async def scenario():
+        blog_id = next(iter(await get_parent_blogs()))
+        await create_blog_post(title="Launch notes", content="<p>x</p>", parent_id=blog_id)
+        with pytest.raises(Exception, match="UrlName 'launch-notes' is already used in blogposts"):
+            await create_blog_post(title="Launch Notes", content="<p>y</p>", parent_id=blog_id)
+
+    asyncio.run(scenario())
+    assert mock.state.requests["POST blogposts"] == 1
+    # The created post was added to the cached index; the conflict is confirmed with one query
+    assert mock.state.requests["GET blogposts"] == 2
+
+def test_event_dates_are_checked(mock_sitefinity):
+    mock = mock_sitefinity(items=10)
+
+    async def scenario():
+        calendar_id = next(iter(await get_calendars()))
+        with pytest.raises(Exception, match="EventStart must be an ISO 8601 date"):
+            await create_event("Talk", "s", "<p>x</p>", "next tuesday", "2024-05-01T10:00:00Z", calendar_id)
+        with pytest.raises(Exception, match="EventEnd must not be before EventStart"):
+            await create_event("Talk", "s", "<p>x</p>", "2024-05-01T10:00:00Z", "2024-05-01T09:00:00Z", calendar_id)
+        with pytest.raises(Exception, match="EventEnd must not be before EventStart"):
+            await create_event("Talk", "s", "<p>x</p>", "2024-05-01T10:00:00.1234567Z", "2024-05-01T10:00:00.1Z", calendar_id)
+        return await create_event("Talk", "s", "<p>x</p>", "2024-05-01T09:00:00+02:00", "2024-05-01T10:00:00Z", calendar_id)
+
+    created = asyncio.run(scenario())
+    assert created["Id"] and mock.state.requests["POST events"] == 1
+
+@pytest.mark.parametrize("status, attempts", [(400, 1), (404, 1), (503, http.MAX_RETRIES)])
+def test_only_transient_errors_are_retried(monkeypatch, sitefinity_handler, status, attempts):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(status, json={"error": {"message": "nope"}})
+
+    monkeypatch.setattr(http, "MIN_WAIT", 0)
+    monkeypatch.setattr(http, "MAX_WAIT", 0)
+    sitefinity_handler(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(http.make_request("https://sitefinity.test/api/default/newsitems"))
+    assert len(calls) == attempts
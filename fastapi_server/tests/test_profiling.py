@@ -0,0 +1,71 @@
+"""
+Tests for on-demand profiling of tool calls
+"""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from fastapi_server import main
+from tahubu_sf.utils import profiling
+
+def busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+async def tool_call():
+    busy(0.05)
+    await asyncio.sleep(0.05)
+    return "done"
+
+async def other_task():
+    busy(0.05)
+
+def test_samples_are_attributed_to_the_profiled_call():
+    async def scenario():
+        other = asyncio.create_task(other_task())
+        result = await profiling.run_profiled("tool_call", tool_call, "req-1")
+        await other
+        return result
+
+    result, profile = asyncio.run(scenario())
+    assert result == "done" and profiling.profiles.get("req-1") is profile
+    stacks = profile.collapsed()
+    assert "test_profiling.tool_call;fastapi_server.tests.test_profiling.busy " in stacks
+    assert "other_task" not in stacks
+    assert profile.samples[profiling.WAITING_FRAME] > 0
+
+def test_run_tool_profiles_only_with_the_token(monkeypatch, mock_sitefinity):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "letmein")
+    monkeypatch.setattr(main, "PROFILING_TOKEN", "letmein")
+    mock_sitefinity()
+    client = TestClient(main.app)
+    plain = client.post("/api/run-tool", json={"name": "getNews", "params": {}})
+    assert plain.status_code == 200 and "x-profile-id" not in plain.headers
+
+    profiled = client.post("/api/run-tool", json={"name": "getNews", "params": {}},
+                           headers={"X-Profile-Token": "letmein", "X-Request-ID": "abc123"})
+    assert profiled.headers["x-profile-id"] == "abc123"
+
+    assert client.get("/admin/profiles").status_code == 403
+    listed = client.get("/admin/profiles", headers={"X-Profile-Token": "letmein"}).json()
+    assert listed[0]["id"] == "abc123" and listed[0]["tool"] == "getNews"
+    stacks = client.get("/admin/profiles/abc123", headers={"X-Profile-Token": "letmein"})
+    assert stacks.headers["content-type"].startswith("text/plain")
+
+def test_profile_endpoints_hidden_when_profiling_is_off():
+    assert TestClient(main.app).get("/admin/profiles").status_code == 404
+
+def test_unsafe_or_repeated_request_ids_get_a_random_profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "profiles", profiling.ProfileStore(directory=str(tmp_path / "profiles")))
+
+    async def profile(request_id):
+        return (await profiling.run_profiled("tool_call", other_task, request_id))[1].id
+
+    first, repeated, escaping = (asyncio.run(profile(request_id)) for request_id in ("req-2", "req-2", "../../x"))
+    assert first == "req-2" and repeated != "req-2" and escaping != "../../x"
+    assert sorted(path.name for path in tmp_path.rglob("*.collapsed")) == sorted(
+        f"{profile_id}.collapsed" for profile_id in (first, repeated, escaping)
+    )
+    assert not (tmp_path / "x.collapsed").exists()
@@ -0,0 +1,74 @@
+"""
+Tests for content resources and their change notifications
+"""
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+from mcp.client.subscriptions import listen
+from mcp.server.subscriptions import ResourcesListChanged, ResourceUpdated
+
+from tahubu_sf import resources
+from tahubu_sf.app import create_app
+from tahubu_sf.config.tenants import current_tenant
+
+def test_writes_notify_collection_listeners(monkeypatch, mock_sitefinity):
+    mock_sitefinity()
+    monkeypatch.setattr(current_tenant(), "cache_ttl_seconds", 60)
+
+    async def scenario():
+        async with Client(create_app()) as client:
+            blogs = json.loads((await client.read_resource("sitefinity://blogs"))[0].text)["value"]
+            blog = json.loads((await client.read_resource(blogs[0]["uri"]))[0].text)
+            async with listen(client.session, resources_list_changed=True,
+                              resource_subscriptions=["sitefinity://blogposts"]) as subscription:
+                await client.read_resource("sitefinity://blogposts")
+                await client.call_tool("create_blog_post", {"title": "New", "content": "<p>x</p>", "parent_id": blog["Id"]})
+                events = []
+                async for event in subscription:
+                    events.append(event)
+                    if len(events) == 2:
+                        return blog, events
+
+    try:
+        blog, events = asyncio.run(asyncio.wait_for(scenario(), 10))
+    finally:
+        resources.watcher.watched.clear()
+        resources.watcher._snapshots.clear()
+
+    assert blog["Title"] and "@odata.context" not in blog
+    assert events == [ResourceUpdated("sitefinity://blogposts"), ResourcesListChanged()]
+
+def test_modified_items_are_reported(monkeypatch):
+    indexes = iter([
+        [{"Id": "a", "Title": "A", "LastModified": "1"}, {"Id": "b", "Title": "B", "LastModified": "1"}],
+        [{"Id": "a", "Title": "A", "LastModified": "2"}, {"Id": "b", "Title": "B", "LastModified": "1"}],
+        [{"Id": "a", "Title": "A", "LastModified": "2"}, {"Id": "b", "Title": "B", "LastModified": "1"}],
+    ])
+
+    async def read_index(collection, refresh=False):
+        return next(indexes)
+
+    published = []
+
+    class Bus:
+        async def publish(self, event):
+            published.append(event)
+
+    monkeypatch.setattr(resources, "read_index", read_index)
+    watcher = resources.ResourceWatcher()
+    watcher.buses.append(Bus())
+
+    async def scenario():
+        return [await watcher.refresh("newsitems") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [0, 2, 0]
+    assert published == [ResourceUpdated("sitefinity://newsitems/a"), ResourceUpdated("sitefinity://newsitems")]
+
+def test_item_ids_must_be_guids(mock_sitefinity):
+    mock = mock_sitefinity()
+    for item_id in ("1)?$expand=Owner", "x"):
+        with pytest.raises(ValueError, match="Invalid item id"):
+            asyncio.run(resources.read_item("blogposts", item_id))
+    assert "GET blogposts" not in mock.state.requests
@@ -0,0 +1,58 @@
+"""
+Tests for incremental parsing of streamed OData collections
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from tahubu_sf.api.lists import get_list_items
+from tahubu_sf.utils import http
+from tahubu_sf.utils.streaming import ValueArrayParser
+
+DOCUMENT = {
+    "@odata.context": "https://sitefinity.test/api/default/$metadata#listitems",
+    "value": [
+        {"Title": 'Quotes "inside" and \\ brackets ] }', "Tags": [{"Id": "["}]},
+        {"Title": "Ünïcode \\\\", "Content": "<p class=\"x\">{}</p>"},
+    ],
+    "@odata.nextLink": "listitems?$skip=2",
+}
+
+def test_items_are_parsed_across_any_chunk_boundary():
+    body = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    for size in (1, 2, 3, 7, len(body)):
+        parser = ValueArrayParser()
+        items = []
+        for start in range(0, len(body), size):
+            items += parser.feed(body[start:start + size])
+        parser.close()
+        assert items == DOCUMENT["value"]
+        assert parser.metadata() == {
+            "@odata.context": DOCUMENT["@odata.context"],
+            "@odata.nextLink": DOCUMENT["@odata.nextLink"],
+        }
+
+def test_truncated_body_is_an_error():
+    parser = ValueArrayParser()
+    parser.feed(json.dumps(DOCUMENT).encode()[:60])
+    with pytest.raises(ValueError, match="before the \"value\" array was complete"):
+        parser.close()
+
+def test_streaming_tool_retries_before_first_item(monkeypatch, sitefinity_handler):
+    """A failed attempt is retried and the streamed items render like buffered ones"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if len(seen) == 1:
+            return httpx.Response(503, request=request)
+        return httpx.Response(200, json=DOCUMENT | {"value": [{"Title": "A", "Content": "B", "PublicationDate": "C"}]})
+
+    sitefinity_handler(handler)
+    monkeypatch.setattr(http, "MIN_WAIT", 0)
+    monkeypatch.setattr(http, "MAX_WAIT", 0)
+
+    assert asyncio.run(get_list_items()) == "Title: A\n Content: B\n Publication Date: C\n\n"
+    assert len(seen) == 2
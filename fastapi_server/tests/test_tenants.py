@@ -0,0 +1,74 @@
+"""
+Tests for tenant selection, per-tenant caching and request coalescing
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from tahubu_sf.config import settings
+from tahubu_sf.config.tenants import TenantRegistry, set_registry, use_tenant
+from tahubu_sf.utils import http
+from tahubu_sf.utils.cache import ResponseCache
+
+@pytest.fixture
+def tenants(tmp_path, monkeypatch, sitefinity_handler):
+    """Configure two tenants with caching enabled and a mock Sitefinity transport"""
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({
+        "tenants": {
+            "alpha": {"site_prefix": "http://alpha.test", "cache_ttl_seconds": 60},
+            "beta": {"site_prefix": "http://beta.test/", "auth_type": "apikey", "api_key_env": "BETA_KEY"},
+        }
+    }))
+    monkeypatch.setenv("BETA_KEY", "secret")
+    set_registry(TenantRegistry.from_file(str(path)))
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"value": [{"host": request.url.host}]}, request=request)
+
+    sitefinity_handler(handler)
+    yield seen
+    set_registry(None)
+
+def test_requests_are_routed_to_the_selected_tenant(tenants):
+    """Module endpoints are rebased onto the tenant, with that tenant's credentials"""
+    url = f"{settings.ENDPOINTS.content}/newsitems"
+
+    async def main():
+        with use_tenant("beta"):
+            return await http.make_request(url)
+
+    assert asyncio.run(main()) == {"value": [{"host": "beta.test"}]}
+    assert str(tenants[0].url) == "http://beta.test/api/default/newsitems"
+    assert tenants[0].headers["X-SF-APIKEY"] == "secret"
+
+def test_unknown_tenant_is_rejected(tenants):
+    with pytest.raises(KeyError, match="Unknown tenant: gamma"):
+        with use_tenant("gamma"):
+            pass
+
+def test_cached_reads_are_coalesced_and_invalidated(tenants):
+    """Concurrent reads share one upstream call and a POST drops the cached collection"""
+    url = f"{settings.ENDPOINTS.content}/newsitems"
+
+    async def main():
+        with use_tenant("alpha"):
+            await asyncio.gather(*(http.make_request(url, params={"$top": 5}) for _ in range(5)))
+            await http.make_request(url, params={"$top": 5})
+            await http.make_post_request(url, {"Title": "New"})
+            await http.make_request(url, params={"$top": 5})
+
+    asyncio.run(main())
+    assert [request.method for request in tenants] == ["GET", "POST", "GET"]
+
+def test_cache_namespaces_are_isolated():
+    cache = ResponseCache()
+    cache.set("alpha", "key", 1, ttl=60)
+    assert cache.get("beta", "key") is None
+    assert cache.invalidate("alpha") == 1
+    assert len(cache) == 0
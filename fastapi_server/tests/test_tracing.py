@@ -0,0 +1,94 @@
+"""
+Tests for span tracing and trace-context propagation
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from tahubu_sf.utils import http
+from tahubu_sf.utils.tracing import (
+    InMemorySpanExporter,
+    SpanExporter,
+    configure_tracing,
+    parse_traceparent,
+    start_span,
+    traced_tool,
+)
+
+@pytest.fixture
+def exporter():
+    """Install an in-memory exporter for the duration of a test"""
+    exporter = InMemorySpanExporter()
+    configure_tracing(exporter)
+    yield exporter
+    configure_tracing(None)
+
+@pytest.fixture
+def flaky_sitefinity(monkeypatch, sitefinity_handler):
+    """Route the HTTP client to a mock transport that fails once, then succeeds"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if len(seen) == 1:
+            return httpx.Response(503, request=request)
+        return httpx.Response(200, json={"value": []}, request=request)
+
+    sitefinity_handler(handler)
+    monkeypatch.setattr(http, "MIN_WAIT", 0)
+    monkeypatch.setattr(http, "MAX_WAIT", 0)
+    return seen
+
+def test_spans_nest_under_parent(exporter):
+    """Child spans share the trace id and point to their parent"""
+    with start_span("outer") as outer:
+        with start_span("inner") as inner:
+            pass
+
+    assert [s.name for s in exporter.spans] == ["inner", "outer"]
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert outer.duration_ms is not None
+
+def test_disabled_tracing_yields_none():
+    """Without an exporter spans are not created"""
+    configure_tracing(None)
+    with start_span("noop") as span:
+        assert span is None
+
+def test_incoming_traceparent_is_continued(exporter):
+    """A remote traceparent becomes the parent of the root span"""
+    header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    with start_span("root", traceparent=header) as span:
+        pass
+
+    assert span.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert span.parent_id == "00f067aa0ba902b7"
+    assert parse_traceparent("garbage") is None
+
+def test_make_request_records_each_retry_attempt(exporter, flaky_sitefinity):
+    """Every tenacity attempt gets its own span and propagates the trace context"""
+    tool = traced_tool(http.make_request)
+    result = asyncio.run(tool("http://sitefinity.test/api/default/newsitems"))
+
+    assert result == {"value": []}
+    names = [s.name for s in exporter.spans]
+    assert names == ["sitefinity.attempt", "sitefinity.attempt", "sitefinity.request", "tool.make_request"]
+
+    first, second, request_span, tool_span = exporter.spans
+    assert first.status == "error"
+    assert first.attributes["status_code"] == 503
+    assert second.attributes["attempt"] == 2
+    assert request_span.attributes["attempts"] == 2
+    assert request_span.parent_id == tool_span.span_id
+
+    sent = parse_traceparent(flaky_sitefinity[1].headers["traceparent"])
+    assert sent == {"trace_id": second.trace_id, "span_id": second.span_id}
+
+def test_exporters_must_implement_export():
+    class Incomplete(SpanExporter):
+        pass
+
+    with pytest.raises(TypeError, match="export"):
+        Incomplete()
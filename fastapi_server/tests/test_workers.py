@@ -0,0 +1,43 @@
+"""
+Tests for HTML text extraction and the worker pool
+"""
+import asyncio
+import threading
+
+from tahubu_sf.api.blog_posts import summarize_posts
+from tahubu_sf.utils import workers
+from tahubu_sf.utils.html_text import html_to_text
+
+def test_html_to_text():
+    html = "<h1>Title</h1><p>Caf&eacute; &amp; <b>bar</b><br>next</p><style>p{}</style><script>x<y</script>end"
+    assert html_to_text(html) == "Title Café & bar next end"
+    assert html_to_text("<p>" + "word " * 10000 + "</p>", limit=9) == "word word"
+
+def test_limited_extraction_looks_past_markup():
+    html = "<script>" + "x" * 5000 + "</script><!-- note --><p>Hello &amp; welcome</p>" + "<p>more</p>" * 1000
+    assert html_to_text(html, limit=15) == "Hello & welcome"
+    assert html_to_text('<p>Cut <a href="https://example.com/a-very-long-link">', limit=10) == "Cut"
+
+def post(summary: str, content: str) -> dict:
+    return {"Id": "1", "PublicationDate": "2024-01-01T00:00:00Z", "Title": "Post", "ItemDefaultUrl": "/post",
+            "AllowComments": True, "Summary": summary, "ParentId": "blog", "Content": content}
+
+def test_summaries_use_the_start_of_the_content():
+    posts = summarize_posts([
+        post("", "<p>" + "x" * 150 + "</p>"),
+        post("", "<p>Hi <i>there</i></p>"),
+        post("Kept", "<p>Ignored</p>"),
+    ])
+    assert [post["Summary"] for post in posts] == ["x" * 100 + "...", "Hi there", "Kept"]
+
+def test_offload_runs_large_inputs_in_the_pool(monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_POOL_KIND", "thread")
+    monkeypatch.setattr(workers, "WORKER_POOL_SIZE", 1)
+    workers.shutdown_workers()
+    try:
+        small = asyncio.run(workers.offload(threading.current_thread, size=1, threshold=10))
+        large = asyncio.run(workers.offload(threading.current_thread, size=10, threshold=10))
+    finally:
+        workers.shutdown_workers()
+    assert small is threading.main_thread()
+    assert large.name.startswith("tahubu-worker")
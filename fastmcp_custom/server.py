@@ -19,31 +19,21 @@ if project_root not in sys.path:
 # Now import from the actual fastmcp package (not our local one)
 try:
     from fastmcp import FastMCP
+    from starlette.middleware import Middleware
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse
 except ImportError:
     print("❌ FastMCP library not found. Please install with: pip install fastmcp")
     sys.exit(1)
 
-# Import all existing tools from tahubu_sf
+# Import the tool catalog from tahubu_sf
+from tahubu_sf.app import lifespan
 from tahubu_sf.config.settings import APP_NAME
-from tahubu_sf.api.news import get_news, create_news_item
-from tahubu_sf.api.blog_posts import create_blog_post, get_blog_posts, get_blog_post_by_id, get_parent_blogs
-from tahubu_sf.api.pages import get_pages, get_page_templates
-from tahubu_sf.api.sites import get_sites
-from tahubu_sf.api.lists import get_list_items
-from tahubu_sf.api.list_items import create_list_item, get_parent_lists
-from tahubu_sf.api.calendars import get_events
-from tahubu_sf.api.events import get_calendars, create_event
-from tahubu_sf.api.shared_content import get_shared_content
-from tahubu_sf.api.albums import get_images
-from tahubu_sf.api.images import create_image, get_albums
-from tahubu_sf.api.document_libraries import get_documents
-from tahubu_sf.api.documents import create_document, get_document_libraries
-from tahubu_sf.api.videos import create_video, get_video_libraries
-from tahubu_sf.api.video_libraries import get_videos
-from tahubu_sf.api.search_indexes import get_search_indexes
-from tahubu_sf.api.taxonomies import get_taxonomies
-from tahubu_sf.api.section_presets import get_section_presets
-from tahubu_sf.api.forms import get_forms
+from tahubu_sf.catalog import catalog_tools
+from tahubu_sf.resources import add_resources
+from tahubu_sf.utils.tracing import traced_tool
+from tahubu_sf.utils.profiling import PROFILE_HEADER, PROFILING_TOKEN, profiled_tool, profiles, profiling_authorized
+from tahubu_sf.utils.compression import CompressionMiddleware, COMPRESSION_MIN_BYTES
 
 # Configure logging
 logging.basicConfig(
@@ -75,59 +65,56 @@ def create_fastmcp_server(
     logger.info(f"Creating {name} with FastMCP 2.0")
     
     # Create FastMCP server with basic configuration
-    server = FastMCP(name=name)
+    server = FastMCP(name=name, lifespan=lifespan)
     
     # Configure authentication if requested
     if enable_auth and auth_token:
         logger.info("Authentication enabled")
         # Note: FastMCP 2.0 auth configuration will be added when the API is available
     
-    # Register all existing MCP tools from tahubu_sf
-    tools = [
-        # Content retrieval tools
-        get_news,
-        get_blog_posts,
-        get_blog_post_by_id,
-        get_pages,
-        get_page_templates,
-        get_sites,
-        get_list_items,
-        get_events,
-        get_shared_content,
-        get_images,
-        get_documents,
-        get_videos,
-        get_search_indexes,
-        get_taxonomies,
-        get_section_presets,
-        get_forms,
-        
-        # Content creation tools
-        create_news_item,
-        create_blog_post,
-        create_list_item,
-        create_event,
-        create_image,
-        create_document,
-        create_video,
-        
-        # Helper tools
-        get_parent_blogs,
-        get_parent_lists,
-        get_calendars,
-        get_albums,
-        get_document_libraries,
-        get_video_libraries
-    ]
+    # Register all existing MCP tools from the tahubu_sf catalog
+    tools = catalog_tools()
     
     # Register each tool with the server
     for tool_func in tools:
-        server.tool()(tool_func)
+        server.tool()(traced_tool(profiled_tool(tool_func)))
         logger.debug(f"Registered tool: {tool_func.__name__}")
     
+    # Publish content collections and items as resources with change notifications
+    add_resources(server)
+    
+    # Serve the profiles of PROFILE_TOOLS calls on the HTTP transports
+    if PROFILING_TOKEN:
+        add_profile_routes(server)
+    
     logger.info(f"FastMCP 2.0 server created with {len(tools)} tools")
     return server
 
+def add_profile_routes(server: FastMCP) -> None:
+    """
+    Add GET /admin/profiles and /admin/profiles/{id}, guarded by the profiling token.
+    
+    Args:
+        server: The FastMCP server to add the routes to
+    """
+    def forbidden() -> JSONResponse:
+        return JSONResponse({"detail": f"Missing or invalid {PROFILE_HEADER} header"}, status_code=403)
+    
+    @server.custom_route("/admin/profiles", methods=["GET"])
+    async def list_profiles(request: Request):
+        if not profiling_authorized(request.headers.get(PROFILE_HEADER)):
+            return forbidden()
+        return JSONResponse(profiles.list())
+    
+    @server.custom_route("/admin/profiles/{profile_id}", methods=["GET"])
+    async def get_profile(request: Request):
+        if not profiling_authorized(request.headers.get(PROFILE_HEADER)):
+            return forbidden()
+        profile = profiles.get(request.path_params["profile_id"])
+        if profile is None:
+            return JSONResponse({"detail": "No such profile"}, status_code=404)
+        return PlainTextResponse(profile.collapsed())
+
 def main():
     """Main entry point for FastMCP 2.0 server"""
     parser = argparse.ArgumentParser(
@@ -192,15 +179,18 @@ def main():
     logger.info(f"  Authentication: {'enabled' if args.auth else 'disabled'}")
     logger.info(f"  Proxying: {'enabled' if args.proxy else 'disabled'}")
     
+    # HTTP transports compress large JSON responses; event streams are left as is
+    http_middleware = [Middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)]
+
     # Start the server with the specified transport
     if args.transport == "streamable-http":
         logger.info("Starting Streamable HTTP transport...")
         # FastMCP 2.0 Streamable HTTP transport
-        server.run(transport="streamable-http", host=args.host, port=args.port)
+        server.run(transport="streamable-http", host=args.host, port=args.port, middleware=http_middleware)
     elif args.transport == "sse":
         logger.info("Starting SSE transport...")
         # FastMCP 2.0 SSE transport
-        server.run(transport="sse", host=args.host, port=args.port)
+        server.run(transport="sse", host=args.host, port=args.port, middleware=http_middleware)
     else:
         logger.info("Starting STDIO transport...")
         server.run(transport="stdio")
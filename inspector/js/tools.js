@@ -2,6 +2,13 @@
  * Tool functions for communicating with the API
  */
 
+// Listing tools that can return structured records instead of formatted text
+const JSON_FORMAT_TOOLS = [
+    'getNews', 'getListItems', 'getEvents', 'getForms', 'getSharedContent',
+    'getPages', 'getPageTemplates', 'getSites', 'getImages', 'getDocuments',
+    'getVideos', 'getSearchIndexes', 'getTaxonomies', 'getSectionPresets'
+];
+
 // Run a tool with the given name
 async function runTool(toolName, params = {}) {
     // Show loading indicator
@@ -17,6 +24,11 @@ async function runTool(toolName, params = {}) {
         document.getElementById('results-container').innerHTML = '<pre id="results">Loading...</pre>';
     }
     
+    // Ask listing tools for records so the formatters do not have to parse text
+    if (JSON_FORMAT_TOOLS.includes(toolName)) {
+        params = { format: 'json', ...params };
+    }
+    
     try {
         // Call the MCP tool
         const response = await fetch('/api/run-tool', {
@@ -38,7 +50,12 @@ async function runTool(toolName, params = {}) {
         
         // Display the results if this is a direct user action
         if (loaderElement) {
-            const result = data.result;
+            let result = data.result;
+            
+            // Records from format=json, in the { value: [...] } shape the formatters expect
+            if (Array.isArray(result) && toolName !== 'getPageTemplates') {
+                result = { value: result };
+            }
             
             // Pass the raw result to the appropriate formatter based on tool name
             // Each formatter is responsible for parsing its own data format
@@ -0,0 +1,15 @@
+"""
+Local stand-in for a Sitefinity site, for offline benchmarks and tests
+
+Run it as a server with `python -m mock_sitefinity`, or in process:
+
+    from mock_sitefinity import MockConfig, create_app
+    from tahubu_sf.utils import http
+
+    mock = create_app(MockConfig(items=1000))
+    http.set_transport_factory(lambda: httpx.ASGITransport(app=mock))
+"""
+from mock_sitefinity.data import ContentStore
+from mock_sitefinity.server import MockConfig, create_app
+
+__all__ = ["ContentStore", "MockConfig", "create_app"]
@@ -0,0 +1,53 @@
+"""
+Run the mock Sitefinity server
+
+Usage:
+    python -m mock_sitefinity [--port 8900] [--items 1000] [--size newsitems=10000]
+                              [--latency-ms 20] [--error-rate 0.01] [--throttle-rate 0.05]
+
+Point the MCP servers at it with SITEFINITY_SITE_PREFIX=http://127.0.0.1:8900.
+"""
+import argparse
+
+import uvicorn
+
+from mock_sitefinity.server import MockConfig, create_app
+
+def _size(value: str):
+    name, _, count = value.partition("=")
+    if not count.isdigit():
+        raise argparse.ArgumentTypeError("Sizes are given as collection=count")
+    return name, int(count)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Sitefinity OData server")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
+    parser.add_argument("--port", type=int, default=8900, help="Port to listen on")
+    parser.add_argument("--items", type=int, default=100, help="Items per collection")
+    parser.add_argument("--size", type=_size, action="append", default=[], help="Per-collection size, e.g. newsitems=10000")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated content")
+    parser.add_argument("--page-size", type=int, help="Server-driven page size (adds @odata.nextLink)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with --error-status")
+    parser.add_argument("--error-status", type=int, default=500, help="Status code of injected errors")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--slow-body-ms", type=float, default=0, help="Delay between response body chunks")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        items=args.items,
+        sizes=dict(args.size),
+        seed=args.seed,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        throttle_rate=args.throttle_rate,
+        slow_body_ms=args.slow_body_ms,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
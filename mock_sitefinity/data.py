@@ -0,0 +1,270 @@
+"""
+Deterministic Sitefinity-shaped content for the mock server
+
+Every collection in settings.CONTENT_TYPES has a generator producing items with
+the properties the Sitefinity OData services return for that type. Items depend
+only on the collection, the index and the seed, so a given configuration always
+serves the same data.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+WORDS = (
+    "annual report product launch customer story partner summit release notes "
+    "security update community event webinar roadmap hiring campus sustainability "
+    "research award interview guide tutorial migration performance analytics"
+).split()
+
+PARAGRAPH = (
+    "<p>Sitefinity makes it easy to publish <strong>news</strong>, events and "
+    "<a href=\"https://www.example.com/blog\">blog posts</a> across sites &amp; languages.</p>"
+)
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Child collections and the collection their ParentId points into
+PARENTS = {
+    "blogposts": "blogs",
+    "listitems": "lists",
+    "events": "calendars",
+    "images": "albums",
+    "documents": "documentlibraries",
+    "videos": "videolibraries",
+    "hierarchy-taxa": "taxonomies",
+    "flat-taxa": "taxonomies",
+}
+
+# Container collections are small regardless of the configured size
+CONTAINER_SIZE = 5
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _date(rng: random.Random) -> str:
+    return (EPOCH + timedelta(minutes=rng.randint(0, 60 * 24 * 365))).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _title(rng: random.Random, index: int) -> str:
+    return f"{' '.join(rng.choice(WORDS) for _ in range(3)).capitalize()} {index}"
+
+def _url_name(title: str) -> str:
+    return title.lower().replace(" ", "-")
+
+def _content(rng: random.Random) -> str:
+    return PARAGRAPH * rng.randint(2, 10)
+
+def _common(rng: random.Random, index: int) -> Dict[str, Any]:
+    title = _title(rng, index)
+    date = _date(rng)
+    return {
+        "Id": _id(rng),
+        "Title": title,
+        "UrlName": _url_name(title),
+        "DateCreated": date,
+        "LastModified": date,
+        "PublicationDate": date,
+        "Provider": "OpenAccessDataProvider",
+    }
+
+def _container(rng, index):
+    item = _common(rng, index)
+    item["Description"] = f"Container for {item['Title'].lower()}"
+    return item
+
+def _news(rng, index):
+    item = _common(rng, index)
+    item.update(
+        Summary="A short summary of the update with a few details about what changed.",
+        Content=_content(rng),
+        Author=rng.choice(["Communications Team", "Ann Lee", "Marketing"]),
+        SourceName="",
+        AllowComments=rng.random() < 0.5,
+        IncludeInSitemap=True,
+        ViewsCount=rng.randint(0, 100000),
+        Tags=[_id(rng) for _ in range(rng.randint(0, 4))],
+        Category=[_id(rng)],
+        ItemDefaultUrl=f"/news/{item['UrlName']}",
+    )
+    return item
+
+def _blog_post(rng, index):
+    item = _news(rng, index)
+    item["ItemDefaultUrl"] = f"/blog/{item['UrlName']}"
+    if rng.random() < 0.3:
+        item["Summary"] = ""
+    return item
+
+def _list_item(rng, index):
+    item = _common(rng, index)
+    item["Content"] = _content(rng)
+    return item
+
+def _event(rng, index):
+    item = _news(rng, index)
+    start = EPOCH + timedelta(days=rng.randint(0, 365), hours=rng.randint(8, 18))
+    item.update(
+        EventStart=start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        EventEnd=(start + timedelta(hours=rng.randint(1, 8))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        AllDayEvent=False,
+        Location=rng.choice(["Online", "Boston", "Sofia", "London"]),
+    )
+    return item
+
+def _media(extension: str, folder: str):
+    def generate(rng, index):
+        item = _common(rng, index)
+        url = f"https://www.example.com/{folder}/{item['UrlName']}.{extension}"
+        item.update(
+            Extension=f".{extension}",
+            Url=url,
+            EmbedUrl=url,
+            MediaUrl=url,
+            TotalSize=rng.randint(10_000, 5_000_000),
+            MimeType=f"application/{extension}",
+        )
+        return item
+    return generate
+
+def _image(rng, index):
+    item = _media("jpg", "images")(rng, index)
+    item.update(
+        Width=rng.choice([640, 1024, 1920]),
+        Height=rng.choice([480, 768, 1080]),
+        AlternativeText=item["Title"],
+        MimeType="image/jpeg",
+    )
+    return item
+
+def _page(rng, index):
+    item = _common(rng, index)
+    item.update(IsHomePage=index == 0, ViewUrl=f"/{item['UrlName']}", Crawlable=True)
+    return item
+
+def _template(rng, index):
+    item = _common(rng, index)
+    item.update(Framework=rng.choice(["Mvc", "Net Core", "Hybrid"]), Renderer=rng.choice(["React", "Mvc", "NetCore"]))
+    return item
+
+def _site(rng, index):
+    return {
+        "Id": _id(rng),
+        "Name": f"Site {index}",
+        "LiveUrl": f"https://site{index}.example.com",
+        "IsOffline": index % 7 == 6,
+        "IsDefault": index == 0,
+    }
+
+def _form(rng, index):
+    item = _common(rng, index)
+    item.update(SuccessMessage="Thank you for your submission.", Renderer=rng.choice(["Mvc", "NetCore"]))
+    return item
+
+def _search_index(rng, index):
+    return {"Id": _id(rng), "Name": f"index-{index}", "IsActive": index % 4 != 3, "IsBackend": index % 5 == 0}
+
+def _service_hook(rng, index):
+    return {"Id": _id(rng), "Name": f"Webhook {index}", "Url": f"https://hooks.example.com/{index}", "IsActive": True}
+
+def _taxonomy(rng, index):
+    item = _common(rng, index)
+    item.update(TaxonName=item["Title"].split()[0], Type=rng.choice(["Flat", "Hierarchical"]), TaxonomySharedWith=rng.randint(0, 50))
+    return item
+
+def _taxon(rng, index):
+    item = _common(rng, index)
+    item.update(Description="", Ordinal=index)
+    return item
+
+def _preset(rng, index):
+    item = _common(rng, index)
+    item["Thumbnail"] = f"https://www.example.com/presets/{item['UrlName']}.png"
+    return item
+
+def _product(rng, index):
+    # Items of a dynamic module, which has no dedicated tool
+    item = _common(rng, index)
+    item.update(Sku=f"SKU-{index:05d}", Price=round(rng.uniform(5, 500), 2), InStock=rng.random() < 0.8)
+    return item
+
+GENERATORS: Dict[str, Callable[[random.Random, int], Dict[str, Any]]] = {
+    "newsitems": _news,
+    "blogs": _container,
+    "blogposts": _blog_post,
+    "sites": _site,
+    "lists": _container,
+    "listitems": _list_item,
+    "contentitems": _list_item,
+    "pages": _page,
+    "templates": _template,
+    "calendars": _container,
+    "events": _event,
+    "albums": _container,
+    "images": _image,
+    "documentlibraries": _container,
+    "documents": _media("pdf", "docs"),
+    "videolibraries": _container,
+    "videos": _media("mp4", "videos"),
+    "forms": _form,
+    "searchindexes": _search_index,
+    "servicehooks": _service_hook,
+    "taxonomies": _taxonomy,
+    "flat-taxa": _taxon,
+    "hierarchy-taxa": _taxon,
+    "widgetpresets": _preset,
+    "products": _product,
+}
+
+class ContentStore:
+    """
+    Generated collections plus the items created through the mock.
+
+    Args:
+        size: Number of items in each collection (container collections hold CONTAINER_SIZE)
+        sizes: Per-collection overrides of size
+        seed: Seed for the generated content
+    """
+
+    def __init__(self, size: int = 100, sizes: Optional[Dict[str, int]] = None, seed: int = 0):
+        self.size = size
+        self.sizes = dict(sizes or {})
+        self.seed = seed
+        self._collections: Dict[str, List[Dict[str, Any]]] = {}
+
+    def collection_size(self, name: str) -> int:
+        if name in self.sizes:
+            return self.sizes[name]
+        if name in PARENTS.values() and name not in PARENTS:
+            return min(self.size, CONTAINER_SIZE)
+        return self.size
+
+    def items(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Return a collection, generating it on first use.
+
+        Raises:
+            KeyError: If the collection is not a Sitefinity content type
+        """
+        items = self._collections.get(name)
+        if items is None:
+            generate = GENERATORS[name]
+            parents = [parent["Id"] for parent in self.items(PARENTS[name])] if name in PARENTS else None
+            rng = random.Random(f"{self.seed}:{name}")
+            items = []
+            for index in range(self.collection_size(name)):
+                item = generate(rng, index)
+                if parents:
+                    item["ParentId"] = parents[index % len(parents)]
+                items.append(item)
+            self._collections[name] = items
+        return items
+
+    def get(self, name: str, item_id: str) -> Optional[Dict[str, Any]]:
+        return next((item for item in self.items(name) if item.get("Id") == item_id), None)
+
+    def create(self, name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add an item posted to a collection, filling in the server-generated properties"""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        item = {"Id": str(uuid.uuid4()), "DateCreated": now, "LastModified": now, **data}
+        self.items(name).append(item)
+        return item
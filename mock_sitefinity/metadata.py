@@ -0,0 +1,78 @@
+"""
+OData $metadata (CSDL) document for the mock server
+
+Entity types are derived from the first generated item of each collection, so
+the document always matches the data the mock serves. Id and Title (Name for
+types without a Title) are the non-nullable properties.
+"""
+import re
+from typing import Any, Dict, Optional
+from xml.sax.saxutils import quoteattr
+
+NAMESPACE = "Telerik.Sitefinity.Mock"
+
+_GUID = re.compile(r"^[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+
+# Longest UrlName Sitefinity accepts
+URL_NAME_MAX_LENGTH = 255
+
+def edm_type(value: Any) -> str:
+    """Return the EDM type of a generated property value"""
+    if isinstance(value, bool):
+        return "Edm.Boolean"
+    if isinstance(value, int):
+        return "Edm.Int64" if abs(value) > 2 ** 31 - 1 else "Edm.Int32"
+    if isinstance(value, float):
+        return "Edm.Double"
+    if isinstance(value, list):
+        return f"Collection({edm_type(value[0]) if value else 'Edm.Guid'})"
+    if isinstance(value, str) and _GUID.match(value):
+        return "Edm.Guid"
+    if isinstance(value, str) and _DATE.match(value):
+        return "Edm.DateTimeOffset"
+    return "Edm.String"
+
+def type_name(collection: str) -> str:
+    return "".join(part.capitalize() for part in re.split(r"[^A-Za-z0-9]+", collection))
+
+def _entity_type(collection: str, sample: Dict[str, Any], parent: Optional[str]) -> str:
+    required = {"Id", "Title" if "Title" in sample else "Name"}
+    properties = dict(sample)
+    if parent:
+        properties["ParentId"] = properties.get("ParentId") or "00000000-0000-0000-0000-000000000000"
+    lines = [f'<EntityType Name="{type_name(collection)}"><Key><PropertyRef Name="Id"/></Key>']
+    for name, value in properties.items():
+        attributes = f'Name="{name}" Type="{edm_type(value)}"'
+        if name in required:
+            attributes += ' Nullable="false"'
+        if name == "UrlName":
+            attributes += f' MaxLength="{URL_NAME_MAX_LENGTH}"'
+        lines.append(f"<Property {attributes}/>")
+    lines.append("</EntityType>")
+    return "".join(lines)
+
+def build_metadata(samples: Dict[str, Dict[str, Any]], parents: Dict[str, str]) -> str:
+    """
+    Build the CSDL document describing the mock's entity sets.
+
+    Args:
+        samples: One generated item per collection
+        parents: Child collections and the collection their ParentId points into
+
+    Returns:
+        str: The $metadata XML
+    """
+    types = "".join(_entity_type(collection, sample, parents.get(collection)) for collection, sample in samples.items())
+    sets = "".join(
+        f"<EntitySet Name={quoteattr(collection)} EntityType=\"{NAMESPACE}.{type_name(collection)}\"/>"
+        for collection in samples
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<edmx:Edmx Version="4.0" xmlns:edmx="http://docs.oasis-open.org/odata/ns/edmx">'
+        '<edmx:DataServices>'
+        f'<Schema Namespace="{NAMESPACE}" xmlns="http://docs.oasis-open.org/odata/ns/edm">'
+        f'{types}<EntityContainer Name="Default">{sets}</EntityContainer>'
+        '</Schema></edmx:DataServices></edmx:Edmx>'
+    )
@@ -0,0 +1,204 @@
+"""
+OData query options for the mock server
+
+Supports the subset of OData v4 the tools and benchmarks use: $select, $filter
+(comparisons, and/or/not, parentheses, contains/startswith/endswith, GUID
+literals), $orderby, $top, $skip and $count.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+class ODataError(ValueError):
+    """An invalid query option, reported to the client as 400 Bad Request"""
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<guid>[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\b)|(?P<number>-?\d+(?:\.\d+)?)|(?P<punct>[(),])|(?P<word>[A-Za-z_][\w./-]*))"
+)
+_COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and b is not None and a > b,
+    "ge": lambda a, b: a is not None and b is not None and a >= b,
+    "lt": lambda a, b: a is not None and b is not None and a < b,
+    "le": lambda a, b: a is not None and b is not None and a <= b,
+}
+_FUNCTIONS = {
+    "contains": lambda a, b: isinstance(a, str) and b in a,
+    "startswith": lambda a, b: isinstance(a, str) and a.startswith(b),
+    "endswith": lambda a, b: isinstance(a, str) and a.endswith(b),
+}
+_KEYWORDS = {"true": True, "false": False, "null": None}
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        if match is None:
+            raise ODataError(f"Syntax error in $filter at position {pos}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "string":
+            tokens.append(("literal", text[1:-1].replace("''", "'")))
+        elif kind == "guid":
+            tokens.append(("literal", text.lower()))
+        elif kind == "number":
+            tokens.append(("literal", float(text) if "." in text else int(text)))
+        elif kind == "word" and text in _KEYWORDS:
+            tokens.append(("literal", _KEYWORDS[text]))
+        else:
+            tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+class _FilterParser:
+    """Recursive-descent parser turning a $filter expression into a predicate"""
+
+    def __init__(self, expression: str):
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+
+    def parse(self) -> Predicate:
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            raise ODataError(f"Unexpected '{self.tokens[self.pos][1]}' in $filter")
+        return predicate
+
+    def _peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self, kind: Optional[str] = None, text: Optional[str] = None) -> Tuple[str, Any]:
+        token = self._peek()
+        if token is None or (kind and token[0] != kind) or (text and token[1] != text):
+            expected = text or kind or "a token"
+            raise ODataError(f"Expected {expected} in $filter")
+        self.pos += 1
+        return token
+
+    def _or(self) -> Predicate:
+        left = self._and()
+        while self._peek() == ("word", "or"):
+            self.pos += 1
+            right = self._and()
+            left = (lambda l, r: lambda item: l(item) or r(item))(left, right)
+        return left
+
+    def _and(self) -> Predicate:
+        left = self._not()
+        while self._peek() == ("word", "and"):
+            self.pos += 1
+            right = self._not()
+            left = (lambda l, r: lambda item: l(item) and r(item))(left, right)
+        return left
+
+    def _not(self) -> Predicate:
+        if self._peek() == ("word", "not"):
+            self.pos += 1
+            operand = self._not()
+            return lambda item: not operand(item)
+        return self._primary()
+
+    def _primary(self) -> Predicate:
+        token = self._peek()
+        if token == ("punct", "("):
+            self.pos += 1
+            inner = self._or()
+            self._take("punct", ")")
+            return inner
+        if token and token[0] == "word" and token[1] in _FUNCTIONS:
+            self.pos += 1
+            function = _FUNCTIONS[token[1]]
+            self._take("punct", "(")
+            left = self._operand()
+            self._take("punct", ",")
+            right = self._operand()
+            self._take("punct", ")")
+            return lambda item: function(left(item), right(item))
+        left = self._operand()
+        operator = self._take("word")[1]
+        if operator not in _COMPARISONS:
+            raise ODataError(f"Unsupported operator '{operator}' in $filter")
+        right = self._operand()
+        compare = _COMPARISONS[operator]
+        return lambda item: compare(left(item), right(item))
+
+    def _operand(self) -> Callable[[Dict[str, Any]], Any]:
+        kind, value = self._take()
+        if kind == "literal":
+            return lambda item: value
+        if kind == "word":
+            return lambda item: item.get(value)
+        raise ODataError(f"Unexpected '{value}' in $filter")
+
+def parse_filter(expression: str) -> Predicate:
+    """
+    Compile a $filter expression.
+
+    Raises:
+        ODataError: If the expression is invalid or uses unsupported syntax
+    """
+    return _FilterParser(expression).parse()
+
+def _int_option(params: Dict[str, str], name: str) -> Optional[int]:
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ODataError(f"{name} must be a non-negative integer") from None
+    if number < 0:
+        raise ODataError(f"{name} must be a non-negative integer")
+    return number
+
+def apply_query(
+    items: List[Dict[str, Any]], params: Dict[str, str], page_size: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[int]]:
+    """
+    Apply OData query options to a collection.
+
+    Args:
+        items: The whole collection
+        params: The request's query parameters
+        page_size: Server-driven page size; longer results end with a next link
+
+    Returns:
+        Tuple of the selected items, the total count when $count=true was requested
+        (otherwise None), and the $skip value of the next page when one exists
+
+    Raises:
+        ODataError: If a query option is invalid
+    """
+    if "$filter" in params:
+        predicate = parse_filter(params["$filter"])
+        items = [item for item in items if predicate(item)]
+
+    if "$orderby" in params:
+        for clause in reversed(params["$orderby"].split(",")):
+            name, _, direction = clause.strip().partition(" ")
+            if direction.strip() not in ("", "asc", "desc"):
+                raise ODataError(f"Invalid $orderby direction '{direction.strip()}'")
+            items = sorted(
+                items,
+                key=lambda item: (item.get(name) is not None, item.get(name)),
+                reverse=direction.strip() == "desc",
+            )
+
+    count = len(items) if params.get("$count", "").lower() == "true" else None
+    skip = _int_option(params, "$skip") or 0
+    top = _int_option(params, "$top")
+    limit = top if top is not None else len(items)
+    next_skip = None
+    if page_size is not None and limit > page_size:
+        if skip + page_size < min(len(items), skip + limit):
+            next_skip = skip + page_size
+        limit = page_size
+    page = items[skip:skip + limit]
+
+    if "$select" in params:
+        fields = [name.strip() for name in params["$select"].split(",") if name.strip()]
+        page = [{name: item.get(name) for name in fields} for item in page]
+    return page, count, next_skip
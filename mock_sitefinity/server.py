@@ -0,0 +1,265 @@
+"""
+FastAPI application standing in for a Sitefinity site
+
+Serves every collection in settings.CONTENT_TYPES, plus the dynamic-module
+collection products, under both the frontend (api/default) and backend
+(sf/system) service paths, along with their $metadata document, the OpenID
+Connect token endpoint, and OData JSON $batch requests. Latency, errors, throttling and slow
+bodies can be injected through MockConfig or at runtime with PUT /_mock/config.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from mock_sitefinity.data import GENERATORS, PARENTS, ContentStore
+from mock_sitefinity.metadata import build_metadata
+from mock_sitefinity.odata import ODataError, apply_query
+
+@dataclass
+class MockConfig:
+    """
+    Behaviour of the mock server.
+
+    Args:
+        items: Items per collection (container collections such as blogs hold 5)
+        sizes: Per-collection overrides of items, e.g. {"newsitems": 10000}
+        seed: Seed for the generated content
+        page_size: Server-driven page size; larger results get an @odata.nextLink
+        frontend_path: Path of the frontend OData service
+        backend_path: Path of the backend OData service
+        latency_ms: Delay before every response
+        jitter_ms: Random extra delay of up to this many milliseconds
+        error_rate: Fraction of requests answered with error_status
+        error_status: Status code of injected errors
+        throttle_rate: Fraction of requests answered with 429 Too Many Requests
+        retry_after: Retry-After seconds sent with 429 responses
+        slow_body_ms: Delay between body chunks, simulating a slow connection
+        chunk_size: Body chunk size used when slow_body_ms is set
+        token_lifetime: expires_in of issued access tokens, in seconds
+    """
+    items: int = 100
+    sizes: Dict[str, int] = field(default_factory=dict)
+    seed: int = 0
+    page_size: Optional[int] = None
+    frontend_path: str = "api/default"
+    backend_path: str = "sf/system"
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0.0
+    error_status: int = 500
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    slow_body_ms: float = 0
+    chunk_size: int = 16384
+    token_lifetime: int = 3600
+
+# Settings that can be changed on a running server; the data settings need a restart
+RUNTIME_SETTINGS = (
+    "page_size", "latency_ms", "jitter_ms", "error_rate", "error_status",
+    "throttle_rate", "retry_after", "slow_body_ms", "chunk_size", "token_lifetime",
+)
+
+def _error(status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """An OData error response"""
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status, headers=headers)
+
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    """
+    Create the mock Sitefinity application.
+
+    Args:
+        config: Server behaviour; defaults to MockConfig()
+
+    Returns:
+        FastAPI: The application, with the store, config and request counts on app.state
+    """
+    config = config or MockConfig()
+    store = ContentStore(config.items, config.sizes, config.seed)
+    rng = random.Random(config.seed)
+    requests: Counter = Counter()
+    services = (config.frontend_path.strip("/"), config.backend_path.strip("/"))
+
+    app = FastAPI(title="Mock Sitefinity", docs_url=None, redoc_url=None)
+    app.state.config = config
+    app.state.store = store
+    app.state.requests = requests
+
+    def injected_fault() -> Optional[Response]:
+        if config.throttle_rate and rng.random() < config.throttle_rate:
+            return _error(429, "TooManyRequests", "Rate limit exceeded", {"Retry-After": str(config.retry_after)})
+        if config.error_rate and rng.random() < config.error_rate:
+            return _error(config.error_status, "InjectedError", "Injected failure")
+        return None
+
+    async def delay() -> None:
+        seconds = (config.latency_ms + (rng.random() * config.jitter_ms if config.jitter_ms else 0)) / 1000
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    def json_body(request: Request, payload: Any, status: int = 200) -> Response:
+        """Serialize a payload with an ETag, honouring If-None-Match and slow_body_ms"""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = _etag(body)
+        headers = {"ETag": etag, "OData-Version": "4.0"}
+        if status == 200 and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        if not config.slow_body_ms:
+            return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+        async def chunks():
+            for start in range(0, len(body), config.chunk_size):
+                if start:
+                    await asyncio.sleep(config.slow_body_ms / 1000)
+                yield body[start:start + config.chunk_size]
+        return StreamingResponse(chunks(), status_code=status, media_type="application/json", headers=headers)
+
+    def read_collection(request: Request, service: str, collection: str, params: Dict[str, str]) -> Response:
+        try:
+            page, count, next_skip = apply_query(store.items(collection), params, config.page_size)
+        except ODataError as e:
+            return _error(400, "BadRequest", str(e))
+        payload: Dict[str, Any] = {"@odata.context": f"{request.base_url}{service}/$metadata#{collection}"}
+        if count is not None:
+            payload["@odata.count"] = count
+        payload["value"] = page
+        if next_skip is not None:
+            next_params = dict(params, **{"$skip": str(next_skip)})
+            if "$top" in params:
+                next_params["$top"] = str(int(params["$top"]) - (next_skip - int(params.get("$skip", 0))))
+            payload["@odata.nextLink"] = f"{request.base_url}{service}/{collection}?{urlencode(next_params)}"
+        return json_body(request, payload)
+
+    metadata: List[bytes] = []
+
+    def read_metadata(request: Request) -> Response:
+        if not metadata:
+            samples = {name: generate(random.Random(config.seed), 0) for name, generate in GENERATORS.items()}
+            metadata.append(build_metadata(samples, PARENTS).encode("utf-8"))
+        etag = _etag(metadata[0])
+        headers = {"ETag": etag, "OData-Version": "4.0"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(metadata[0], media_type="application/xml", headers=headers)
+
+    def read_item(request: Request, collection: str, item_id: str, params: Dict[str, str]) -> Response:
+        item = store.get(collection, item_id.strip("'"))
+        if item is None:
+            return _error(404, "NotFound", f"No {collection} item with Id {item_id}")
+        if "$select" in params:
+            item = {name: item.get(name) for name in params["$select"].split(",")}
+        return json_body(request, item)
+
+    def dispatch(request: Request, method: str, path: str, params: Dict[str, str], body: Any) -> Response:
+        """Route one OData request (direct or from a $batch) to the store"""
+        service, _, resource = path.strip("/").rpartition("/")
+        if service not in services:
+            return _error(404, "NotFound", f"Unknown service path /{service}")
+        if resource == "$metadata" and method == "GET":
+            requests["GET $metadata"] += 1
+            return read_metadata(request)
+        collection, _, key = resource.partition("(")
+        if collection not in GENERATORS:
+            return _error(404, "NotFound", f"Unknown entity set {collection}")
+        requests[f"{method} {collection}"] += 1
+        if method == "GET":
+            if key:
+                return read_item(request, collection, key.rstrip(")"), params)
+            return read_collection(request, service, collection, params)
+        if method == "POST" and not key:
+            if not isinstance(body, dict) or not body.get("Title", body.get("Name")):
+                return _error(400, "BadRequest", "The request body must be an object with a Title")
+            return json_body(request, store.create(collection, body), status=201)
+        return _error(405, "MethodNotAllowed", f"{method} is not supported on {resource}")
+
+    @app.middleware("http")
+    async def faults(request: Request, call_next):
+        if request.url.path.startswith("/_mock"):
+            return await call_next(request)
+        await delay()
+        return injected_fault() or await call_next(request)
+
+    @app.get("/_mock/config")
+    async def get_config():
+        return asdict(config)
+
+    @app.put("/_mock/config")
+    async def update_config(changes: Dict[str, Any]):
+        unknown = set(changes) - set(RUNTIME_SETTINGS)
+        if unknown:
+            return _error(400, "BadRequest", f"Cannot change {', '.join(sorted(unknown))} at runtime")
+        for name, value in changes.items():
+            setattr(config, name, value)
+        return asdict(config)
+
+    @app.get("/_mock/requests")
+    async def get_requests():
+        return dict(requests)
+
+    @app.delete("/_mock/requests")
+    async def reset_requests():
+        requests.clear()
+        return {}
+
+    @app.post("/Sitefinity/Authenticate/OpenID/connect/token")
+    async def token(request: Request):
+        form = dict(parse_qsl((await request.body()).decode("utf-8")))
+        if not form.get("client_id") or form.get("grant_type") not in ("password", "client_credentials", "refresh_token"):
+            return JSONResponse({"error": "invalid_request"}, status_code=400)
+        requests["POST token"] += 1
+        issued = f"{form['grant_type']}-{time.monotonic_ns()}"
+        return {
+            "access_token": f"access-{issued}",
+            "token_type": "Bearer",
+            "expires_in": config.token_lifetime,
+            "refresh_token": f"refresh-{issued}",
+        }
+
+    @app.post("/{service:path}/$batch")
+    async def batch(service: str, request: Request):
+        """OData JSON batch: {"requests": [{"id", "method", "url", "body"?}]}"""
+        try:
+            operations: List[Dict[str, Any]] = (await request.json())["requests"]
+        except (ValueError, KeyError, TypeError):
+            return _error(400, "BadRequest", "Expected a JSON batch with a requests array")
+        responses = []
+        for operation in operations:
+            url = urlsplit(operation.get("url", ""))
+            path = url.path if url.path.startswith("/") else f"/{service}/{url.path}"
+            response = dispatch(
+                request, operation.get("method", "GET").upper(), path, dict(parse_qsl(url.query)), operation.get("body")
+            )
+            if isinstance(response, StreamingResponse):
+                body = b"".join([chunk async for chunk in response.body_iterator])
+            else:
+                body = response.body
+            responses.append({
+                "id": operation.get("id"),
+                "status": response.status_code,
+                "headers": {"ETag": response.headers["etag"]} if "etag" in response.headers else {},
+                "body": json.loads(body) if body else None,
+            })
+        return JSONResponse({"responses": responses})
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PATCH", "PUT", "DELETE"])
+    async def odata(path: str, request: Request):
+        body = None
+        if request.method in ("POST", "PATCH", "PUT"):
+            try:
+                body = await request.json()
+            except ValueError:
+                return _error(400, "BadRequest", "The request body is not valid JSON")
+        return dispatch(request, request.method, path, dict(request.query_params), body)
+
+    return app
@@ -1,17 +1,34 @@
 """
 API endpoint for retrieving images
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Image, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 IMAGES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.images}"
 
-async def get_images() -> str:
+async def get_images(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current images from the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing image details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing image details:
             - title: The title of the list item
             - embedurl: The embed url of the image
             - publicationdate: The publication date of the image
@@ -21,17 +38,5 @@ async def get_images() -> str:
             - height: The height of the image in pixels
             - alternativetext: The alternative text for the image
     """
-    data = await make_request(IMAGES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for image in data["value"]:
-        title = image["Title"]
-        embedurl = image["EmbedUrl"]
-        extension = image["Extension"]
-        totalsize = image["TotalSize"]
-        width = image["Width"]
-        height = image["Height"]
-        alternativetext = image["AlternativeText"]
-        publicationdate = image["PublicationDate"]
-        text += (f"Title: {title}\n EmbedUrl: {embedurl}\n Publication Date: {publicationdate}\n Extension: {extension}\n Total Size: {totalsize}\n Width: {width}\n Height: {height}\n Alternative Text: {alternativetext}\n\n")   
-    return text 
\ No newline at end of file
+    # Collections can hold thousands of items; format them as they are received
+    return await read_collection(Image, IMAGES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor, stream=True) 
\ No newline at end of file
@@ -2,16 +2,23 @@
 API endpoints for creating and managing blog posts
 """
 import logging
-import re
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import BlogPost, Parent, fetch_records
+from tahubu_sf.utils.http import RawResponse, make_raw_request, make_request, make_post_request
+from tahubu_sf.utils.html_text import WINDOW_FACTOR, html_to_text
+from tahubu_sf.utils.paging import decode_cursor, encode_cursor
+from tahubu_sf.utils.workers import OFFLOAD_MIN_CHARS, offload
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
+# Length of summaries derived from post content
+SUMMARY_LENGTH = 100
+
 BLOGS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.blogs}"
 POSTS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.blog_posts}"
 POSTS_MANAGEMENT_ENDPOINT = f"{ENDPOINTS.management}/{CONTENT_TYPES.blog_posts}"
@@ -66,10 +73,14 @@ async def create_blog_post(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.blog_posts, post_data, parent=CONTENT_TYPES.blogs)
+
         endpoint = POSTS_MANAGEMENT_ENDPOINT if draft else POSTS_CONTENT_ENDPOINT
         
         # Send POST request to create the blog post
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.blog_posts, post_data, response)
         
         logger.info(f"Blog post draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -85,8 +96,7 @@ async def get_parent_blogs() -> Dict[str, str]:
         Dict[str, str]: Dictionary of blog IDs and their titles
     """
     try:
-        data = await make_request(BLOGS_CONTENT_ENDPOINT)
-        blogs = {blog["Id"]: blog["Title"] for blog in data.get("value", [])}
+        blogs = {parent.id: parent.title for parent in await fetch_records(Parent, BLOGS_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(blogs)} parent blogs")
         return blogs
     except Exception as e:
@@ -111,53 +121,95 @@ async def get_blog_post_by_id(post_id: str) -> Dict[str, Any]:
         logger.error(f"Error retrieving blog post {post_id}: {str(e)}")
         raise Exception(f"Failed to retrieve blog post: {str(e)}") from e
 
-async def get_blog_posts() -> Dict[str, Any]:
+async def get_blog_post_by_id_raw(post_id: str) -> RawResponse:
+    """
+    Get a single blog post by its ID as the undecoded Sitefinity JSON body.
+    
+    Args:
+        post_id: The ID of the blog post to retrieve
+        
+    Returns:
+        RawResponse: The blog post as returned by Sitefinity
+    """
+    try:
+        return await make_raw_request(f"{POSTS_CONTENT_ENDPOINT}({post_id})")
+    except Exception as e:
+        logger.error(f"Error retrieving blog post {post_id}: {str(e)}")
+        raise Exception(f"Failed to retrieve blog post: {str(e)}") from e
+
+def summarize_posts(values: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce OData blog posts to their listing properties.
+    
+    Posts without a summary get the start of their content as plain text.
+    
+    Args:
+        values: The "value" array of a blog posts response
+    
+    Returns:
+        List[Dict[str, Any]]: The posts with limited properties
+    """
+    posts = []
+    for post in map(BlogPost.from_odata, values):
+        summary = post.summary or ""
+        if not summary and post.content:
+            content = html_to_text(post.content, limit=SUMMARY_LENGTH + 1)
+            summary = content[:SUMMARY_LENGTH] + "..." if len(content) > SUMMARY_LENGTH else content
+        posts.append({
+            "Id": post.id,
+            "PublicationDate": post.publication_date,
+            "Title": post.title,
+            "ItemDefaultUrl": post.item_default_url,
+            "AllowComments": post.allow_comments,
+            "Summary": summary,
+            "ParentId": post.parent_id
+        })
+    return posts
+
+async def get_blog_posts(max_items: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     Get blog posts from the Sitefinity site with pagination support.
     
+    Args:
+        max_items: Maximum number of posts to return
+        cursor: The next_cursor of a previous result, to continue after it
+    
     Returns:
         Dict[str, Any]: A dictionary containing:
             - total_count: Total number of blog posts
             - posts: List of blog posts with limited properties
             - has_more: Boolean indicating if there are more posts
+            - next_cursor: Cursor for the next posts, or None
     """
+    resource = f"BlogPost:{POSTS_CONTENT_ENDPOINT}"
+    offset = decode_cursor(cursor, resource)
+    params = {
+        "$count": "true",
+        "$select": BlogPost.select()
+    }
+    if offset:
+        params["$skip"] = offset
+    if max_items is not None:
+        params["$top"] = max_items
     try:
         # Get posts with count included in the response
-        data = await make_request(
-            POSTS_CONTENT_ENDPOINT,
-            params={
-                "$count": "true",
-                "$select": "Id,PublicationDate,Title,ItemDefaultUrl,AllowComments,Summary,ParentId,Content"
-            }
-        )
+        data = await make_request(POSTS_CONTENT_ENDPOINT, params=params)
         
-        # Process posts to handle summary/content
-        posts = []
-        for post in data.get("value", []):
-            # Get summary or first 100 chars of content
-            summary = post.get("Summary", "")
-            if not summary and "Content" in post:
-                content = post.get("Content", "")
-                # Remove HTML tags for summary
-                content = re.sub(r'<[^>]+>', '', content)
-                summary = content[:100] + "..." if len(content) > 100 else content
-            
-            # Create post with limited properties
-            processed_post = {
-                "Id": post.get("Id"),
-                "PublicationDate": post.get("PublicationDate"),
-                "Title": post.get("Title"),
-                "ItemDefaultUrl": post.get("ItemDefaultUrl"),
-                "AllowComments": post.get("AllowComments"),
-                "Summary": summary,
-                "ParentId": post.get("ParentId")
-            }
-            posts.append(processed_post)
+        # Deriving summaries parses post HTML; large pages do it in the worker pool
+        values = data.get("value", [])
+        # Only the first window of each post's HTML is usually examined
+        window = (SUMMARY_LENGTH + 1) * WINDOW_FACTOR
+        html_size = sum(min(len(item.get("Content") or ""), window) for item in values if not item.get("Summary"))
+        posts = await offload(summarize_posts, values, size=html_size, threshold=OFFLOAD_MIN_CHARS)
         
+        total_count = data.get("@odata.count", 0)
+        next_offset = offset + len(posts)
+        has_more = "@odata.nextLink" in data or next_offset < total_count
         return {
-            "total_count": data.get("@odata.count", 0),
+            "total_count": total_count,
             "posts": posts,
-            "has_more": "@odata.nextLink" in data
+            "has_more": has_more,
+            "next_cursor": encode_cursor(resource, next_offset) if has_more else None
         }
         
     except Exception as e:
@@ -1,31 +1,38 @@
 """
 API endpoint for retrieving events
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Event, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 POSTS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.events}"
 
-async def get_events() -> str:
+async def get_events(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current events from the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing event details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing event details:
             - title: The title of the event
             - summary: A summary of the event
             - content: The content of the event
             - eventstart: The start date and time of the event
             - eventend: The end date and time of the event
     """
-    data = await make_request(POSTS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for event in data["value"]:
-        title = event["Title"]
-        summary = event["Summary"]
-        content = event["Content"]
-        eventstart = event["EventStart"]
-        eventend = event["EventEnd"]
-        text += (f"Title: {title}\n Summary: {summary}\n Content: {content}\n Event Start: {eventstart}\n Event End: {eventend}\n\n")   
-    return text 
\ No newline at end of file
+    return await read_collection(Event, POSTS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor) 
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Generic tools for any content type described by the OData $metadata document
+
+Unlike the per-type modules these work for every entity set of the content
+service, including dynamic modules. Queries are checked against the schema and
+read only the properties they need; new items are validated locally, so calls
+Sitefinity would reject fail without a round trip.
+"""
+import logging
+from dataclasses import fields as dataclass_fields, make_dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from tahubu_sf.config.settings import ENDPOINTS
+from tahubu_sf.models import Record, odata, read_collection
+from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.http import make_post_request
+from tahubu_sf.utils.odata_metadata import EntityInfo, ODataSchemaError, get_schema, validate_payload
+from tahubu_sf.utils.odata_query import normalize_query, referenced_properties
+from tahubu_sf.utils.paging import Budget
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=256)
+def _record_type(content_type: str, properties: Tuple[str, ...]) -> Type[Record]:
+    """A record class with the given properties; cached so the response cache recognizes its decoder"""
+    name = "".join(part.capitalize() for part in content_type.replace("-", " ").split()) + "Record"
+
+    def reduce(record: Record) -> Tuple[Any, ...]:
+        # Generated classes cannot be pickled by name; worker processes rebuild them
+        return _make_record, (content_type, properties, tuple(getattr(record, field.name) for field in dataclass_fields(record)))
+
+    return make_dataclass(
+        name,
+        # Property names need not be valid Python identifiers
+        [(f"field_{index}", Any, odata(prop)) for index, prop in enumerate(properties)],
+        bases=(Record,),
+        namespace={"__reduce__": reduce},
+        slots=True,
+        frozen=True,
+    )
+
+def _make_record(content_type: str, properties: Tuple[str, ...], values: Tuple[Any, ...]) -> Record:
+    """Unpickle a record of a generated class"""
+    return _record_type(content_type, properties)(*values)
+
+def _check_properties(entity: EntityInfo, names: Any) -> None:
+    unknown = sorted(name for name in names if name not in entity.properties)
+    if unknown:
+        raise ODataSchemaError(
+            f"{', '.join(unknown)} {'is not a property' if len(unknown) == 1 else 'are not properties'} of "
+            f"{entity.name}. Properties: {', '.join(entity.properties)}"
+        )
+
+async def get_content_types(content_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    List the content types of the Sitefinity site, or describe one of them. Includes
+    dynamic-module types, which can be read with query_content and created with create_content.
+
+    Args:
+        content_type: The content type to describe, e.g. "newsitems"; omit to list all types
+
+    Returns:
+        Dict[str, Any]: Without content_type, {"content_types": [...]}. With it:
+            - name: The content type
+            - properties: Records with name, type, required and max_length
+            - default_select: Properties query_content reads when select is omitted
+    """
+    schema = await get_schema()
+    if content_type is None:
+        return {"content_types": sorted(schema.entity_sets)}
+    entity = schema.entity(content_type)
+    required = set(entity.required())
+    return {
+        "name": entity.name,
+        "properties": [
+            {
+                "name": prop.name,
+                "type": f"Collection({prop.type})" if prop.collection else prop.type,
+                "required": prop.name in required,
+                "max_length": prop.max_length,
+            }
+            for prop in entity.properties.values()
+        ],
+        "default_select": entity.default_select(),
+    }
+
+async def query_content(
+    content_type: str,
+    filter: Optional[str] = None,
+    select: Optional[str] = None,
+    orderby: Optional[str] = None,
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Query items of any content type, including dynamic modules (see get_content_types).
+
+    Args:
+        content_type: The content type, e.g. "newsitems" or a dynamic module's type
+        filter: OData $filter expression, e.g. "contains(Title,'launch')"
+        select: Comma-separated properties to return; defaults to all properties except long text
+        orderby: OData $orderby, e.g. "PublicationDate desc"
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
+    Returns:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records with the selected properties
+    """
+    entity = (await get_schema()).entity(content_type)
+    options = [(option, value) for option, value in (("$filter", filter), ("$select", select), ("$orderby", orderby)) if value]
+    params = normalize_query(options)
+    # The proxy's default page size would cut results short; max_items and cursor do the paging here
+    del params["$top"]
+    if "$select" not in params:
+        params["$select"] = ",".join(entity.default_select())
+    _check_properties(entity, referenced_properties(params) | set(params["$select"].split(",")))
+
+    model = _record_type(content_type, tuple(params["$select"].split(",")))
+    return await read_collection(
+        model, f"{ENDPOINTS.content}/{content_type}", format,
+        Budget.from_args(max_items, max_chars, max_tokens), cursor, params=params,
+    )
+
+async def create_content(
+    content_type: str,
+    fields: Dict[str, Any],
+    draft: bool = True,
+) -> Dict[str, Any]:
+    """
+    Create an item of any content type, including dynamic modules. The fields are checked
+    against the content type's schema first (see get_content_types).
+
+    Args:
+        content_type: The content type, e.g. a dynamic module's type
+        fields: The item's properties by name, e.g. {"Title": "...", "ParentId": "..."};
+            UrlName is derived from Title when omitted
+        draft: Whether to create the item as a draft (default: True)
+
+    Returns:
+        Dict[str, Any]: Response from the Sitefinity API, including the created item's ID
+    """
+    entity = (await get_schema()).entity(content_type)
+    payload = dict(fields)
+    if "UrlName" in entity.properties and not payload.get("UrlName") and isinstance(payload.get("Title"), str):
+        payload["UrlName"] = generate_url_name(payload["Title"])
+    problems = validate_payload(entity, payload)
+    if problems:
+        raise ODataSchemaError(f"Invalid {content_type} item: {'; '.join(problems)}")
+
+    endpoint = f"{ENDPOINTS.management if draft else ENDPOINTS.content}/{content_type}"
+    response = await make_post_request(endpoint, payload)
+    logger.info(f"Created {content_type} item: {response.get('Id', 'unknown ID')}")
+    return response
@@ -0,0 +1,357 @@
+"""
+API endpoint for a precomputed overview of a Sitefinity site
+
+The digest gives an agent the sites, the top levels of the page tree, the
+content containers with their item counts, the taxonomies and the most recent
+content in one call. Each section is built from a few small OData reads and
+kept per tenant. Sections are rebuilt independently: in the background every
+DIGEST_REFRESH_SECONDS, and soon after a write to one of the collections they
+are built from. A call only waits for sections that were never built; stale
+sections are served while they are rebuilt.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from tahubu_sf.config.settings import CONTENT_TYPES, ENDPOINTS
+from tahubu_sf.config.tenants import Tenant, current_tenant, use_tenant
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.http import add_write_listener, collection_name, make_request
+from tahubu_sf.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Age after which a section is rebuilt in the background (0 rebuilds sections only after writes)
+DIGEST_REFRESH_SECONDS = float(os.getenv("DIGEST_REFRESH_SECONDS", "300"))
+# Default size limit of the digest, in characters
+DIGEST_MAX_CHARS = int(os.getenv("DIGEST_MAX_CHARS", "4000"))
+# Most entries listed per section; fewer are listed when the digest would exceed its size limit
+DIGEST_MAX_ENTRIES = int(os.getenv("DIGEST_MAX_ENTRIES", "10"))
+# Most items read from a collection while building a section
+DIGEST_SCAN_SIZE = int(os.getenv("DIGEST_SCAN_SIZE", "200"))
+
+# Collections whose newest items make up the recent content section
+RECENT_COLLECTIONS = (CONTENT_TYPES.news, CONTENT_TYPES.blog_posts, CONTENT_TYPES.events)
+
+def _url(collection: str) -> str:
+    return f"{ENDPOINTS.content}/{collection}"
+
+async def _read(collection: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    # Sections are rebuilt because something may have changed, so cached responses are bypassed
+    return await make_request(_url(collection), params=params, refresh=True)
+
+async def _count(collection: str, filter: Optional[str] = None) -> int:
+    params: Dict[str, Any] = {"$count": "true", "$top": 0}
+    if filter:
+        params["$filter"] = filter
+    data = await _read(collection, params)
+    return data.get("@odata.count", 0)
+
+async def _build_sites() -> Dict[str, Any]:
+    data = await _read(CONTENT_TYPES.sites, {"$top": DIGEST_SCAN_SIZE})
+    entries = []
+    for site in data.get("value", []):
+        details = [site.get("LiveUrl")] + (["offline"] if site.get("IsOffline") else [])
+        entries.append({"title": site.get("Name"), "detail": ", ".join(filter(None, details))})
+    return {"summary": f"{len(entries)} sites", "entries": entries}
+
+async def _build_pages() -> Dict[str, Any]:
+    data = await _read(CONTENT_TYPES.pages, {"$count": "true", "$top": DIGEST_SCAN_SIZE})
+    pages = data.get("value", [])
+    ids = {page.get("Id") for page in pages}
+    children: Dict[str, int] = {}
+    for page in pages:
+        if page.get("ParentId") in ids:
+            children[page["ParentId"]] = children.get(page["ParentId"], 0) + 1
+    entries = []
+    # Pages whose parent is not a page are children of the site map root
+    for page in pages:
+        if page.get("ParentId") in ids:
+            continue
+        details = [page.get("ViewUrl") or page.get("UrlName")]
+        if page.get("IsHomePage"):
+            details.append("home page")
+        if children.get(page.get("Id")):
+            details.append(f"{children[page['Id']]} subpages")
+        entries.append({"title": page.get("Title"), "detail": ", ".join(filter(None, details))})
+    total = data.get("@odata.count", len(pages))
+    return {"summary": f"{total} pages, {len(entries)} at the top level", "entries": entries}
+
+def _containers(collection: str, items: str, label: str, noun: str) -> Callable[[], Awaitable[Dict[str, Any]]]:
+    """Build a section listing the containers of a collection, e.g. blogs, by their number of items"""
+
+    async def build() -> Dict[str, Any]:
+        data = await _read(collection, {"$select": "Id,Title", "$count": "true", "$top": DIGEST_SCAN_SIZE})
+        containers = data.get("value", [])
+        counts, total = await asyncio.gather(
+            asyncio.gather(*(_count(items, f"ParentId eq {container['Id']}") for container in containers)),
+            _count(items),
+        )
+        entries = [
+            {"id": container["Id"], "title": container.get("Title"), "count": count, "detail": f"{count} {noun}"}
+            for container, count in sorted(zip(containers, counts), key=lambda pair: -pair[1])
+        ]
+        return {"summary": f"{data.get('@odata.count', len(containers))} {label}, {total} {noun}", "entries": entries}
+
+    return build
+
+async def _build_taxonomies() -> Dict[str, Any]:
+    data, flat, hierarchical = await asyncio.gather(
+        _read(CONTENT_TYPES.classifications, {"$top": DIGEST_SCAN_SIZE}),
+        _count(CONTENT_TYPES.flat_taxonomies),
+        _count(CONTENT_TYPES.Hierarchical_Taxonomies),
+    )
+    entries = [
+        {"title": taxonomy.get("Title"), "detail": ", ".join(filter(None, [taxonomy.get("TaxonName"), taxonomy.get("Type")]))}
+        for taxonomy in data.get("value", [])
+    ]
+    return {"summary": f"{len(entries)} taxonomies, {flat} flat and {hierarchical} hierarchical terms", "entries": entries}
+
+async def _build_recent() -> Dict[str, Any]:
+    params = {"$select": "Id,Title,LastModified", "$orderby": "LastModified desc", "$top": DIGEST_MAX_ENTRIES}
+    results = await asyncio.gather(*(_read(collection, params) for collection in RECENT_COLLECTIONS))
+    items = [
+        {"id": item["Id"], "title": item.get("Title"), "type": collection, "modified": item.get("LastModified"),
+         "detail": f"{collection}, {item.get('LastModified')}"}
+        for collection, data in zip(RECENT_COLLECTIONS, results)
+        for item in data.get("value", [])
+    ]
+    items.sort(key=lambda item: item["modified"] or "", reverse=True)
+    return {"summary": f"latest changes to {', '.join(RECENT_COLLECTIONS)}", "entries": items[:DIGEST_MAX_ENTRIES]}
+
+@dataclass(frozen=True)
+class DigestSection:
+    """One section of the digest and the collections it is built from"""
+    name: str
+    heading: str
+    sources: Tuple[str, ...]
+    build: Callable[[], Awaitable[Dict[str, Any]]]
+
+# Sections in the order they appear in the digest
+SECTIONS = (
+    DigestSection("sites", "Sites", (CONTENT_TYPES.sites,), _build_sites),
+    DigestSection("pages", "Pages", (CONTENT_TYPES.pages,), _build_pages),
+    DigestSection("blogs", "Blogs", (CONTENT_TYPES.blogs, CONTENT_TYPES.blog_posts),
+                  _containers(CONTENT_TYPES.blogs, CONTENT_TYPES.blog_posts, "blogs", "posts")),
+    DigestSection("lists", "Lists", (CONTENT_TYPES.lists, CONTENT_TYPES.list_items),
+                  _containers(CONTENT_TYPES.lists, CONTENT_TYPES.list_items, "lists", "items")),
+    DigestSection("calendars", "Calendars", (CONTENT_TYPES.calendars, CONTENT_TYPES.events),
+                  _containers(CONTENT_TYPES.calendars, CONTENT_TYPES.events, "calendars", "events")),
+    DigestSection("albums", "Albums", (CONTENT_TYPES.albums, CONTENT_TYPES.images),
+                  _containers(CONTENT_TYPES.albums, CONTENT_TYPES.images, "albums", "images")),
+    DigestSection("document_libraries", "Document libraries",
+                  (CONTENT_TYPES.document_libraries, CONTENT_TYPES.documents),
+                  _containers(CONTENT_TYPES.document_libraries, CONTENT_TYPES.documents, "document libraries", "documents")),
+    DigestSection("video_libraries", "Video libraries", (CONTENT_TYPES.video_libraries, CONTENT_TYPES.videos),
+                  _containers(CONTENT_TYPES.video_libraries, CONTENT_TYPES.videos, "video libraries", "videos")),
+    DigestSection("taxonomies", "Taxonomies",
+                  (CONTENT_TYPES.classifications, CONTENT_TYPES.flat_taxonomies, CONTENT_TYPES.Hierarchical_Taxonomies),
+                  _build_taxonomies),
+    DigestSection("recent", "Recent content", RECENT_COLLECTIONS, _build_recent),
+)
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class SiteDigest:
+    """
+    The digest sections of one tenant.
+
+    Each section keeps its last successful build; a failed rebuild keeps the
+    previous content and is retried on the next refresh.
+    """
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self.built: Dict[str, float] = {}
+        self.stale: Set[str] = set()
+        self.errors: Dict[str, str] = {}
+        self._builds: Dict[str, asyncio.Task] = {}
+
+    def due(self) -> List[DigestSection]:
+        """Return the sections that are missing, stale or older than DIGEST_REFRESH_SECONDS"""
+        now = time.monotonic()
+        return [
+            section for section in SECTIONS
+            if section.name in self.stale or section.name not in self.built
+            or (DIGEST_REFRESH_SECONDS > 0 and now - self.built[section.name] >= DIGEST_REFRESH_SECONDS)
+        ]
+
+    def mark_stale(self, collection: str) -> bool:
+        """Mark the sections built from a collection for rebuilding; returns whether any was"""
+        names = {section.name for section in SECTIONS if collection in section.sources}
+        self.stale |= names
+        return bool(names)
+
+    async def _build(self, section: DigestSection) -> None:
+        self.stale.discard(section.name)
+        started = time.perf_counter()
+        try:
+            with use_tenant(self.tenant):
+                data = await section.build()
+        except Exception as e:
+            self.stale.add(section.name)
+            self.errors[section.name] = str(e)
+            metrics.counter("digest.errors", section=section.name).inc()
+            logger.warning(f"Could not build the {section.name} section of the site digest: {e}")
+            return
+        self.errors.pop(section.name, None)
+        self.sections[section.name] = {"updated": _now(), **data}
+        self.built[section.name] = time.monotonic()
+        metrics.histogram("digest.build_ms", section=section.name).observe((time.perf_counter() - started) * 1000)
+
+    def rebuild(self, section: DigestSection) -> asyncio.Task:
+        """Start rebuilding a section, or return the rebuild already running on this event loop"""
+        task = self._builds.get(section.name)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._build(section))
+            self._builds[section.name] = task
+        return task
+
+    async def refresh(self) -> None:
+        """Rebuild the sections that are due and wait for them"""
+        await asyncio.gather(*(self.rebuild(section) for section in self.due()))
+
+    async def snapshot(self) -> List[Tuple[DigestSection, Optional[Dict[str, Any]]]]:
+        """
+        Return every section with its latest content.
+
+        Sections that were never built are built first; other due sections are
+        rebuilt in the background and served as they are.
+        """
+        missing = []
+        for section in self.due():
+            task = self.rebuild(section)
+            if section.name not in self.sections:
+                missing.append(task)
+        if missing:
+            await asyncio.gather(*missing)
+        return [(section, self.sections.get(section.name)) for section in SECTIONS]
+
+class DigestStore:
+    """The digests of all tenants, maintained in the background while the servers run"""
+
+    def __init__(self):
+        self.digests: Dict[str, SiteDigest] = {}
+        self._due: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, tenant: Tenant) -> SiteDigest:
+        digest = self.digests.get(tenant.name)
+        if digest is None:
+            digest = self.digests[tenant.name] = SiteDigest(tenant.name)
+        return digest
+
+    def on_write(self, tenant: Tenant, url: str) -> None:
+        """Mark the sections built from a written collection for rebuilding"""
+        digest = self.digests.get(tenant.name)
+        if digest is not None and digest.mark_stale(collection_name(url)) and self._due is not None:
+            self._due.set()
+
+    async def _run(self) -> None:
+        while True:
+            for digest in list(self.digests.values()):
+                await digest.refresh()
+            try:
+                await asyncio.wait_for(self._due.wait(), DIGEST_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._due.clear()
+
+    @asynccontextmanager
+    async def running(self):
+        """Build the current tenant's digest and keep all digests fresh while the block runs"""
+        if DIGEST_REFRESH_SECONDS <= 0 or self._task is not None:
+            yield self
+            return
+        self.get(current_tenant())
+        self._due = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            yield self
+        finally:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = self._due = None
+
+# Digests shared by the servers of this process
+digests = DigestStore()
+add_write_listener(digests.on_write)
+
+def _limited(sections: List[Tuple[DigestSection, Optional[Dict[str, Any]]]], limit: int) -> List[Dict[str, Any]]:
+    parts = []
+    for section, data in sections:
+        if data is None:
+            parts.append({"section": section.name, "heading": section.heading, "summary": "unavailable", "entries": []})
+            continue
+        entries = data["entries"]
+        part = {"section": section.name, "heading": section.heading, "summary": data["summary"],
+                "updated": data["updated"], "entries": entries[:limit]}
+        if len(entries) > limit:
+            part["more"] = len(entries) - limit
+        parts.append(part)
+    return parts
+
+def _to_text(parts: List[Dict[str, Any]]) -> str:
+    blocks = []
+    for part in parts:
+        lines = [f"{part['heading']}: {part['summary']}"]
+        for entry in part["entries"]:
+            lines.append(f"- {entry['title']}" + (f" ({entry['detail']})" if entry.get("detail") else ""))
+        if part.get("more"):
+            lines.append(f"- ... and {part['more']} more")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+async def get_site_digest(
+    format: OutputFormat = "text",
+    max_chars: Optional[int] = None,
+) -> Union[str, Dict[str, Any]]:
+    """
+    Get an overview of the Sitefinity site in one call: its sites, the top level of the page tree,
+    blogs, lists, calendars, albums and document and video libraries with their item counts,
+    taxonomies and the most recently changed content. Use it to orient yourself before calling
+    the other tools.
+
+    Args:
+        format: "text" for a formatted overview, "json" for the sections as records
+        max_chars: Maximum size of the digest, in characters (default: DIGEST_MAX_CHARS)
+
+    Returns:
+        Union[str, Dict[str, Any]]: The overview; longer sections list their largest or newest
+            entries and how many more there are. JSON has:
+            - sections: Records with section, heading, summary, updated (when the section was built) and entries
+    """
+    if format not in ("text", "json"):
+        raise ValueError(f"Unsupported format '{format}'. Use 'text' or 'json'.")
+    limit_chars = max_chars or DIGEST_MAX_CHARS
+    site_digest = digests.get(current_tenant())
+    sections = await site_digest.snapshot()
+    if not any(data for _, data in sections):
+        raise RuntimeError(f"Could not build the site digest: {next(iter(site_digest.errors.values()), 'no sections')}")
+
+    # List fewer entries per section until the digest fits
+    for limit in sorted({min(count, DIGEST_MAX_ENTRIES) for count in (DIGEST_MAX_ENTRIES, 5, 3, 1, 0)}, reverse=True):
+        parts = _limited(sections, limit)
+        if format == "text":
+            text = _to_text(parts)
+            if len(text) <= limit_chars:
+                return text
+        elif len(codec.dumps({"sections": parts})) <= limit_chars:
+            return {"sections": parts}
+    # Even the section summaries are too long: cut the text, or leave out the last sections
+    if format == "text":
+        return text[:max(limit_chars - 3, 0)] + "..."
+    while len(parts) > 1 and len(codec.dumps({"sections": parts})) > limit_chars:
+        parts.pop()
+    return {"sections": parts}
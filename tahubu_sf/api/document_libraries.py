@@ -1,29 +1,38 @@
 """
 API endpoint for retrieving documents
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Document, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 DOCUMENTS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.documents}"
 
-async def get_documents() -> str:
+async def get_documents(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current documents from the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing blog post details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing blog post details:
             - title: The title of the document
             - extension: The extension of the document
             - url: The URL to access the document
             - publicationdate: The publication date of the blog post
     """
-    data = await make_request(DOCUMENTS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for document in data["value"]:
-        title = document["Title"]
-        extension = document["Extension"]
-        url = document["Url"]
-        publicationdate = document["PublicationDate"]
-        text += (f"Title: {title}\n Extension: {extension}\n Url: {url}\n Publication Date: {publicationdate}\n\n")   
-    return text 
\ No newline at end of file
+    # Collections can hold thousands of items; format them as they are received
+    return await read_collection(Document, DOCUMENTS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor, stream=True) 
\ No newline at end of file
@@ -7,8 +7,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import Parent, fetch_records
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
@@ -63,10 +65,14 @@ async def create_document(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.documents, post_data, parent=CONTENT_TYPES.document_libraries)
+
         endpoint = DOCUMENTS_MANAGEMENT_ENDPOINT if draft else DOCUMENTS_CONTENT_ENDPOINT
         
         # Send POST request to create the blog post
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.documents, post_data, response)
         
         logger.info(f"document draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -82,8 +88,7 @@ async def get_document_libraries() -> Dict[str, str]:
         Dict[str, str]: Dictionary of document library IDs and their titles
     """
     try:
-        data = await make_request(DOCLIB_CONTENT_ENDPOINT)
-        doclib = {lib["Id"]: lib["Title"] for lib in data.get("value", [])}
+        doclib = {parent.id: parent.title for parent in await fetch_records(Parent, DOCLIB_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(doclib)} parent document libraries")
         return doclib
     except Exception as e:
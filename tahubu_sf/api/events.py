@@ -4,11 +4,13 @@ API endpoints for creating and managing events
 import logging
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import Parent, fetch_records
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import odata_datetime, preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +22,8 @@ async def create_event(
     title: str,
     summary: str,
     content: str,
-    eventstart: datetime,
-    eventend: datetime,
+    eventstart: Union[datetime, str],
+    eventend: Union[datetime, str],
     parent_id: str,
     draft: bool = True,
 ) -> Dict[str, Any]:
@@ -32,8 +34,8 @@ async def create_event(
         title: The title of the event (REQUIRED)
         summary: A brief summary of the event (REQUIRED)
         content: The main content of the event (HTML supported)
-        eventstart: The start date and time of the event
-        eventend: The end date and time of the event
+        eventstart: The start date and time of the event, e.g. 2024-05-01T09:00:00Z
+        eventend: The end date and time of the event, not before eventstart
         parent_id: The ID of the parent calendar (REQUIRED)
         draft: Whether to create the event as a draft (default: True)
     
@@ -56,8 +58,8 @@ async def create_event(
             "Title": title,
             "Summary": summary,
             "Content": content,
-            "EventStart": now if eventstart is None else eventstart.isoformat() + "Z",
-            "EventEnd": now if eventend is None else eventend.isoformat() + "Z",
+            "EventStart": now if eventstart is None else odata_datetime(eventstart),
+            "EventEnd": now if eventend is None else odata_datetime(eventend),
             "ParentId": parent_id,
         }
         # Generate a proper URL name from the title following Sitefinity requirements
@@ -67,10 +69,14 @@ async def create_event(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.events, post_data, parent=CONTENT_TYPES.calendars)
+
         endpoint = EVENTS_MANAGEMENT_ENDPOINT if draft else EVENTS_CONTENT_ENDPOINT
         
         # Send POST request to create the Event
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.events, post_data, response)
         
         logger.info(f"Event draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -86,8 +92,7 @@ async def get_calendars() -> Dict[str, str]:
         Dict[str, str]: Dictionary of calendar IDs and their titles
     """
     try:
-        data = await make_request(CALENDARS_CONTENT_ENDPOINT)
-        calendars = {calendar["Id"]: calendar["Title"] for calendar in data.get("value", [])}
+        calendars = {parent.id: parent.title for parent in await fetch_records(Parent, CALENDARS_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(calendars)} parent calendars")
         return calendars
     except Exception as e:
@@ -1,27 +1,36 @@
 """
 API endpoint for retrieving forms
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Form, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 Forms_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.forms}"
 
-async def get_forms() -> str:
+async def get_forms(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current forms from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing form details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing form details:
             - title: The title of the form
             - successmessage: The success message returned by the form
             - renderer: The renderer used for the form
     """
-    data = await make_request(Forms_CONTENT_ENDPOINT)
-    
-    text = ""
-    for form in data["value"]:
-        title = form["Title"]
-        successmessage = form["SuccessMessage"]
-        renderer = form["Renderer"]
-        text += (f"Title: {title}\n SuccessMessage: {successmessage}\n Renderer: {renderer}\n\n")   
-    return text
+    return await read_collection(Form, Forms_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
@@ -7,8 +7,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import Parent, fetch_records
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
@@ -59,10 +61,14 @@ async def create_image(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.images, post_data, parent=CONTENT_TYPES.albums)
+
         endpoint = IMAGES_MANAGEMENT_ENDPOINT if draft else IMAGES_CONTENT_ENDPOINT
         
         # Send POST request to create the List Item
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.images, post_data, response)
         
         logger.info(f"Image draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -78,8 +84,7 @@ async def get_albums() -> Dict[str, str]:
         Dict[str, str]: Dictionary of Album IDs and their titles
     """
     try:
-        data = await make_request(ALBUMS_CONTENT_ENDPOINT)
-        albums = {album["Id"]: album["Title"] for album in data.get("value", [])}
+        albums = {parent.id: parent.title for parent in await fetch_records(Parent, ALBUMS_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(albums)} albums")
         return albums
     except Exception as e:
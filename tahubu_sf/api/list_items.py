@@ -7,8 +7,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import Parent, fetch_records
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
@@ -59,10 +61,14 @@ async def create_list_item(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.list_items, post_data, parent=CONTENT_TYPES.lists)
+
         endpoint = LISTITEMS_MANAGEMENT_ENDPOINT if draft else LISTITEMS_CONTENT_ENDPOINT
         
         # Send POST request to create the List Item
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.list_items, post_data, response)
         
         logger.info(f"List Item draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -78,8 +84,7 @@ async def get_parent_lists() -> Dict[str, str]:
         Dict[str, str]: Dictionary of Lists IDs and their titles
     """
     try:
-        data = await make_request(LISTS_CONTENT_ENDPOINT)
-        lists = {list["Id"]: list["Title"] for list in data.get("value", [])}
+        lists = {parent.id: parent.title for parent in await fetch_records(Parent, LISTS_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(lists)} parent lists")
         return lists
     except Exception as e:
@@ -1,27 +1,37 @@
 """
 API endpoint for retrieving List Items
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import ListItem, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 POSTS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.list_items}"
 
-async def get_list_items() -> str:
+async def get_list_items(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current list items from the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing list item details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing list item details:
             - title: The title of the list item
             - content: The content of the list item
             - publicationdate: The publication date of the blog post
     """
-    data = await make_request(POSTS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for listitem in data["value"]:
-        title = listitem["Title"]
-        content = listitem["Content"]
-        publicationdate = listitem["PublicationDate"]
-        text += (f"Title: {title}\n Content: {content}\n Publication Date: {publicationdate}\n\n")   
-    return text 
\ No newline at end of file
+    # Collections can hold thousands of items; format them as they are received
+    return await read_collection(ListItem, POSTS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor, stream=True) 
\ No newline at end of file
@@ -4,38 +4,46 @@ API endpoint for retrieving news items
 import logging
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Union
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import NewsItem, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
 NEWS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.news}"
 NEWS_MANAGEMENT_ENDPOINT = f"{ENDPOINTS.management}/{CONTENT_TYPES.news}"
 
-async def get_news() -> str:
+async def get_news(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current news items and Press Releases from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing news item details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing news item details:
             - title: The title of the news item
             - summary: The summary of the news item
             - author: The Author of the news item
             - publicationdate: The publication date of the news item
     """
-    data = await make_request(NEWS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for newsitem in data["value"]:
-        title = newsitem["Title"]
-        summary = newsitem["Summary"]
-        author = newsitem["Author"]
-        publicationdate = newsitem["PublicationDate"]
-        text += (f"Title: {title}\n Summary: {summary}\n Author: {author}\n Publication Date: {publicationdate}\n\n")   
-    return text
+    return await read_collection(NewsItem, NEWS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
 
 async def create_news_item(
     title: str,
@@ -80,10 +88,14 @@ async def create_news_item(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.news, post_data)
+
         endpoint = NEWS_MANAGEMENT_ENDPOINT if draft else NEWS_CONTENT_ENDPOINT
         
         # Send POST request to create the news item
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.news, post_data, response)
         
         logger.info(f"News Item draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -1,51 +1,64 @@
 """
 API endpoints for retrieving pages and page templates
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Page, PageTemplate, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 # Define the API endpoints for pages and page templates
 PAGES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.pages}"
 PAGE_TEMPLATES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.page_templates}"
 
-async def get_pages() -> str:
+async def get_pages(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the frontend pages of the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing page details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing page details:
             - title: The title of the page
             - urlname: The urlname of the page
             - ishomepage: Whether the page is the home page of the site
             - publicationdate: The publication date of the page
     """
-    data = await make_request(PAGES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for page in data["value"]:
-        title = page["Title"]
-        urlname = page["UrlName"]
-        isHomePage = page["IsHomePage"]
-        publicationdate = page["PublicationDate"]
-        text += (f"Title: {title}\n urlName: {urlname}\n isHomePage: {isHomePage}\n Publication Date: {publicationdate}\n\n")   
-    return text
+    return await read_collection(Page, PAGES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
 
-async def get_page_templates() -> str:
+async def get_page_templates(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the page templates of the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing page template details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing page template details:
             - title: The title of the page template
             - framework: The framework the template is based on
             - renderer: The technology used for the front end
     """
-    data = await make_request(PAGE_TEMPLATES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for pagetemplate in data["value"]:
-        title = pagetemplate["Title"]
-        framework = pagetemplate["Framework"]
-        renderer = pagetemplate["Renderer"]
-        text += (f"Title: {title}\n Framework: {framework}\n Renderer: {renderer}\n\n")   
-    return text 
\ No newline at end of file
+    return await read_collection(PageTemplate, PAGE_TEMPLATES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor) 
\ No newline at end of file
@@ -1,27 +1,36 @@
 """
 API endpoint for retrieving Search Indexes
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import SearchIndex, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 SEARCHINDEXES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.search_indexes}"
 
-async def get_search_indexes() -> str:
+async def get_search_indexes(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current search indexes from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing news item details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing news item details:
             - name: The name of the search index
             - isactive: Whether the search index active or inactive (true/false)
             - isbackend: Whether the search index is a backend index (true/false)
     """
-    data = await make_request(SEARCHINDEXES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for searchindex in data["value"]:
-        name = searchindex["Name"]
-        isactive = searchindex["IsActive"]
-        isbackend = searchindex["IsBackend"]
-        text += (f"Name: {name}\n IsActive: {isactive}\n IsBackend: {isbackend}\n\n")   
-    return text
+    return await read_collection(SearchIndex, SEARCHINDEXES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
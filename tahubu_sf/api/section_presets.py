@@ -1,25 +1,35 @@
 """
 API endpoint for retrieving Section Presets
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import SectionPreset, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 SECTIONPRESETS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.section_presets}"
 
-async def get_section_presets() -> str:
+async def get_section_presets(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current section presets from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing news item details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing news item details:
             - title: The title of the section preset
             - thumbnail: the thumbnail url of the section preset
     """
-    data = await make_request(SECTIONPRESETS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for sectionpreset in data["value"]:
-        title = sectionpreset["Title"]
-        thumbnail = sectionpreset["Thumbnail"]
-        text += (f"Title: {title}\n Thumbnail: {thumbnail}\n\n")   
-    return text
+    return await read_collection(SectionPreset, SECTIONPRESETS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
@@ -1,27 +1,36 @@
 """
 API endpoint for retrieving shared content
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import SharedContent, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 SHAREDCONTENT_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.shared_content}"
 
-async def get_shared_content() -> str:
+async def get_shared_content(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the shared content from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing shared content details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing shared content details:
             - title: The title of the shared content
             - content: The content of the shared content
             - publicationdate: The publication date of the shared content
     """
-    data = await make_request(SHAREDCONTENT_CONTENT_ENDPOINT)
-    
-    text = ""
-    for sharedcontent in data["value"]:
-        title = sharedcontent["Title"]
-        content = sharedcontent["Content"]
-        publicationdate = sharedcontent["PublicationDate"]
-        text += (f"Title: {title}\n Content: {content}\n Publication Date: {publicationdate}\n\n")   
-    return text
+    return await read_collection(SharedContent, SHAREDCONTENT_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
@@ -1,28 +1,37 @@
 """
 API endpoint for retrieving site information
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Site, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 # Define the API endpoint for sites
 SITES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.sites}"
 
-async def get_sites() -> str:
+async def get_sites(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the sites associated with the Sitefinity application.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing site details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing site details:
             - name: The name of the site variant
             - liveurl: The liveurl of the site variant
             - isoffline: Whether the site is offline
     """
-    data = await make_request(SITES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for site in data["value"]:
-        name = site["Name"]
-        liveurl = site["LiveUrl"]
-        isoffline = site["IsOffline"]
-        text += (f"Name: {name}\n LiveUrl: {liveurl}\n IsOffline: {isoffline}\n\n")   
-    return text 
\ No newline at end of file
+    return await read_collection(Site, SITES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor) 
\ No newline at end of file
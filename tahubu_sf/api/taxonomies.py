@@ -1,29 +1,37 @@
 """
 API endpoint for retrieving taxonomies
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Taxonomy, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 TAXONOMIES_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.classifications}"
 
-async def get_taxonomies() -> str:
+async def get_taxonomies(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current taxonomies and classifications from the Sitefinity site.
 
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+
     Returns:
-        str: A formatted string containing taxonomy details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing taxonomy details:
             - title: The title of the taxonomy
             - taxonname: The taxon name of the taxonomy
             - type: The type of the taxonomy (Hierarechical or Flat)
             - usecount: The number of times the taxonomy is shared on the site
     """
-    data = await make_request(TAXONOMIES_CONTENT_ENDPOINT)
-    
-    text = ""
-    for taxonomy in data["value"]:
-        title = taxonomy["Title"]
-        taxonname = taxonomy["TaxonName"]
-        type = taxonomy["Type"]
-        usecount = taxonomy["TaxonomySharedWith"]
-        text += (f"Title: {title}\n TaxonName: {taxonname}\n Type: {type}\n UseCount: {str(usecount)}\n\n")   
-    return text
+    return await read_collection(Taxonomy, TAXONOMIES_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor)
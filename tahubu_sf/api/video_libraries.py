@@ -1,27 +1,36 @@
 """
 API endpoint for retrieving videos
 """
+from typing import Any, Dict, List, Optional, Union
+
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request
+from tahubu_sf.models import Video, read_collection
+from tahubu_sf.utils.formatting import OutputFormat
+from tahubu_sf.utils.paging import Budget
 
 VIDEOS_CONTENT_ENDPOINT = f"{ENDPOINTS.content}/{CONTENT_TYPES.videos}"
 
-async def get_videos() -> str:
+async def get_videos(
+    format: OutputFormat = "text",
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get the current videos from the Sitefinity site.
     
+    Args:
+        format: "text" for a formatted string, "json" for a list of records
+        max_items: Maximum number of items to return
+        max_chars: Maximum size of the returned items, in characters
+        max_tokens: Approximate maximum size of the returned items, in tokens
+        cursor: The next_cursor of a previous truncated result, to continue after it
+    
     Returns:
-        str: A formatted string containing video details:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: Formatted text or records containing video details:
             - title: The title of the video
             - url: The url of the video
             - publicationdate: The publication date of the video
     """
-    data = await make_request(VIDEOS_CONTENT_ENDPOINT)
-    
-    text = ""
-    for video in data["value"]:
-        title = video["Title"]
-        url = video["Url"]
-        publicationdate = video["PublicationDate"]
-        text += (f"Title: {title}\n Url: {url}\n Publication Date: {publicationdate}\n\n")   
-    return text 
\ No newline at end of file
+    return await read_collection(Video, VIDEOS_CONTENT_ENDPOINT, format, Budget.from_args(max_items, max_chars, max_tokens), cursor) 
\ No newline at end of file
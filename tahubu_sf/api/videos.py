@@ -7,8 +7,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from tahubu_sf.config.settings import ENDPOINTS, CONTENT_TYPES
-from tahubu_sf.utils.http import make_request, make_post_request
+from tahubu_sf.models import Parent, fetch_records
+from tahubu_sf.utils.http import make_post_request
 from tahubu_sf.utils import generate_url_name
+from tahubu_sf.utils.preflight import preflight, remember_created
 
 logger = logging.getLogger(__name__)
 
@@ -59,10 +61,14 @@ async def create_video(
         
         logger.debug(f"Generated URL name: {url_name}")
 
+        # Catch items Sitefinity would reject without sending them
+        await preflight(CONTENT_TYPES.videos, post_data, parent=CONTENT_TYPES.video_libraries)
+
         endpoint = VIDEOS_MANAGEMENT_ENDPOINT if draft else VIDEOS_CONTENT_ENDPOINT
         
         # Send POST request to create the blog post
         response = await make_post_request(endpoint, post_data)
+        remember_created(CONTENT_TYPES.videos, post_data, response)
         
         logger.info(f"Video draft created successfully: {response.get('Id', 'unknown ID')}")
         return response
@@ -78,8 +84,7 @@ async def get_video_libraries() -> Dict[str, str]:
         Dict[str, str]: Dictionary of video library IDs and their titles
     """
     try:
-        data = await make_request(VIDEOLIBRARIES_CONTENT_ENDPOINT)
-        vlibraries = {video["Id"]: video["Title"] for video in data.get("value", [])}
+        vlibraries = {parent.id: parent.title for parent in await fetch_records(Parent, VIDEOLIBRARIES_CONTENT_ENDPOINT)}
         logger.info(f"Found {len(vlibraries)} video libraries")
         return vlibraries
     except Exception as e:
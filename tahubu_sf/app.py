@@ -2,28 +2,16 @@
 Main application entry point for TahubuSF
 """
 import logging
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
 
 from tahubu_sf.config.settings import APP_NAME
-from tahubu_sf.api.news import get_news, create_news_item
-from tahubu_sf.api.blog_posts import create_blog_post, get_parent_blogs, get_blog_posts, get_blog_post_by_id
-from tahubu_sf.api.pages import get_pages, get_page_templates
-from tahubu_sf.api.sites import get_sites
-from tahubu_sf.api.lists import get_list_items
-from tahubu_sf.api.list_items import create_list_item, get_parent_lists
-from tahubu_sf.api.calendars import get_events
-from tahubu_sf.api.events import get_calendars, create_event
-from tahubu_sf.api.shared_content import get_shared_content
-from tahubu_sf.api.albums import get_images
-from tahubu_sf.api.images import create_image, get_albums
-from tahubu_sf.api.document_libraries import get_documents
-from tahubu_sf.api.documents import create_document, get_document_libraries
-from tahubu_sf.api.videos import create_video, get_video_libraries
-from tahubu_sf.api.video_libraries import get_videos
-from tahubu_sf.api.search_indexes import get_search_indexes
-from tahubu_sf.api.taxonomies import get_taxonomies
-from tahubu_sf.api.section_presets import get_section_presets
-from tahubu_sf.api.forms import get_forms
+from tahubu_sf.catalog import catalog_tools
+from tahubu_sf.resources import add_resources, watcher
+from tahubu_sf.utils.loop_monitor import monitor_event_loop
+from tahubu_sf.utils.profiling import profiled_tool
+from tahubu_sf.utils.tracing import traced_tool
 
 
 # Configure logging
@@ -33,6 +21,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Monitor event-loop lag, watch resources for changes and maintain site digests while the MCP server runs, then close upstream connections"""
+    # Imported here so building the server does not load httpx (see tahubu_sf.catalog)
+    from tahubu_sf.api.digest import digests
+    from tahubu_sf.utils.http import close_pools
+    try:
+        async with monitor_event_loop() as monitor, watcher.running(), digests.running():
+            yield {"loop_monitor": monitor, "resource_watcher": watcher, "site_digests": digests}
+    finally:
+        await close_pools()
+
 def create_app() -> FastMCP:
     """
     Create and configure the MCP application
@@ -41,44 +41,17 @@ def create_app() -> FastMCP:
         FastMCP: The configured application
     """
     logger.info(f"Creating {APP_NAME} application")
-    app = FastMCP(APP_NAME)
+    app = FastMCP(APP_NAME, lifespan=lifespan)
     
-    # Register API tools
-    tools = [
-        get_news,
-        create_news_item,
-        get_blog_posts,
-        get_pages,
-        get_page_templates,
-        get_sites,
-        create_blog_post,
-        get_parent_blogs,
-        get_blog_post_by_id,
-        get_list_items,
-        create_list_item,
-        get_parent_lists,
-        get_calendars,
-        get_events,
-        create_event,
-        get_shared_content,
-        get_images,
-        create_image,
-        get_albums,
-        get_documents,
-        create_document,
-        get_document_libraries,
-        get_videos,
-        create_video,
-        get_video_libraries, 
-        get_search_indexes,
-        get_taxonomies,
-        get_section_presets,
-        get_forms
-    ]
+    # Register API tools from the static catalog; implementations load on first call
+    tools = catalog_tools()
     
     # Register each tool
     for tool_func in tools:
-        app.tool()(tool_func)
+        app.tool()(traced_tool(profiled_tool(tool_func)))
+    
+    # Publish content collections and items as resources with change notifications
+    add_resources(app)
     
     logger.info(f"{APP_NAME} application created with {len(tools)} tools")
     return app 
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Static tool catalog with lazily imported implementations
+
+The MCP servers register tools from tool_catalog.json, which holds each tool's
+name, description and parameter signature. Implementation modules (and with them
+httpx and tenacity) are only imported when a tool is first called, so the STDIO
+server can answer the MCP handshake without loading any of tahubu_sf.api.
+Every registered tool also accepts an optional `tenant` argument selecting the
+Sitefinity instance the call runs against.
+
+Regenerate the catalog after changing a tool signature or docstring:
+
+    python -m tahubu_sf.catalog --write
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional, Tuple, Union
+
+from pydantic import Field
+
+from tahubu_sf.config.tenants import use_tenant
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_catalog.json")
+
+# Tool implementations in registration order, as "module:function"
+TOOL_TARGETS = [
+    "tahubu_sf.api.news:get_news",
+    "tahubu_sf.api.news:create_news_item",
+    "tahubu_sf.api.blog_posts:get_blog_posts",
+    "tahubu_sf.api.pages:get_pages",
+    "tahubu_sf.api.pages:get_page_templates",
+    "tahubu_sf.api.sites:get_sites",
+    "tahubu_sf.api.blog_posts:create_blog_post",
+    "tahubu_sf.api.blog_posts:get_parent_blogs",
+    "tahubu_sf.api.blog_posts:get_blog_post_by_id",
+    "tahubu_sf.api.lists:get_list_items",
+    "tahubu_sf.api.list_items:create_list_item",
+    "tahubu_sf.api.list_items:get_parent_lists",
+    "tahubu_sf.api.events:get_calendars",
+    "tahubu_sf.api.calendars:get_events",
+    "tahubu_sf.api.events:create_event",
+    "tahubu_sf.api.shared_content:get_shared_content",
+    "tahubu_sf.api.albums:get_images",
+    "tahubu_sf.api.images:create_image",
+    "tahubu_sf.api.images:get_albums",
+    "tahubu_sf.api.document_libraries:get_documents",
+    "tahubu_sf.api.documents:create_document",
+    "tahubu_sf.api.documents:get_document_libraries",
+    "tahubu_sf.api.video_libraries:get_videos",
+    "tahubu_sf.api.videos:create_video",
+    "tahubu_sf.api.videos:get_video_libraries",
+    "tahubu_sf.api.search_indexes:get_search_indexes",
+    "tahubu_sf.api.taxonomies:get_taxonomies",
+    "tahubu_sf.api.section_presets:get_section_presets",
+    "tahubu_sf.api.forms:get_forms",
+    "tahubu_sf.api.digest:get_site_digest",
+    "tahubu_sf.api.content:get_content_types",
+    "tahubu_sf.api.content:query_content",
+    "tahubu_sf.api.content:create_content",
+]
+
+# Names that may appear in catalog annotations
+_ANNOTATION_NAMESPACE = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "datetime": datetime,
+    "Any": Any,
+    "Dict": Dict,
+    "List": List,
+    "Literal": Literal,
+    "Optional": Optional,
+    "Union": Union,
+}
+
+@dataclass(frozen=True)
+class ToolParam:
+    """A single tool parameter as recorded in the catalog"""
+    name: str
+    annotation: str
+    default: Any = inspect.Parameter.empty
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A catalog entry describing one tool without importing it"""
+    name: str
+    target: str
+    description: str
+    parameters: Tuple[ToolParam, ...]
+    returns: str
+
+    def signature(self) -> inspect.Signature:
+        """Rebuild the implementation's signature from the catalog"""
+        return inspect.Signature(
+            [
+                inspect.Parameter(
+                    param.name,
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    default=param.default,
+                    annotation=_resolve_annotation(param.annotation),
+                )
+                for param in self.parameters
+            ],
+            return_annotation=_resolve_annotation(self.returns),
+        )
+
+def _annotation_to_str(annotation: Any) -> str:
+    if annotation is inspect.Parameter.empty:
+        return "Any"
+    if isinstance(annotation, type):
+        return annotation.__name__
+    return repr(annotation).replace("typing.", "").replace("datetime.datetime", "datetime")
+
+def _resolve_annotation(annotation: str) -> Any:
+    return eval(annotation, {"__builtins__": {}}, _ANNOTATION_NAMESPACE)
+
+def load_catalog(path: str = CATALOG_PATH) -> List[ToolSpec]:
+    """
+    Load the tool catalog without importing any tool implementation.
+
+    Returns:
+        List[ToolSpec]: Catalog entries in registration order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    return [
+        ToolSpec(
+            name=entry["name"],
+            target=entry["target"],
+            description=entry["description"],
+            parameters=tuple(
+                ToolParam(p["name"], p["annotation"], p.get("default", inspect.Parameter.empty))
+                for p in entry["parameters"]
+            ),
+            returns=entry["returns"],
+        )
+        for entry in entries
+    ]
+
+# Extra parameter added to every registered tool
+TENANT_PARAMETER = inspect.Parameter(
+    "tenant",
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    default=None,
+    annotation=Annotated[
+        Optional[str],
+        Field(description="Name of the Sitefinity tenant to use (defaults to the default tenant)"),
+    ],
+)
+
+_loaded: Dict[str, Callable] = {}
+
+def load_tool(target: str) -> Callable:
+    """
+    Import and return a tool implementation.
+
+    Args:
+        target: The implementation as "module:function"
+    """
+    func = _loaded.get(target)
+    if func is None:
+        module_name, attribute = target.split(":")
+        func = getattr(importlib.import_module(module_name), attribute)
+        _loaded[target] = func
+    return func
+
+def lazy_tool(spec: ToolSpec) -> Callable:
+    """
+    Create a proxy with the tool's name, docstring and signature that imports
+    the implementation on first call and runs it against the selected tenant.
+
+    Args:
+        spec: The catalog entry
+
+    Returns:
+        Callable: An async function suitable for FastMCP tool registration
+    """
+    implementation_signature = spec.signature()
+    signature = implementation_signature.replace(
+        parameters=[*implementation_signature.parameters.values(), TENANT_PARAMETER]
+    )
+
+    async def proxy(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        tenant = bound.arguments.pop("tenant", None)
+        with use_tenant(tenant):
+            return await load_tool(spec.target)(*bound.args, **bound.kwargs)
+
+    proxy.__name__ = proxy.__qualname__ = spec.name
+    proxy.__doc__ = spec.description
+    proxy.__signature__ = signature
+    proxy.__annotations__ = {
+        **{p.name: p.annotation for p in signature.parameters.values()},
+        "return": signature.return_annotation,
+    }
+    proxy.__module__ = spec.target.split(":")[0]
+    return proxy
+
+def catalog_tools() -> List[Callable]:
+    """Return lazy proxies for every tool in the catalog"""
+    return [lazy_tool(spec) for spec in load_catalog()]
+
+def build_catalog() -> List[Dict[str, Any]]:
+    """
+    Introspect the tool implementations and build catalog entries.
+
+    This imports every tool module and is only used to (re)generate the catalog.
+    """
+    entries = []
+    for target in TOOL_TARGETS:
+        func = load_tool(target)
+        parameters = []
+        for param in inspect.signature(func).parameters.values():
+            entry = {"name": param.name, "annotation": _annotation_to_str(param.annotation)}
+            if param.default is not inspect.Parameter.empty:
+                entry["default"] = param.default
+            parameters.append(entry)
+        entries.append({
+            "name": func.__name__,
+            "target": target,
+            "description": inspect.getdoc(func) or "",
+            "parameters": parameters,
+            "returns": _annotation_to_str(inspect.signature(func).return_annotation),
+        })
+    return entries
+
+def main():
+    """Write or check the tool catalog"""
+    parser = argparse.ArgumentParser(description="Generate the TahubuSF tool catalog")
+    parser.add_argument("--write", action="store_true", help="Write tool_catalog.json")
+    parser.add_argument("--check", action="store_true", help="Fail if tool_catalog.json is out of date")
+    args = parser.parse_args()
+
+    rendered = json.dumps(build_catalog(), indent=2) + "\n"
+    if args.write:
+        with open(CATALOG_PATH, "w", encoding="utf-8") as f:
+            f.write(rendered)
+        print(f"Wrote {CATALOG_PATH}")
+    elif args.check:
+        with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+            if f.read() != rendered:
+                print("tool_catalog.json is out of date; run: python -m tahubu_sf.catalog --write")
+                sys.exit(1)
+        print("tool_catalog.json is up to date")
+    else:
+        sys.stdout.write(rendered)
+
+if __name__ == "__main__":
+    main()
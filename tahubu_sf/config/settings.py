@@ -8,9 +8,9 @@ from types import SimpleNamespace
 load_dotenv()
 
 # Sitefinity Configuration
-SITEFINITY_SITE_PREFIX = os.getenv("SITEFINITY_SITE_PREFIX").rstrip("/")
-if not SITEFINITY_SITE_PREFIX or SITEFINITY_SITE_PREFIX == '':
-    raise ValueError("SITEFINITY_SITE_PREFIX must be set in the environment variables.")
+# Validation is deferred to validate_settings() so the MCP server can start (and
+# report a useful error on the first tool call) even when the prefix is missing.
+SITEFINITY_SITE_PREFIX = (os.getenv("SITEFINITY_SITE_PREFIX") or "").rstrip("/")
 
 SITEFINITY_FRONTEND_API_PATH = os.getenv("SITEFINITY_FRONTEND_API_ROUTE", "api/default").rstrip("/").lstrip("/")
 SITEFINITY_BACKEND_API_PATH = os.getenv("SITEFINITY_BACKEND_API_ROUTE", "sf/system").rstrip("/").lstrip("/")
@@ -21,6 +21,10 @@ API_KEY = os.getenv("SITEFINITY_API_KEY", None)
 AUTH_KEY = os.getenv("SITEFINITY_AUTH_KEY", None)
 USERNAME = os.getenv("SITEFINITY_USERNAME", None)
 PASSWORD = os.getenv("SITEFINITY_PASSWORD", None)
+# OpenID Connect client used with SITEFINITY_AUTH_TYPE=oidc
+CLIENT_ID = os.getenv("SITEFINITY_CLIENT_ID", None)
+CLIENT_SECRET = os.getenv("SITEFINITY_CLIENT_SECRET", None)
+OIDC_SCOPE = os.getenv("SITEFINITY_OIDC_SCOPE", "openid offline_access")
 
 ENDPOINTS = SimpleNamespace(
     content = f"{SITEFINITY_SITE_PREFIX}/{SITEFINITY_FRONTEND_API_PATH}",
@@ -67,4 +71,14 @@ elif AUTH_TYPE == "accesskey" and AUTH_KEY:
     DEFAULT_HEADERS["X-SF-Access-Key"] = AUTH_KEY
 
 # Application settings
-APP_NAME = "TahubuSFAPI" 
\ No newline at end of file
+APP_NAME = "TahubuSFAPI"
+
+def validate_settings() -> None:
+    """
+    Check that the settings required to reach Sitefinity are present.
+    
+    Raises:
+        ValueError: If SITEFINITY_SITE_PREFIX is not set
+    """
+    if not SITEFINITY_SITE_PREFIX:
+        raise ValueError("SITEFINITY_SITE_PREFIX must be set in the environment variables.")
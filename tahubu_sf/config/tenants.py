@@ -0,0 +1,208 @@
+"""
+Tenant registry for serving several Sitefinity instances from one process
+
+The site configured through SITEFINITY_SITE_PREFIX and the SITEFINITY_* auth
+variables is always available as the "default" tenant. Additional tenants are
+read from the JSON file named by SITEFINITY_TENANTS_FILE:
+
+    {
+        "default": "corporate",
+        "tenants": {
+            "corporate": {"site_prefix": "https://www.example.com", "auth_type": "apikey", "api_key_env": "CORP_API_KEY"},
+            "intranet": {"site_prefix": "https://intranet.example.com", "rate_limit_per_second": 5}
+        }
+    }
+"""
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from types import SimpleNamespace
+from typing import Dict, Iterator, Optional
+
+from tahubu_sf.config import settings
+
+DEFAULT_TENANT = "default"
+
+@dataclass
+class Tenant:
+    """Connection, authentication and limit settings for one Sitefinity instance"""
+    name: str
+    site_prefix: str
+    frontend_api_path: str = "api/default"
+    backend_api_path: str = "sf/system"
+    auth_type: str = "anonymous"
+    api_key: Optional[str] = None
+    auth_key: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    # OpenID Connect client for auth_type "oidc"
+    client_id: Optional[str] = None
+    client_secret: Optional[str] = None
+    scope: str = "openid offline_access"
+    # Connection pool size for this tenant's HTTP client
+    max_connections: int = 20
+    # Upstream requests allowed per second (None for unlimited)
+    rate_limit_per_second: Optional[float] = None
+    # Upstream requests allowed in flight at once (None for unlimited)
+    max_concurrency: Optional[int] = None
+    # Lifetime of cached GET responses in seconds (0 disables caching)
+    cache_ttl_seconds: float = 0
+    endpoints: SimpleNamespace = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.site_prefix = (self.site_prefix or "").rstrip("/")
+        self.frontend_api_path = self.frontend_api_path.strip("/")
+        self.backend_api_path = self.backend_api_path.strip("/")
+        self.auth_type = self.auth_type.lower()
+        self.endpoints = SimpleNamespace(
+            content=f"{self.site_prefix}/{self.frontend_api_path}",
+            management=f"{self.site_prefix}/{self.backend_api_path}",
+            authentication=f"{self.site_prefix}/Sitefinity/Authenticate/OpenID/connect/token",
+        )
+
+    def validate(self) -> None:
+        """
+        Check that the tenant can reach Sitefinity.
+
+        Raises:
+            ValueError: If the site prefix is missing
+        """
+        if not self.site_prefix:
+            if self.name == DEFAULT_TENANT:
+                settings.validate_settings()
+            raise ValueError(f"Tenant '{self.name}' has no site_prefix configured.")
+
+    def rebase(self, url: str) -> str:
+        """
+        Point a URL built from the default settings.ENDPOINTS at this tenant.
+
+        Tool modules build their endpoints once from settings.ENDPOINTS; this maps
+        them onto the tenant selected for the current call.
+        """
+        for default_base, tenant_base in (
+            (settings.ENDPOINTS.content, self.endpoints.content),
+            (settings.ENDPOINTS.management, self.endpoints.management),
+            (settings.ENDPOINTS.authentication, self.endpoints.authentication),
+        ):
+            if default_base != tenant_base and url.startswith(default_base):
+                return tenant_base + url[len(default_base):]
+        return url
+
+def _tenant_from_settings() -> Tenant:
+    """Build the default tenant from the environment-based settings"""
+    return Tenant(
+        name=DEFAULT_TENANT,
+        site_prefix=settings.SITEFINITY_SITE_PREFIX,
+        frontend_api_path=settings.SITEFINITY_FRONTEND_API_PATH,
+        backend_api_path=settings.SITEFINITY_BACKEND_API_PATH,
+        auth_type=settings.AUTH_TYPE,
+        api_key=settings.API_KEY,
+        auth_key=settings.AUTH_KEY,
+        username=settings.USERNAME,
+        password=settings.PASSWORD,
+        client_id=settings.CLIENT_ID,
+        client_secret=settings.CLIENT_SECRET,
+        scope=settings.OIDC_SCOPE,
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+        cache_ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "0")),
+    )
+
+def _tenant_from_config(name: str, config: Dict) -> Tenant:
+    """Build a tenant from a tenants file entry, resolving *_env secret references"""
+    known = {f.name for f in fields(Tenant) if f.init}
+    values = {}
+    for key, value in config.items():
+        if key.endswith("_env") and key[:-4] in known:
+            values[key[:-4]] = os.getenv(value)
+        elif key in known and key != "name":
+            values[key] = value
+        else:
+            raise ValueError(f"Unknown setting '{key}' for tenant '{name}'")
+    return Tenant(name=name, **values)
+
+class TenantRegistry:
+    """All configured tenants, keyed by name"""
+
+    def __init__(self, tenants: Dict[str, Tenant], default: str = DEFAULT_TENANT):
+        if default not in tenants:
+            raise ValueError(f"Default tenant '{default}' is not configured")
+        self.tenants = tenants
+        self.default = default
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> "TenantRegistry":
+        """
+        Load tenants from a JSON file, always including the environment-configured default.
+
+        Args:
+            path: Path of the tenants file, or None to use only the default tenant
+        """
+        tenants = {DEFAULT_TENANT: _tenant_from_settings()}
+        default = DEFAULT_TENANT
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            for name, tenant_config in config.get("tenants", {}).items():
+                tenant = _tenant_from_config(name, tenant_config)
+                tenant.validate()
+                tenants[name] = tenant
+            default = config.get("default", DEFAULT_TENANT)
+        return cls(tenants, default)
+
+    def get(self, name: Optional[str] = None) -> Tenant:
+        """
+        Look up a tenant by name.
+
+        Raises:
+            KeyError: If no tenant with that name is configured
+        """
+        key = name or self.default
+        try:
+            return self.tenants[key]
+        except KeyError:
+            raise KeyError(f"Unknown tenant: {key}") from None
+
+    def names(self):
+        return list(self.tenants)
+
+_registry: Optional[TenantRegistry] = None
+_current_tenant: ContextVar[Optional[str]] = ContextVar("tahubu_sf_tenant", default=None)
+
+def get_registry() -> TenantRegistry:
+    """Return the process-wide tenant registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = TenantRegistry.from_file(os.getenv("SITEFINITY_TENANTS_FILE"))
+    return _registry
+
+def set_registry(registry: Optional[TenantRegistry]) -> None:
+    """Replace the tenant registry (None reloads it from the environment on next use)"""
+    global _registry
+    _registry = registry
+
+def current_tenant() -> Tenant:
+    """Return the tenant selected for the current call"""
+    return get_registry().get(_current_tenant.get())
+
+@contextmanager
+def use_tenant(name: Optional[str]) -> Iterator[Tenant]:
+    """
+    Select the tenant for calls made inside the block.
+
+    Args:
+        name: The tenant name, or None to keep the current selection
+
+    Raises:
+        KeyError: If the tenant is not configured
+    """
+    if name is None:
+        yield current_tenant()
+        return
+    tenant = get_registry().get(name)
+    token = _current_tenant.set(name)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
@@ -0,0 +1,277 @@
+"""
+Typed records for Sitefinity content items
+
+Each record keeps only the properties a tool uses, in slotted instances, instead
+of the full OData dictionary with its dozens of unused keys. Records are built
+from decoded OData items with from_odata(), and content types that support
+$select ask Sitefinity for just those properties.
+"""
+from contextlib import aclosing
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, AsyncIterator, ClassVar, Dict, List, Optional, Tuple, Type, TypeVar, Union
+
+from tahubu_sf.utils.formatting import OutputFormat, render, render_page, render_stream
+from tahubu_sf.utils.http import make_request, make_streaming_request
+from tahubu_sf.utils.paging import Budget, decode_cursor
+from tahubu_sf.utils.workers import OFFLOAD_MIN_ITEMS, offload
+
+R = TypeVar("R", bound="Record")
+
+def odata(source: str, label: Optional[str] = None):
+    """
+    Declare a record field.
+
+    Args:
+        source: The Sitefinity property the value is read from
+        label: The label used in text output and as the JSON record key
+            (without spaces); defaults to the property name
+    """
+    return field(metadata={"source": source, "label": label or source})
+
+@lru_cache(maxsize=None)
+def _field_specs(cls: type) -> Tuple[Tuple[str, str, str], ...]:
+    """(attribute, source property, label) for each field of a record class"""
+    return tuple((f.name, f.metadata["source"], f.metadata["label"]) for f in fields(cls))
+
+@dataclass(slots=True, frozen=True)
+class Record:
+    """Base class for content records"""
+
+    # Whether the OData endpoint accepts $select for this content type
+    SELECTABLE: ClassVar[bool] = True
+
+    @classmethod
+    def from_odata(cls: Type[R], item: Dict[str, Any]) -> R:
+        """
+        Build a record from a decoded OData item.
+
+        Raises:
+            KeyError: If the item lacks one of the record's properties
+        """
+        return cls(*[item[source] for _, source, _ in _field_specs(cls)])
+
+    @classmethod
+    def from_collection(cls: Type[R], data: Dict[str, Any]) -> List[R]:
+        """Build records from the "value" array of an OData collection response"""
+        return [cls.from_odata(item) for item in data["value"]]
+
+    @classmethod
+    def select(cls) -> Optional[str]:
+        """Return the $select value listing the record's properties, if supported"""
+        if not cls.SELECTABLE:
+            return None
+        return ",".join(source for _, source, _ in _field_specs(cls))
+
+    def to_text(self) -> str:
+        """Render the record as a "Label: value" block followed by a blank line"""
+        return "\n ".join(f"{label}: {getattr(self, name)}" for name, _, label in _field_specs(type(self))) + "\n\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record keyed by label without spaces, keeping JSON value types"""
+        return {label.replace(" ", ""): getattr(self, name) for name, _, label in _field_specs(type(self))}
+
+@dataclass(slots=True, frozen=True)
+class Parent(Record):
+    """A container item (blog, list, calendar, album or library) offered for selection"""
+    id: str = odata("Id")
+    title: str = odata("Title")
+
+@dataclass(slots=True, frozen=True)
+class NewsItem(Record):
+    title: str = odata("Title")
+    summary: str = odata("Summary")
+    author: str = odata("Author")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class BlogPost(Record):
+    id: str = odata("Id")
+    publication_date: str = odata("PublicationDate")
+    title: str = odata("Title")
+    item_default_url: str = odata("ItemDefaultUrl")
+    allow_comments: bool = odata("AllowComments")
+    summary: str = odata("Summary")
+    parent_id: str = odata("ParentId")
+    content: str = odata("Content")
+
+@dataclass(slots=True, frozen=True)
+class Event(Record):
+    title: str = odata("Title")
+    summary: str = odata("Summary")
+    content: str = odata("Content")
+    event_start: str = odata("EventStart", "Event Start")
+    event_end: str = odata("EventEnd", "Event End")
+
+@dataclass(slots=True, frozen=True)
+class ListItem(Record):
+    title: str = odata("Title")
+    content: str = odata("Content")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class SharedContent(Record):
+    title: str = odata("Title")
+    content: str = odata("Content")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class Image(Record):
+    title: str = odata("Title")
+    embed_url: str = odata("EmbedUrl")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+    extension: str = odata("Extension")
+    total_size: int = odata("TotalSize", "Total Size")
+    width: int = odata("Width")
+    height: int = odata("Height")
+    alternative_text: str = odata("AlternativeText", "Alternative Text")
+
+@dataclass(slots=True, frozen=True)
+class Document(Record):
+    title: str = odata("Title")
+    extension: str = odata("Extension")
+    url: str = odata("Url")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class Video(Record):
+    title: str = odata("Title")
+    url: str = odata("Url")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class Page(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    title: str = odata("Title")
+    url_name: str = odata("UrlName", "urlName")
+    is_home_page: bool = odata("IsHomePage", "isHomePage")
+    publication_date: str = odata("PublicationDate", "Publication Date")
+
+@dataclass(slots=True, frozen=True)
+class PageTemplate(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    title: str = odata("Title")
+    framework: str = odata("Framework")
+    renderer: str = odata("Renderer")
+
+@dataclass(slots=True, frozen=True)
+class Site(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    name: str = odata("Name")
+    live_url: str = odata("LiveUrl")
+    is_offline: bool = odata("IsOffline")
+
+@dataclass(slots=True, frozen=True)
+class Form(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    title: str = odata("Title")
+    success_message: str = odata("SuccessMessage")
+    renderer: str = odata("Renderer")
+
+@dataclass(slots=True, frozen=True)
+class SearchIndex(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    name: str = odata("Name")
+    is_active: bool = odata("IsActive")
+    is_backend: bool = odata("IsBackend")
+
+@dataclass(slots=True, frozen=True)
+class SectionPreset(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    title: str = odata("Title")
+    thumbnail: str = odata("Thumbnail")
+
+@dataclass(slots=True, frozen=True)
+class Taxonomy(Record):
+    SELECTABLE: ClassVar[bool] = False
+
+    title: str = odata("Title")
+    taxon_name: str = odata("TaxonName")
+    type: str = odata("Type")
+    use_count: int = odata("TaxonomySharedWith", "UseCount")
+
+async def fetch_records(model: Type[R], url: str, params: Optional[Dict[str, Any]] = None) -> List[R]:
+    """
+    Fetch an OData collection as records, selecting only the model's properties.
+
+    Records rather than raw responses are what the response cache keeps.
+
+    Args:
+        model: The record class
+        url: The collection endpoint
+        params: Optional extra query parameters
+    """
+    return await make_request(url, params=_with_select(model, params), decode=model.from_collection)
+
+async def stream_records(model: Type[R], url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[R]:
+    """
+    Stream an OData collection as records, one item at a time.
+
+    Args:
+        model: The record class
+        url: The collection endpoint
+        params: Optional extra query parameters
+    """
+    async with aclosing(make_streaming_request(url, params=_with_select(model, params))) as items:
+        async for item in items:
+            yield model.from_odata(item)
+
+async def read_collection(
+    model: Type[Record],
+    url: str,
+    format: OutputFormat = "text",
+    budget: Budget = Budget(),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fetch and render an OData collection for a listing tool.
+
+    Without a budget or cursor the whole collection is rendered, from the
+    response cache or, with stream=True, as it is received. Otherwise one page
+    is streamed from the cursor's offset with $skip, and $top when max_items is
+    set, stopping as soon as the budget is reached.
+
+    Args:
+        model: The record class
+        url: The collection endpoint
+        format: "text" for a formatted string, "json" for a list of records
+        budget: Limits for this call
+        cursor: Continuation cursor from a previous truncated result
+        stream: Render the unbounded collection as it is received instead of caching it
+        params: Query options such as $filter and $orderby applied to the collection
+
+    Raises:
+        ValueError: If the cursor is invalid or was issued for another collection
+    """
+    if not budget and not cursor:
+        if stream:
+            return await render_stream(stream_records(model, url, params), format)
+        records = await fetch_records(model, url, params)
+        # Rendering thousands of records would hold up the event loop
+        return await offload(render, records, format, size=len(records), threshold=OFFLOAD_MIN_ITEMS)
+
+    resource = f"{model.__name__}:{url}"
+    if params:
+        resource += "?" + "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+    offset = decode_cursor(cursor, resource)
+    page_params: Dict[str, Any] = dict(params or {})
+    if offset:
+        page_params["$skip"] = offset
+    if budget.max_items is not None:
+        # One extra item tells whether another page exists
+        page_params["$top"] = budget.max_items + 1
+    return await render_page(stream_records(model, url, page_params), format, budget, offset, resource)
+
+def _with_select(model: Type[Record], params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    select = model.select()
+    if select is None:
+        return params
+    return {"$select": select, **(params or {})}
@@ -0,0 +1,304 @@
+"""
+Sitefinity collections and items as MCP resources
+
+Each collection in RESOURCE_COLLECTIONS is published as a resource listing its
+most recently modified items (sitefinity://blogposts), and every item is
+reachable through the resource template sitefinity://{collection}/{item_id}.
+
+Collections a client has read or subscribed to are watched: their index is
+refreshed in the background, bypassing the response cache. When it changes,
+cached reads of the collection are dropped and subscribers are notified. A
+changed item sends resources/updated for its URI. A changed collection also
+sends resources/updated for the collection's URI. An item added or removed
+also sends resources/list_changed. Writes made through this process trigger a
+refresh at once.
+
+Notifications are delivered on subscriptions/listen streams (protocol
+2026-07-28) and to sessions that used resources/subscribe (earlier versions),
+with MCP SDKs that provide mcp.server.subscriptions. With older SDKs the
+resources are still served, without notifications.
+"""
+import asyncio
+import logging
+import os
+import re
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Set
+
+from tahubu_sf.config.settings import CONTENT_TYPES, ENDPOINTS
+from tahubu_sf.config.tenants import Tenant, current_tenant
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.metrics import metrics
+
+try:
+    import mcp_types
+    from mcp.server.subscriptions import (
+        InMemorySubscriptionBus, ListenHandler, ResourcesListChanged, ResourceUpdated,
+    )
+except ImportError:
+    InMemorySubscriptionBus = None
+
+logger = logging.getLogger(__name__)
+
+URI_SCHEME = "sitefinity"
+# Item ids in resource URIs; anything else could add OData options to the upstream request
+_ITEM_ID = re.compile(r"^[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$")
+
+# Collections published as resources; all have Id, Title and LastModified
+RESOURCE_COLLECTIONS = (
+    CONTENT_TYPES.blogs, CONTENT_TYPES.blog_posts, CONTENT_TYPES.news, CONTENT_TYPES.lists,
+    CONTENT_TYPES.list_items, CONTENT_TYPES.calendars, CONTENT_TYPES.events, CONTENT_TYPES.albums,
+    CONTENT_TYPES.images, CONTENT_TYPES.document_libraries, CONTENT_TYPES.documents,
+    CONTENT_TYPES.video_libraries, CONTENT_TYPES.videos, CONTENT_TYPES.shared_content, CONTENT_TYPES.pages,
+)
+
+# Items listed by a collection resource, most recently modified first
+RESOURCE_INDEX_SIZE = int(os.getenv("RESOURCE_INDEX_SIZE", "100"))
+# Time between refreshes of watched collections (0 disables change notifications)
+RESOURCE_REFRESH_SECONDS = float(os.getenv("RESOURCE_REFRESH_SECONDS", "60"))
+
+def collection_uri(collection: str) -> str:
+    return f"{URI_SCHEME}://{collection}"
+
+def item_uri(collection: str, item_id: str) -> str:
+    return f"{URI_SCHEME}://{collection}/{item_id}"
+
+def _collection_of(uri: str) -> Optional[str]:
+    """Return the collection a resource URI belongs to, or None for foreign URIs"""
+    prefix = f"{URI_SCHEME}://"
+    if not uri.startswith(prefix):
+        return None
+    collection = uri[len(prefix):].split("/", 1)[0]
+    return collection if collection in RESOURCE_COLLECTIONS else None
+
+def _index_params() -> Dict[str, Any]:
+    return {"$select": "Id,Title,LastModified", "$orderby": "LastModified desc", "$top": RESOURCE_INDEX_SIZE}
+
+async def read_index(collection: str, refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    Read the index of a collection: Id, Title and LastModified of its most recently modified items.
+
+    Args:
+        collection: The collection name, e.g. "blogposts"
+        refresh: Bypass the response cache and store the fresh index in it
+
+    Returns:
+        List[Dict[str, Any]]: The index entries
+    """
+    from tahubu_sf.utils.http import make_request
+    data = await make_request(f"{ENDPOINTS.content}/{collection}", params=_index_params(), refresh=refresh)
+    return [
+        {"Id": item["Id"], "Title": item.get("Title"), "LastModified": item.get("LastModified")}
+        for item in data.get("value", [])
+    ]
+
+class ResourceWatcher:
+    """
+    Refreshes the index of watched collections and publishes the changes.
+
+    Collections are watched once a client reads or subscribes to one of their
+    resources. Events go to every registered subscription bus.
+    """
+
+    def __init__(self):
+        self.buses: List[Any] = []
+        self.watched: Set[str] = set()
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._due: Optional[asyncio.Event] = None
+        self._tenant: Optional[Tenant] = None
+        self._listening = False
+
+    def watch(self, collection: str) -> None:
+        """Start watching a collection"""
+        self.watched.add(collection)
+
+    def remember(self, collection: str, index: List[Dict[str, Any]]) -> None:
+        """Take an index read for a client as the baseline for later comparisons"""
+        self.watch(collection)
+        self._snapshots.setdefault(collection, {entry["Id"]: entry for entry in index})
+
+    def refresh_soon(self, collection: str) -> None:
+        """Refresh a watched collection without waiting for the next interval"""
+        if collection in self.watched and self._due is not None:
+            self._due.set()
+
+    async def refresh(self, collection: str) -> int:
+        """
+        Re-read one collection's index and publish what changed.
+
+        Returns:
+            int: The number of events published
+        """
+        index = {entry["Id"]: entry for entry in await read_index(collection, refresh=True)}
+        previous = self._snapshots.get(collection)
+        self._snapshots[collection] = index
+        if previous is None or previous == index:
+            return 0
+
+        events = [ResourceUpdated(item_uri(collection, item_id))
+                  for item_id, entry in index.items()
+                  if item_id in previous and previous[item_id] != entry]
+        events.append(ResourceUpdated(collection_uri(collection)))
+        if index.keys() != previous.keys():
+            events.append(ResourcesListChanged())
+
+        # Cached reads of the collection are now stale; the fresh index is loaded again on demand
+        from tahubu_sf.utils.http import invalidate_collection
+        invalidate_collection(current_tenant(), f"{ENDPOINTS.content}/{collection}")
+        metrics.counter("resources.changes", collection=collection).inc()
+        for event in events:
+            for bus in self.buses:
+                await bus.publish(event)
+        return len(events)
+
+    async def _refresh_all(self) -> None:
+        for collection in sorted(self.watched):
+            try:
+                await self.refresh(collection)
+            except Exception as e:
+                logger.warning(f"Could not refresh the {collection} resources: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._due.wait(), RESOURCE_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._due.clear()
+            await self._refresh_all()
+
+    def _on_write(self, tenant: Tenant, url: str) -> None:
+        from tahubu_sf.utils.http import collection_name
+        if tenant is self._tenant:
+            self.refresh_soon(collection_name(url))
+
+    @asynccontextmanager
+    async def running(self):
+        """Refresh watched collections in the background while the block runs"""
+        if not self.buses or RESOURCE_REFRESH_SECONDS <= 0 or self._task is not None:
+            yield self
+            return
+        # Imported here so building the server does not load httpx (see tahubu_sf.catalog)
+        from tahubu_sf.utils.http import add_write_listener
+        if not self._listening:
+            add_write_listener(self._on_write)
+            self._listening = True
+        self._tenant = current_tenant()
+        self._due = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            yield self
+        finally:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = self._due = None
+
+# Watcher shared by the MCP servers of this process
+watcher = ResourceWatcher()
+
+class _LegacySubscriptions:
+    """
+    resources/subscribe and resources/unsubscribe for sessions before protocol 2026-07-28.
+
+    Bus events are forwarded to the sessions subscribed to the updated URI;
+    list changes go to every session holding a subscription.
+    """
+
+    def __init__(self, bus):
+        self.sessions: Dict[str, "weakref.WeakSet"] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        bus.subscribe(self._deliver)
+
+    async def subscribe(self, ctx, params) -> "mcp_types.EmptyResult":
+        collection = _collection_of(params.uri)
+        if collection is not None:
+            watcher.watch(collection)
+        self.sessions.setdefault(params.uri, weakref.WeakSet()).add(ctx.session)
+        return mcp_types.EmptyResult()
+
+    async def unsubscribe(self, ctx, params) -> "mcp_types.EmptyResult":
+        self.sessions.get(params.uri, weakref.WeakSet()).discard(ctx.session)
+        return mcp_types.EmptyResult()
+
+    def _deliver(self, event) -> None:
+        if isinstance(event, ResourceUpdated):
+            sessions = set(self.sessions.get(event.uri, ()))
+            send = lambda session: session.send_resource_updated(event.uri)
+        else:
+            sessions = {session for subscribed in self.sessions.values() for session in subscribed}
+            send = lambda session: session.send_resource_list_changed()
+        for session in sessions:
+            task = asyncio.ensure_future(send(session))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+def _listen_handler(bus):
+    """Wrap the SDK's subscriptions/listen handler so subscribed collections are watched"""
+    handler = ListenHandler(bus)
+
+    async def listen(ctx, params):
+        for uri in params.notifications.resource_subscriptions or ():
+            collection = _collection_of(uri)
+            if collection is not None:
+                watcher.watch(collection)
+        return await handler(ctx, params)
+
+    return listen
+
+def _collection_reader(collection: str):
+    async def read_collection() -> str:
+        index = await read_index(collection)
+        watcher.remember(collection, index)
+        for entry in index:
+            entry["uri"] = item_uri(collection, entry["Id"])
+        return codec.dumps({"value": index}).decode()
+    return read_collection
+
+async def read_item(collection: str, item_id: str) -> str:
+    """Return one content item as JSON"""
+    if collection not in RESOURCE_COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+    if not _ITEM_ID.match(item_id):
+        raise ValueError(f"Invalid item id: {item_id!r}; expected a GUID")
+    from tahubu_sf.utils.http import make_request
+    watcher.watch(collection)
+    data = await make_request(f"{ENDPOINTS.content}/{collection}({item_id})")
+    return codec.dumps({key: value for key, value in data.items() if not key.startswith("@odata")}).decode()
+
+def add_resources(server) -> None:
+    """
+    Publish the content collections of the site as resources of a FastMCP server.
+
+    Args:
+        server: The FastMCP server
+    """
+    for collection in RESOURCE_COLLECTIONS:
+        server.resource(
+            collection_uri(collection),
+            name=collection,
+            description=f"The {RESOURCE_INDEX_SIZE} most recently modified {collection} (Id, Title, LastModified, uri)",
+            mime_type="application/json",
+        )(_collection_reader(collection))
+    server.resource(
+        f"{URI_SCHEME}://{{collection}}/{{item_id}}",
+        name="content_item",
+        description="A Sitefinity content item, e.g. sitefinity://blogposts/<id>",
+        mime_type="application/json",
+    )(read_item)
+
+    low_level = getattr(server, "_mcp_server", None)
+    if InMemorySubscriptionBus is None or not hasattr(low_level, "add_request_handler"):
+        logger.info("This MCP SDK has no subscription support; resources are served without change notifications")
+        return
+    bus = InMemorySubscriptionBus()
+    legacy = _LegacySubscriptions(bus)
+    # FastMCP has no public hook for these methods, so they go on its low-level server
+    low_level.add_request_handler("subscriptions/listen", mcp_types.SubscriptionsListenRequestParams, _listen_handler(bus))
+    low_level.add_request_handler("resources/subscribe", mcp_types.SubscribeRequestParams, legacy.subscribe)
+    low_level.add_request_handler("resources/unsubscribe", mcp_types.UnsubscribeRequestParams, legacy.unsubscribe)
+    watcher.buses.append(bus)
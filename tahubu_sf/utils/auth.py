@@ -0,0 +1,176 @@
+"""
+Authentication headers for Sitefinity requests
+
+Static credentials (API key, access key) are turned into headers once per tenant.
+OpenID Connect tokens are fetched from the tenant's token endpoint, kept in memory
+and refreshed in the background before they expire, so requests only wait for
+the token server on the very first call or after a token was rejected.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from tahubu_sf.config.tenants import Tenant
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.metrics import metrics
+from tahubu_sf.utils.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# Refresh tokens this many seconds before they expire
+REFRESH_MARGIN_SECONDS = float(os.getenv("AUTH_REFRESH_MARGIN_SECONDS", "60"))
+# Lifetime assumed when the token response has no expires_in
+DEFAULT_TOKEN_LIFETIME_SECONDS = 3600
+
+OIDC_AUTH_TYPE = "oidc"
+
+def static_auth_headers(tenant: Tenant) -> Dict[str, str]:
+    """
+    Build the authentication headers for tenants using static credentials.
+
+    Args:
+        tenant: The tenant to authenticate against
+
+    Returns:
+        Dict[str, str]: Headers with the authentication information; empty for
+            anonymous access, missing credentials and OIDC tenants
+    """
+    auth_type = tenant.auth_type
+
+    # For anonymous, apikey, and accesskey types no additional token generation is needed
+    if auth_type == "anonymous":
+        logger.debug("Using anonymous authentication")
+        return {}
+
+    if auth_type == "apikey":
+        if not tenant.api_key:
+            logger.warning("API key authentication configured but no API key provided")
+            return {}
+        logger.debug("Using API key authentication")
+        return {"X-SF-APIKEY": tenant.api_key}
+
+    if auth_type == "accesskey" or auth_type == "authenticated":  # Support both names
+        if not tenant.auth_key:
+            logger.warning("Access key authentication configured but no access key provided")
+            return {}
+        logger.debug("Using Access Key authentication")
+        return {"X-SF-Access-Key": tenant.auth_key}
+
+    if auth_type == OIDC_AUTH_TYPE:
+        return {}
+
+    logger.warning(f"Unsupported authentication type: {auth_type}")
+    return {}
+
+class TokenManager:
+    """
+    OpenID Connect access tokens for one tenant.
+
+    Uses the password grant when the tenant has a username and password, and the
+    client credentials grant otherwise. A token is refreshed in the background
+    REFRESH_MARGIN_SECONDS before it expires (with the refresh token when the
+    server issued one), and concurrent callers needing a new token share a single
+    request to the token endpoint.
+    """
+
+    def __init__(self, tenant: Tenant, client: httpx.AsyncClient, refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        self.tenant = tenant
+        self.client = client
+        self.refresh_margin = refresh_margin
+        self._headers: Optional[Dict[str, str]] = None
+        self._expires_at = 0.0
+        self._refresh_token: Optional[str] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def headers(self) -> Dict[str, str]:
+        """
+        Return the Authorization header for the current token, fetching one if needed.
+
+        Raises:
+            httpx.HTTPStatusError: If the token endpoint rejects the credentials
+            ValueError: If the tenant has no OIDC client configured
+        """
+        if self._headers is not None and time.monotonic() < self._expires_at:
+            return self._headers
+        return await self.refresh()
+
+    async def refresh(self) -> Dict[str, str]:
+        """Fetch a new token, joining a refresh that is already in flight"""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._fetch_done)
+        # Shielded so a cancelled caller does not cancel the refresh other callers wait on
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self) -> None:
+        """Drop the current token, e.g. after Sitefinity rejected it with 401"""
+        self._headers = None
+        self._expires_at = 0.0
+
+    def close(self) -> None:
+        """Stop the background refresh"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _fetch_done(self, task: asyncio.Task) -> None:
+        self._inflight = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Token refresh for tenant '{self.tenant.name}' failed: {task.exception()}")
+
+    def _grant(self) -> Dict[str, str]:
+        tenant = self.tenant
+        if not tenant.client_id:
+            raise ValueError(f"Tenant '{tenant.name}' uses OIDC authentication but has no client_id configured")
+        form = {"client_id": tenant.client_id}
+        if tenant.client_secret:
+            form["client_secret"] = tenant.client_secret
+        if self._refresh_token:
+            form.update(grant_type="refresh_token", refresh_token=self._refresh_token)
+        elif tenant.username and tenant.password:
+            form.update(grant_type="password", username=tenant.username, password=tenant.password, scope=tenant.scope)
+        else:
+            form.update(grant_type="client_credentials", scope=tenant.scope)
+        return form
+
+    async def _fetch(self) -> Dict[str, str]:
+        form = self._grant()
+        grant_type = form["grant_type"]
+        url = self.tenant.endpoints.authentication
+        with start_span("sitefinity.token", tenant=self.tenant.name, grant_type=grant_type):
+            response = await self.client.post(url, data=form, headers={"Accept": "application/json"})
+            metrics.counter(
+                "sitefinity.auth.token_requests", tenant=self.tenant.name, grant_type=grant_type, status=response.status_code
+            ).inc()
+            if response.is_error and grant_type == "refresh_token":
+                # The refresh token expired or was revoked; start over with the primary grant
+                logger.info(f"Refresh token rejected for tenant '{self.tenant.name}', requesting a new token")
+                self._refresh_token = None
+                return await self._fetch()
+            response.raise_for_status()
+
+        token = codec.loads(response.content)
+        lifetime = float(token.get("expires_in") or DEFAULT_TOKEN_LIFETIME_SECONDS)
+        self._refresh_token = token.get("refresh_token") or self._refresh_token
+        self._headers = {"Authorization": f"{token.get('token_type') or 'Bearer'} {token['access_token']}"}
+        # Callers stop using the token a little before it expires, even if the background refresh is late
+        self._expires_at = time.monotonic() + lifetime - min(self.refresh_margin, lifetime / 2) / 2
+        self._schedule_refresh(lifetime)
+        logger.debug(f"Obtained access token for tenant '{self.tenant.name}', valid for {lifetime:.0f}s")
+        return self._headers
+
+    def _schedule_refresh(self, lifetime: float) -> None:
+        self.close()
+        delay = max(lifetime - self.refresh_margin, lifetime / 2)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._refresh_in_background)
+
+    def _refresh_in_background(self) -> None:
+        self._timer = None
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._fetch_done)
@@ -0,0 +1,118 @@
+"""
+Namespaced response cache with single-flight loading
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from tahubu_sf.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    LRU cache of decoded Sitefinity responses with per-entry expiry.
+
+    Entries are grouped by namespace (one per tenant) so tenants never see each
+    other's data and can be invalidated independently. Concurrent misses for the
+    same key share a single upstream request. Cached values are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        entry_key = (namespace, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[entry_key]
+            return None
+        self._entries.move_to_end(entry_key)
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value for ttl seconds, evicting the least recently used entries"""
+        entry_key = (namespace, key)
+        self._entries[entry_key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the cached value or load it, sharing one load between concurrent callers.
+
+        Args:
+            namespace: Cache namespace, usually the tenant name
+            key: Key within the namespace
+            ttl: Lifetime of a newly loaded value in seconds
+            loader: Coroutine factory producing the value on a miss
+        """
+        value = self.get(namespace, key)
+        if value is not None:
+            metrics.counter("cache.hits", namespace=namespace).inc()
+            return value
+
+        entry_key = (namespace, key)
+        pending = self._inflight.get(entry_key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            metrics.counter("cache.coalesced", namespace=namespace).inc()
+            return await asyncio.shield(pending)
+
+        metrics.counter("cache.misses", namespace=namespace).inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[entry_key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; retrieve it so an unawaited future does not warn
+            future.exception()
+            raise
+        else:
+            self.set(namespace, key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(entry_key) is future:
+                del self._inflight[entry_key]
+
+    def invalidate(self, namespace: Optional[str] = None, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            namespace: Only drop entries in this namespace (all namespaces if None)
+            match: Only drop entries whose key satisfies this predicate
+
+        Returns:
+            int: Number of entries removed
+        """
+        doomed = [
+            entry_key for entry_key in self._entries
+            if (namespace is None or entry_key[0] == namespace) and (match is None or match(entry_key[1]))
+        ]
+        for entry_key in doomed:
+            del self._entries[entry_key]
+        return len(doomed)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Cache shared by all tenants; each tenant uses its own namespace
+response_cache = ResponseCache()
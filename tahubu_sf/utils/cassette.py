@@ -0,0 +1,281 @@
+"""
+Record and replay Sitefinity HTTP exchanges
+
+A cassette is a JSON Lines file (gzip-compressed when the name ends in .gz)
+with one upstream exchange per line. Credentials are never written: request
+headers are not recorded, and secrets in query strings and token responses
+are redacted. Replay serves the recorded responses in
+order for each method and URL. It can reproduce the original timings,
+scaled timings, or no delay at all, so production-shaped workloads can be
+benchmarked offline:
+
+    SITEFINITY_CASSETTE=traffic.jsonl.gz SITEFINITY_CASSETTE_MODE=record python run.py
+    SITEFINITY_CASSETTE=traffic.jsonl.gz SITEFINITY_CASSETTE_TIMING=0.5 python benchmarks/loadtest.py ...
+"""
+import asyncio
+import atexit
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Query parameters whose names contain any of these are redacted; request
+# headers (Authorization, X-SF-Access-Key, cookies) are never recorded at all
+SECRET_MARKERS = ("token", "secret", "password", "key", "code")
+# Fields of JSON response bodies that hold credentials, e.g. token responses
+SECRET_FIELDS = frozenset({"access_token", "refresh_token", "id_token", "client_secret", "password"})
+REDACTED = "REDACTED"
+
+# Response headers worth keeping; hop-by-hop and length/encoding headers are
+# recomputed because cassettes store decoded bodies
+KEPT_RESPONSE_HEADERS = ("content-type", "etag", "last-modified", "retry-after", "location", "odata-version")
+
+def _is_secret(name: str) -> bool:
+    name = name.lower()
+    return any(marker in name for marker in SECRET_MARKERS)
+
+def _redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(name, REDACTED if _is_secret(name) else value) for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _redact_body(body: bytes, content_type: str) -> bytes:
+    """Blank out secret fields (e.g. access_token) of a JSON object body"""
+    if "json" not in content_type:
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(data, dict) or SECRET_FIELDS.isdisjoint(data):
+        return body
+    return json.dumps({name: REDACTED if name in SECRET_FIELDS else value for name, value in data.items()}).encode("utf-8")
+
+def match_key(method: str, url: str) -> Tuple[str, str]:
+    """Method and URL with a sorted query, so parameter order does not matter"""
+    parts = urlsplit(_redact_url(url))
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return method.upper(), urlunsplit(parts._replace(query=query))
+
+class CassetteMissError(LookupError):
+    """Raised on replay when the cassette holds no response for a request"""
+
+class Cassette:
+    """
+    Recorded exchanges, loaded from and appended to a cassette file.
+
+    Args:
+        path: Cassette file; written with gzip when it ends in .gz
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def load(self) -> "Cassette":
+        """Read every exchange in the file"""
+        with self._open("r") as f:
+            self.interactions = [json.loads(line) for line in f if line.strip()]
+        self._queues.clear()
+        for interaction in self.interactions:
+            self._queues[match_key(interaction["method"], interaction["url"])].append(interaction)
+        return self
+
+    def append(self, interaction: Dict[str, Any]) -> None:
+        """
+        Add one exchange and write it to the file straight away.
+
+        The file is opened on the first exchange and kept open until close(), so
+        a .gz cassette is one gzip stream. Safe to call from worker threads.
+        """
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.interactions.append(interaction)
+            if self._file is None:
+                self._file = self._open("a")
+                atexit.register(self.close)
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the file being recorded to; a later append opens it again"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                atexit.unregister(self.close)
+
+    def next_response(self, method: str, url: str) -> Dict[str, Any]:
+        """
+        Return the next recorded exchange for a request.
+
+        Exchanges with the same method and URL are served in recorded order and
+        then start over, so a short recording can drive a long benchmark.
+
+        Raises:
+            CassetteMissError: If nothing was recorded for the request
+        """
+        queue = self._queues.get(match_key(method, url))
+        if not queue:
+            raise CassetteMissError(f"No recorded response for {method} {_redact_url(url)} in {self.path}")
+        interaction = queue.popleft()
+        queue.append(interaction)
+        return interaction
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(body).decode("ascii")}
+
+def _decode_body(interaction: Dict[str, Any]) -> bytes:
+    if "body_base64" in interaction:
+        return base64.b64decode(interaction["body_base64"])
+    return interaction.get("body", "").encode("utf-8")
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Send requests over the network and append every exchange to a cassette.
+
+    Args:
+        cassette: Cassette to append to
+        transport: Transport doing the real work; defaults to a new httpx.AsyncHTTPTransport
+    """
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        headers_ms = (time.perf_counter() - started) * 1000
+        try:
+            # A transport response is still encoded; reading it through a Response decodes it
+            body = await httpx.Response(response.status_code, headers=response.headers, stream=response.stream).aread()
+        finally:
+            await response.aclose()
+        total_ms = (time.perf_counter() - started) * 1000
+
+        headers = {name: value for name, value in response.headers.items() if name.lower() in KEPT_RESPONSE_HEADERS}
+        # Writing (and compressing) is file I/O, kept off the event loop
+        await asyncio.to_thread(self.cassette.append, {
+            "method": request.method,
+            "url": _redact_url(str(request.url)),
+            "status": response.status_code,
+            "headers": headers,
+            "headers_ms": round(headers_ms, 2),
+            "total_ms": round(total_ms, 2),
+            **_encode_body(_redact_body(body, headers.get("content-type", ""))),
+        })
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        await asyncio.to_thread(self.cassette.close)
+
+class _DelayedBody(httpx.AsyncByteStream):
+    """Response body that arrives after a delay, like a body still on the wire"""
+
+    def __init__(self, body: bytes, delay: float):
+        self.body = body
+        self.delay = delay
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        if self.delay > 0:
+            await asyncio.sleep(self.delay)
+        yield self.body
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Answer requests from a cassette without touching the network.
+
+    Args:
+        cassette: Loaded cassette to serve responses from
+        timing: Multiplier of the recorded timings; 0 replays without delays
+    """
+
+    def __init__(self, cassette: Cassette, timing: float = 0.0):
+        self.cassette = cassette
+        self.timing = timing
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self.cassette.next_response(request.method, str(request.url))
+        body = _decode_body(interaction)
+        headers_delay = interaction.get("headers_ms", 0) * self.timing / 1000
+        body_delay = max(0.0, interaction.get("total_ms", 0) * self.timing / 1000 - headers_delay)
+        if headers_delay > 0:
+            await asyncio.sleep(headers_delay)
+        headers = dict(interaction.get("headers", {}), **{"Content-Length": str(len(body))})
+        return httpx.Response(interaction["status"], headers=headers, stream=_DelayedBody(body, body_delay), request=request)
+
+def parse_timing(value: str) -> float:
+    """
+    Parse a timing setting: "none", "original" or a multiplier such as "0.5"
+
+    Raises:
+        ValueError: If the value is none of these
+    """
+    value = value.strip().lower()
+    if value in ("", "none"):
+        return 0.0
+    if value == "original":
+        return 1.0
+    timing = float(value)
+    if timing < 0:
+        raise ValueError(f"Cassette timing must not be negative, got {value}")
+    return timing
+
+def cassette_transport_factory(path: str, mode: str = REPLAY, timing: float = 0.0):
+    """
+    Build a transport factory for http.set_transport_factory.
+
+    Args:
+        path: Cassette file
+        mode: "record" to append live exchanges, "replay" to serve them
+        timing: Replay timing multiplier (see ReplayTransport)
+
+    Returns:
+        Callable: Returns a new transport sharing one cassette for each pool
+
+    Raises:
+        ValueError: If mode is not record or replay
+        FileNotFoundError: If a replayed cassette does not exist
+    """
+    cassette = Cassette(path)
+    if mode == RECORD:
+        logger.info(f"Recording Sitefinity exchanges to {path}")
+        return lambda: RecordingTransport(cassette)
+    if mode == REPLAY:
+        cassette.load()
+        logger.info(f"Replaying {len(cassette.interactions)} Sitefinity exchanges from {path} (timing x{timing})")
+        return lambda: ReplayTransport(cassette, timing)
+    raise ValueError(f"Cassette mode must be {RECORD} or {REPLAY}, got {mode}")
+
+# Cassette selected through the environment, applied by tahubu_sf.utils.http
+CASSETTE_PATH = os.getenv("SITEFINITY_CASSETTE", "")
+CASSETTE_MODE = os.getenv("SITEFINITY_CASSETTE_MODE", REPLAY).lower()
+CASSETTE_TIMING = parse_timing(os.getenv("SITEFINITY_CASSETTE_TIMING", "none"))
@@ -0,0 +1,130 @@
+"""
+Pluggable JSON codec for Sitefinity payloads and API responses
+
+orjson or msgspec are used when installed, falling back to the standard library
+json module. Select a backend explicitly with the JSON_CODEC environment variable
+(auto, orjson, msgspec or json).
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Backends tried, in order, when JSON_CODEC is "auto"
+PREFERRED_CODECS = ("orjson", "msgspec", "json")
+
+@dataclass(frozen=True)
+class Codec:
+    """A JSON backend: loads accepts bytes or str, dumps returns compact UTF-8 bytes"""
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+def _default(obj: Any) -> Any:
+    """Serialize the values our tools send that JSON has no type for"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _orjson_codec() -> Codec:
+    import orjson
+
+    return Codec(
+        "orjson",
+        orjson.loads,
+        lambda obj: orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS),
+    )
+
+def _msgspec_codec() -> Codec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Match the ValueError raised by the other backends
+            raise ValueError(str(e)) from e
+
+    return Codec("msgspec", loads, encoder.encode)
+
+def _stdlib_codec() -> Codec:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+    return Codec("json", json.loads, lambda obj: encoder.encode(obj).encode("utf-8"))
+
+_FACTORIES: Dict[str, Callable[[], Codec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+def available_codecs() -> List[str]:
+    """Return the names of the backends that can be loaded in this environment"""
+    names = []
+    for name in PREFERRED_CODECS:
+        try:
+            _FACTORIES[name]()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Load a JSON backend.
+
+    Args:
+        name: Backend name, or None/"auto" for the fastest one installed
+
+    Returns:
+        Codec: The requested backend, or the standard library if it is not installed
+
+    Raises:
+        ValueError: If the backend name is not known
+    """
+    if name in (None, "", "auto"):
+        candidates = PREFERRED_CODECS
+    elif name in _FACTORIES:
+        candidates = (name, "json")
+    else:
+        raise ValueError(f"Unknown JSON codec '{name}'. Use one of: auto, {', '.join(_FACTORIES)}")
+
+    for candidate in candidates:
+        try:
+            return _FACTORIES[candidate]()
+        except ImportError:
+            if candidate == name:
+                logger.warning(f"JSON codec '{name}' is not installed, falling back to the standard library")
+    return _stdlib_codec()
+
+_active = get_codec(os.getenv("JSON_CODEC", "auto"))
+logger.debug(f"Using JSON codec: {_active.name}")
+
+def set_codec(name: Optional[str]) -> Codec:
+    """Switch the backend used by loads() and dumps()"""
+    global _active
+    _active = get_codec(name)
+    return _active
+
+def active_codec() -> Codec:
+    """Return the backend used by loads() and dumps()"""
+    return _active
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    return _active.loads(data)
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON"""
+    return _active.dumps(obj)
@@ -0,0 +1,222 @@
+"""
+HTTP content-encoding negotiation and response compression
+
+Brotli (brotli or brotlicffi) and Zstandard (zstandard) are used when installed,
+alongside gzip from the standard library. These are the same modules httpx uses
+to decode responses, so the encodings advertised upstream are always decodable.
+"""
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+# Fast settings: most of the size reduction for a fraction of the CPU of the maximum levels
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# Content types worth compressing; images, video and archives are already compressed
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# Server-sent events must reach the client as soon as they are written
+STREAMING_TYPES = ("text/event-stream",)
+
+def available_encodings() -> List[str]:
+    """Return the content encodings this process can produce, most preferred first"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+def accept_encoding() -> str:
+    """Return the Accept-Encoding header value to send to Sitefinity"""
+    return ", ".join(available_encodings() + ["deflate"])
+
+def negotiate(header: Optional[str], encodings: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Choose a content encoding from a client's Accept-Encoding header.
+
+    Args:
+        header: The Accept-Encoding request header
+        encodings: Encodings the server offers, most preferred first
+
+    Returns:
+        Optional[str]: The chosen encoding, or None to send the body as is
+    """
+    if not header:
+        return None
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    offered = list(encodings if encodings is not None else available_encodings())
+    wildcard = weights.get("*", 0.0)
+    ranked: List[Tuple[float, int, str]] = []
+    for preference, encoding in enumerate(offered):
+        quality = weights.get(encoding, wildcard)
+        if quality > 0:
+            ranked.append((-quality, preference, encoding))
+    return min(ranked)[2] if ranked else None
+
+class Compressor:
+    """Incremental compressor with a common interface for every encoding"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._obj.compress, self._obj.flush
+        elif encoding == "br" and brotli is not None:
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = getattr(self._obj, "process", None) or self._obj.compress
+            self._finish = self._obj.finish
+        elif encoding == "zstd" and zstandard is not None:
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._compress, self._finish = self._obj.compress, self._obj.flush
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given encoding"""
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the best encoding the client accepts.
+
+    Bodies below minimum_size, content that is already encoded or not
+    compressible, and event streams are passed through unchanged. Streamed
+    responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings or available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = _header(scope["headers"], b"accept-encoding")
+        encoding = negotiate(header.decode("latin-1") if header else None, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.minimum_size))
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+class _CompressingSender:
+    """Wraps an ASGI send callable for one response"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = message.get("headers", [])
+            content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+            if (
+                _header(headers, b"content-encoding") is not None
+                or content_type.startswith(STREAMING_TYPES)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                # Hold the headers until the first body chunk shows whether compression pays off
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = Compressor(self.encoding)
+            headers = [
+                (key, value) for key, value in start.get("headers", [])
+                if key.lower() not in (b"content-length", b"content-encoding")
+            ]
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            vary = _header(headers, b"vary")
+            if vary is None:
+                headers.append((b"vary", b"Accept-Encoding"))
+            elif b"accept-encoding" not in vary.lower():
+                headers = [(k, v + b", Accept-Encoding" if k.lower() == b"vary" else v) for k, v in headers]
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                await self.send({**start, "headers": headers})
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send({**start, "headers": headers})
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
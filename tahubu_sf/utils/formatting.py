@@ -0,0 +1,129 @@
+"""
+Rendering of Sitefinity collections as text or structured records
+"""
+from contextlib import aclosing
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Literal, Union
+
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.paging import Budget, encode_cursor
+
+# Output formats accepted by the listing tools
+OutputFormat = Literal["text", "json"]
+
+def _check_format(format: str) -> None:
+    if format not in ("text", "json"):
+        raise ValueError(f"Unsupported format '{format}'. Use 'text' or 'json'.")
+
+def render(records: Iterable[Any], format: OutputFormat = "text") -> Union[str, List[Dict[str, Any]]]:
+    """
+    Render content records in the requested output format.
+
+    Args:
+        records: Records from tahubu_sf.models
+        format: "text" for "Label: value" blocks separated by blank lines,
+            "json" for a list of compact records keeping their JSON types
+
+    Returns:
+        Union[str, List[Dict[str, Any]]]: The rendered records
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    _check_format(format)
+    if format == "text":
+        return "".join(record.to_text() for record in records)
+    return [record.to_dict() for record in records]
+
+async def render_stream(records: AsyncIterable[Any], format: OutputFormat = "text") -> Union[str, List[Dict[str, Any]]]:
+    """
+    Render records from a streamed collection as they arrive.
+
+    Args:
+        records: Records yielded by tahubu_sf.models.stream_records
+        format: "text" for a formatted string, "json" for a list of records
+
+    Returns:
+        Union[str, List[Dict[str, Any]]]: The rendered records
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    _check_format(format)
+    if format == "text":
+        return "".join([record.to_text() async for record in records])
+    return [record.to_dict() async for record in records]
+
+async def render_page(
+    records: AsyncIterator[Any],
+    format: OutputFormat,
+    budget: Budget,
+    offset: int,
+    resource: str,
+) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Render records until a budget is reached, with a cursor to the rest.
+
+    The stream is closed as soon as the budget is reached, so the remainder of
+    the collection is never downloaded. An item larger than the whole size budget
+    is returned clipped when it is the first of the page, so every call progresses.
+
+    Args:
+        records: Records starting at `offset`
+        format: "text" for a formatted string, "json" for a list of records
+        budget: Limits for this page
+        offset: Index of the first record within the collection
+        resource: Identifies the collection in continuation cursors
+
+    Returns:
+        Union[str, List[Dict[str, Any]], Dict[str, Any]]: The rendered records. When
+            the page is truncated, text ends with a line holding the cursor and JSON
+            becomes {"value": [...], "next_cursor": "..."}.
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    _check_format(format)
+    char_limit = budget.char_limit
+    rendered: List[Any] = []
+    size = 0
+    truncated = False
+    async with aclosing(records):
+        async for record in records:
+            if budget.max_items is not None and len(rendered) == budget.max_items:
+                truncated = True
+                break
+            part = record.to_text() if format == "text" else record.to_dict()
+            part_size = len(part) if format == "text" else len(codec.dumps(part))
+            if char_limit is not None and size + part_size > char_limit:
+                if not rendered:
+                    rendered.append(_clip(part, char_limit))
+                truncated = True
+                break
+            rendered.append(part)
+            size += part_size
+
+    next_cursor = encode_cursor(resource, offset + len(rendered)) if truncated else None
+    if format == "json":
+        return {"value": rendered, "next_cursor": next_cursor} if truncated else rendered
+    text = "".join(rendered)
+    if truncated:
+        text += (
+            f"[Showing items {offset + 1}-{offset + len(rendered)}. More items are available: "
+            f'call again with cursor="{next_cursor}"]\n'
+        )
+    return text
+
+def _clip(part: Union[str, Dict[str, Any]], limit: int) -> Union[str, Dict[str, Any]]:
+    """Shorten a rendered item to about `limit` characters, cutting its longest strings first"""
+    if isinstance(part, str):
+        return part[:limit] + "…\n\n"
+    clipped = dict(part)
+    excess = len(codec.dumps(clipped)) - limit
+    for key in sorted(clipped, key=lambda k: -len(clipped[k]) if isinstance(clipped[k], str) else 0):
+        value = clipped[key]
+        if excess <= 0 or not isinstance(value, str):
+            break
+        keep = max(len(value) - excess, 0)
+        clipped[key] = value[:keep] + "…"
+        excess -= len(value) - keep
+    return clipped
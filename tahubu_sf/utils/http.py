@@ -1,15 +1,29 @@
 """
 HTTP client utilities for making API requests
 """
+import asyncio
 import logging
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential, retry_if_exception
 
-from tahubu_sf.config.settings import DEFAULT_HEADERS, AUTH_TYPE, AUTH_KEY, API_KEY, ENDPOINTS
+from tahubu_sf.config.settings import AUTH_TYPE
+from tahubu_sf.config.tenants import Tenant, current_tenant, get_registry, use_tenant
+from tahubu_sf.utils import codec
+from tahubu_sf.utils.auth import OIDC_AUTH_TYPE, TokenManager, static_auth_headers
+from tahubu_sf.utils.cache import response_cache
+from tahubu_sf.utils.cassette import CASSETTE_MODE, CASSETTE_PATH, CASSETTE_TIMING, cassette_transport_factory
+from tahubu_sf.utils.compression import accept_encoding
+from tahubu_sf.utils.streaming import ValueArrayParser
+from tahubu_sf.utils.tracing import start_span, current_span, inject_trace_headers
+from tahubu_sf.utils.metrics import metrics, SIZE_BUCKETS
 
 logger = logging.getLogger(__name__)
 
@@ -18,57 +32,354 @@ MAX_RETRIES = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
 MIN_WAIT = float(os.getenv("RETRY_MIN_SECONDS", "1"))
 MAX_WAIT = float(os.getenv("RETRY_MAX_SECONDS", "5"))
 
+# Calls slower than this are logged with their full phase breakdown
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "2000"))
+
 logger.debug(f"Initialized retry configuration: MAX_ATTEMPTS={MAX_RETRIES}, MIN_WAIT={MIN_WAIT}s, MAX_WAIT={MAX_WAIT}s")
 logger.debug(f"Authentication type: {AUTH_TYPE}")
 
-# Cache for the authentication token
-_AUTH_TOKEN = None
-_AUTH_HEADERS = {}
+# Headers sent with every Sitefinity request; Accept-Encoding lists only the
+# encodings httpx can decode in this environment (zstd and br need optional packages)
+BASE_HEADERS = {"Content-Type": "application/json", "Accept-Encoding": accept_encoding()}
 
-async def get_auth_token() -> Dict[str, str]:
+async def get_auth_token(tenant: Optional[Tenant] = None) -> Dict[str, str]:
     """
     Get authentication headers for Sitefinity API.
     
+    Static credentials are converted to headers once per pool; OIDC tokens come
+    from the pool's token cache and only wait for the token endpoint when no
+    valid token is held.
+    
+    Args:
+        tenant: The tenant to authenticate against (defaults to the current tenant)
+    
     Returns:
         Dict[str, str]: Headers with the authentication information
     """
-    # For anonymous, apikey, and accesskey types, the headers are already set in DEFAULT_HEADERS
-    # No additional token generation needed
-    if AUTH_TYPE == "anonymous":
-        logger.debug("Using anonymous authentication")
-        return {}
-    
-    if AUTH_TYPE == "apikey":
-        if not API_KEY:
-            logger.warning("API key authentication configured but no API key provided")
-            return {}
-        logger.debug("Using API key authentication")
-        return {"X-SF-APIKEY": API_KEY}
-    
-    if AUTH_TYPE == "accesskey" or AUTH_TYPE == "authenticated":  # Support both names
-        if not AUTH_KEY:
-            logger.warning("Access key authentication configured but no access key provided")
-            return {}
-        logger.debug("Using Access Key authentication")
-        return {"X-SF-Access-Key": AUTH_KEY}
-    
-    logger.warning(f"Unsupported authentication type: {AUTH_TYPE}")
-    return {}
-
-@retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_exponential(multiplier=1, min=MIN_WAIT, max=MAX_WAIT),
-    retry=retry_if_exception_type((httpx.HTTPStatusError, httpx.RequestError)),
-    reraise=True,
-    before_sleep=lambda retry_state: logger.warning(
-        f"Retry attempt {retry_state.attempt_number}/{MAX_RETRIES} after error: {retry_state.outcome.exception()}"
+    pool = get_pool(tenant or current_tenant())
+    if pool.tokens is not None:
+        return await pool.tokens.headers()
+    return pool.auth_headers
+
+async def prefetch_auth_tokens() -> None:
+    """Obtain OIDC tokens for every tenant that uses them, so first calls do not wait"""
+    tenants = [t for t in get_registry().tenants.values() if t.auth_type == OIDC_AUTH_TYPE and t.site_prefix]
+    results = await asyncio.gather(*(get_auth_token(tenant) for tenant in tenants), return_exceptions=True)
+    for tenant, result in zip(tenants, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not obtain an access token for tenant '{tenant.name}': {result}")
+
+_TIMER_EXTENSION = "tahubu_sf.phase_timer"
+
+class PhaseTimer:
+    """
+    Collects connection-phase timestamps for a single request.
+
+    httpcore reports progress through the `trace` request extension. Name resolution
+    happens inside connect_tcp, so DNS time is included in the connect phase.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        # Drop the "connection."/"http11."/"http2." prefix so HTTP/1.1 and HTTP/2 line up
+        name = event_name.split(".", 1)[-1]
+        self.marks.setdefault(name, time.perf_counter())
+
+    def _between(self, start: str, end: str) -> Optional[float]:
+        if start in self.marks and end in self.marks:
+            return (self.marks[end] - self.marks[start]) * 1000
+        return None
+
+    def phases(self) -> Dict[str, float]:
+        """
+        Compute phase durations in milliseconds.
+
+        Returns:
+            Dict[str, float]: connect (including DNS), tls, send, ttfb (server time),
+            download and total, omitting phases that did not happen
+        """
+        first_send = self.marks.get("send_request_headers.started")
+        phases = {
+            "queue": (first_send - self.started) * 1000 if first_send else None,
+            "connect": self._between("connect_tcp.started", "connect_tcp.complete"),
+            "tls": self._between("start_tls.started", "start_tls.complete"),
+            "send": self._between("send_request_headers.started", "send_request_body.complete"),
+            "ttfb": self._between("send_request_body.complete", "receive_response_headers.complete"),
+            "download": self._between("receive_response_headers.complete", "receive_response_body.complete"),
+            "total": (time.perf_counter() - self.started) * 1000,
+        }
+        if phases["queue"] is not None and phases["connect"] is not None:
+            # Connection setup is reported separately from time spent waiting for the pool
+            phases["queue"] -= phases["connect"] + (phases["tls"] or 0)
+        return {name: round(ms, 3) for name, ms in phases.items() if ms is not None}
+
+async def _start_phase_timer(request: httpx.Request) -> None:
+    """httpx request hook that attaches a PhaseTimer to the outgoing request"""
+    timer = PhaseTimer()
+    request.extensions["trace"] = timer.trace
+    request.extensions[_TIMER_EXTENSION] = timer
+
+EVENT_HOOKS = {"request": [_start_phase_timer]}
+
+def _record_response(response: httpx.Response, response_bytes: Optional[int] = None) -> None:
+    """
+    Record status, phase timings and body sizes of a completed response.
+    Streamed responses pass the number of body bytes they consumed. Wire bytes
+    are the body as transferred, before content decoding.
+
+    Timings feed the metrics registry and the active attempt span; calls slower
+    than SLOW_REQUEST_THRESHOLD_MS are logged as a structured record.
+    """
+    request = response.request
+    span = current_span()
+    if span is not None:
+        span.set_attribute("status_code", response.status_code)
+
+    timer = request.extensions.get(_TIMER_EXTENSION)
+    if timer is None:
+        return
+
+    phases = timer.phases()
+    request_bytes = len(request.content) if request.content else 0
+    if response_bytes is None:
+        response_bytes = len(response.content)
+    method = request.method
+    tenant = current_tenant().name
+
+    metrics.counter("sitefinity.http.requests", tenant=tenant, method=method, status=response.status_code).inc()
+    for phase, ms in phases.items():
+        metrics.histogram(f"sitefinity.http.{phase}_ms", method=method).observe(ms)
+    metrics.histogram("sitefinity.http.request_bytes", SIZE_BUCKETS, method=method).observe(request_bytes)
+    metrics.histogram("sitefinity.http.response_bytes", SIZE_BUCKETS, method=method).observe(response_bytes)
+    metrics.histogram("sitefinity.http.wire_bytes", SIZE_BUCKETS, method=method).observe(response.num_bytes_downloaded)
+
+    if span is not None:
+        for phase, ms in phases.items():
+            span.set_attribute(f"{phase}_ms", ms)
+        span.set_attribute("response_bytes", response_bytes)
+        span.set_attribute("wire_bytes", response.num_bytes_downloaded)
+
+    if phases["total"] >= SLOW_REQUEST_THRESHOLD_MS:
+        record = {
+            "tenant": tenant,
+            "method": method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "phases_ms": phases,
+            "request_bytes": request_bytes,
+            "response_bytes": response_bytes,
+            "wire_bytes": response.num_bytes_downloaded,
+            "http_version": response.http_version,
+        }
+        logger.warning(f"Slow Sitefinity call: {json.dumps(record)}")
+
+class TenantPool:
+    """
+    Connection pool and rate limits for one tenant.
+
+    httpx clients are bound to the event loop they first run on, so pools are
+    kept per tenant and per loop.
+    """
+
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+        transport = {"transport": _transport_factory()} if _transport_factory else {}
+        self.client = httpx.AsyncClient(
+            **transport,
+            event_hooks=EVENT_HOOKS,
+            limits=httpx.Limits(
+                max_connections=tenant.max_connections,
+                max_keepalive_connections=tenant.max_connections,
+            ),
+        )
+        self.auth_headers = static_auth_headers(tenant)
+        self.tokens = TokenManager(tenant, self.client) if tenant.auth_type == OIDC_AUTH_TYPE else None
+        self._semaphore = asyncio.Semaphore(tenant.max_concurrency) if tenant.max_concurrency else None
+        self._interval = 1.0 / tenant.rate_limit_per_second if tenant.rate_limit_per_second else 0.0
+        self._next_slot = 0.0
+
+    async def _wait_for_slot(self) -> None:
+        """Space requests at least 1/rate_limit_per_second apart"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            metrics.counter("sitefinity.http.rate_limited", tenant=self.tenant.name).inc()
+            await asyncio.sleep(slot - now)
+
+    async def aclose(self) -> None:
+        """Stop the token refresh and close the pool's connections"""
+        if self.tokens is not None:
+            self.tokens.close()
+        await self.client.aclose()
+
+    @asynccontextmanager
+    async def limit(self):
+        """Hold a rate-limit slot and a concurrency permit for one upstream request"""
+        if self._interval:
+            await self._wait_for_slot()
+        if self._semaphore is None:
+            yield
+            return
+        async with self._semaphore:
+            yield
+
+# Builds the transport of new pools instead of connecting to Sitefinity, e.g. an
+# httpx.ASGITransport wrapping the mock_sitefinity app for offline benchmarks
+_transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]] = None
+
+def set_transport_factory(factory: Optional[Callable[[], httpx.AsyncBaseTransport]]) -> None:
+    """
+    Route Sitefinity requests through transports built by factory.
+
+    Existing pools are closed so the next request uses the new transport.
+
+    Args:
+        factory: Returns a transport for each new pool, or None to use the network
+    """
+    global _transport_factory
+    _transport_factory = factory
+    for loop, loop_pools in list(_pools.items()):
+        for pool in loop_pools.values():
+            _discard(loop, pool)
+    _pools.clear()
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, TenantPool]]" = weakref.WeakKeyDictionary()
+# Closes of discarded pools still in progress, referenced so they are not collected
+_closing: Set[asyncio.Task] = set()
+
+def _discard(loop: asyncio.AbstractEventLoop, pool: TenantPool) -> None:
+    """Close a pool that is no longer used, on the loop its client is bound to"""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if loop is running:
+        task = loop.create_task(pool.aclose())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+    elif not loop.is_closed() and running is None:
+        loop.run_until_complete(pool.aclose())
+    elif pool.tokens is not None:
+        # The connections went with the loop; only the refresh timer is left to stop
+        pool.tokens.close()
+
+# Record or replay Sitefinity traffic when SITEFINITY_CASSETTE is set
+if CASSETTE_PATH:
+    set_transport_factory(cassette_transport_factory(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_TIMING))
+
+def get_pool(tenant: Tenant) -> TenantPool:
+    """Return the tenant's pool for the running event loop, creating it on first use"""
+    loop_pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    pool = loop_pools.get(tenant.name)
+    if pool is None or pool.tenant is not tenant:
+        if pool is not None:
+            _discard(asyncio.get_running_loop(), pool)
+        pool = loop_pools[tenant.name] = TenantPool(tenant)
+    return pool
+
+async def close_pools() -> None:
+    """Close the running loop's pools, e.g. when a server shuts down"""
+    loop_pools = _pools.pop(asyncio.get_running_loop(), {})
+    await asyncio.gather(*(pool.aclose() for pool in loop_pools.values()))
+
+def _request_headers(tenant: Tenant, headers: Optional[Dict[str, str]], auth_headers: Dict[str, str]) -> Dict[str, str]:
+    """Merge base, caller, authentication and trace headers for one request"""
+    request_headers = dict(BASE_HEADERS)
+    
+    # Add any custom headers
+    if headers:
+        request_headers.update(headers)
+    
+    # Add authentication headers if needed
+    if auth_headers:
+        request_headers.update(auth_headers)
+    
+    # Propagate the trace context to Sitefinity
+    inject_trace_headers(request_headers)
+    return request_headers
+
+def _forget_rejected_token(tenant: Tenant, response: httpx.Response) -> None:
+    """Drop a cached OIDC token Sitefinity rejected, so the retry fetches a new one"""
+    if response.status_code == 401:
+        pool = get_pool(tenant)
+        if pool.tokens is not None:
+            pool.tokens.invalidate()
+
+def _cache_key(
+    url: str,
+    params: Optional[Dict[str, Any]],
+    headers: Optional[Dict[str, str]],
+    decode: Optional[Callable] = None,
+):
+    """Build a cache key that is independent of parameter order"""
+    return (
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        tuple(sorted((headers or {}).items())),
+        decode,
+    )
+
+def collection_name(url: str) -> str:
+    """Return the collection segment of an OData URL, e.g. "blogposts" for .../blogposts(id)"""
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1].split("(", 1)[0]
+
+def invalidate_collection(tenant: Tenant, url: str) -> None:
+    """Drop cached reads of the collection url belongs to"""
+    collection = collection_name(url)
+    if collection:
+        response_cache.invalidate(tenant.name, match=lambda key: f"/{collection}" in key[0])
+
+# Called with the tenant and URL of every successful write, e.g. to look for
+# changes to the written collection right away
+_write_listeners: List[Callable[[Tenant, str], None]] = []
+
+def add_write_listener(listener: Callable[[Tenant, str], None]) -> None:
+    """Register a callback run after each successful POST to Sitefinity"""
+    _write_listeners.append(listener)
+
+# Status codes retried besides 5xx: 401 after the rejected OIDC token was dropped,
+# request timeouts and rate limiting. Other client errors would fail again.
+RETRYABLE_STATUS_CODES = frozenset({401, 408, 429})
+
+def _is_retryable(error: BaseException) -> bool:
+    """Whether a failed attempt is worth repeating"""
+    if isinstance(error, httpx.RequestError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status in RETRYABLE_STATUS_CODES
+    return False
+
+def _retrying() -> AsyncRetrying:
+    """
+    Build the retry policy shared by all Sitefinity requests.
+    
+    Returns:
+        AsyncRetrying: Iterator yielding one attempt context per try
+    """
+    return AsyncRetrying(
+        stop=stop_after_attempt(MAX_RETRIES),
+        wait=wait_exponential(multiplier=1, min=MIN_WAIT, max=MAX_WAIT),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+        before_sleep=lambda retry_state: logger.warning(
+            f"Retry attempt {retry_state.attempt_number}/{MAX_RETRIES} after error: {retry_state.outcome.exception()}"
+        )
     )
-)
+
 async def make_request(
     url: str, 
     headers: Optional[Dict[str, str]] = None, 
-    params: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
+    params: Optional[Dict[str, Any]] = None,
+    decode: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    refresh: bool = False
+) -> Any:
     """
     Make an HTTP GET request to the specified URL with automatic retries for transient errors.
     Will include authentication headers if configured.
@@ -77,51 +388,323 @@ async def make_request(
         url: The URL to make the request to
         headers: Optional headers to include in the request
         params: Optional query parameters
+        decode: Optional function converting the JSON response (e.g. into records);
+            its result is what gets cached
+        refresh: Bypass a cached response and replace it with the one loaded
         
     Returns:
-        The JSON response as a dictionary
+        The JSON response as a dictionary, or the result of decode
         
     Raises:
         httpx.HTTPStatusError: If the request fails after all retry attempts
+        ValueError: If the Sitefinity settings are incomplete
+        KeyError: If the selected tenant is not configured
     """
-    # Start with default headers
-    request_headers = dict(DEFAULT_HEADERS)
+    tenant = current_tenant()
+    tenant.validate()
+    url = tenant.rebase(url)
     
-    # Add any custom headers
-    if headers:
-        request_headers.update(headers)
+    async def load() -> Any:
+        data = await _with_retries("GET", tenant, url, lambda: _get(tenant, url, headers, params))
+        return decode(data) if decode else data
     
-    # Add authentication headers if needed (headers from DEFAULT_HEADERS might be overwritten here)
-    auth_headers = await get_auth_token()
-    if auth_headers:
-        request_headers.update(auth_headers)
+    # Serve repeated reads from the tenant's cache namespace when caching is enabled
+    if tenant.cache_ttl_seconds > 0:
+        key = _cache_key(url, params, headers, decode)
+        if refresh:
+            value = await load()
+            response_cache.set(tenant.name, key, value, tenant.cache_ttl_seconds)
+            return value
+        return await response_cache.get_or_load(tenant.name, key, tenant.cache_ttl_seconds, load)
+    return await load()
+
+async def _with_retries(method: str, tenant: Tenant, url: str, send) -> Dict[str, Any]:
+    """Run send() under the retry policy, with one span for the call and one per attempt"""
+    with start_span("sitefinity.request", method=method, url=url, tenant=tenant.name) as span:
+        async for attempt in _retrying():
+            with attempt:
+                attempt_number = attempt.retry_state.attempt_number
+                with start_span("sitefinity.attempt", method=method, url=url, attempt=attempt_number):
+                    result = await send()
+        if span is not None:
+            span.set_attribute("attempts", attempt_number)
+        return result
+
+async def _get(
+    tenant: Tenant,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Perform a single GET attempt. Retries are handled by make_request."""
+    request_headers = _request_headers(tenant, headers, await get_auth_token(tenant))
+    pool = get_pool(tenant)
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with pool.limit():
             logger.debug(f"Making GET request to {url}")
             logger.debug(f"Request headers: {request_headers}")
-            response = await client.get(url, headers=request_headers, params=params)
+            response = await pool.client.get(url, headers=request_headers, params=params)
+            _record_response(response)
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error occurred: {e}")
+        _forget_rejected_token(tenant, e.response)
         raise
     except httpx.RequestError as e:
         logger.error(f"Request error occurred: {e}")
+        metrics.counter("sitefinity.http.errors", error=type(e).__name__).inc()
         raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise
 
-@retry(
-    stop=stop_after_attempt(MAX_RETRIES),
-    wait=wait_exponential(multiplier=1, min=MIN_WAIT, max=MAX_WAIT),
-    retry=retry_if_exception_type((httpx.HTTPStatusError, httpx.RequestError)),
-    reraise=True,
-    before_sleep=lambda retry_state: logger.warning(
-        f"Retry attempt {retry_state.attempt_number}/{MAX_RETRIES} after error: {retry_state.outcome.exception()}"
-    )
-)
+async def make_streaming_request(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Make an HTTP GET request for an OData collection and yield the items of its
+    "value" array as they are received, without buffering the whole response.
+    Connection and HTTP errors are retried until the first item has been yielded.
+    Streamed reads bypass the response cache.
+    
+    Args:
+        url: The URL to make the request to
+        headers: Optional headers to include in the request
+        params: Optional query parameters
+        
+    Yields:
+        Dict[str, Any]: Each item of the collection, in order
+        
+    Raises:
+        httpx.HTTPStatusError: If the request fails after all retry attempts
+        ValueError: If the response is not a complete OData collection
+        KeyError: If the selected tenant is not configured
+    """
+    tenant = current_tenant()
+    tenant.validate()
+    url = tenant.rebase(url)
+    pool = get_pool(tenant)
+    
+    async with pool.limit():
+        response = await _with_retries("GET", tenant, url, lambda: _open_stream(tenant, url, headers, params))
+        parser = ValueArrayParser()
+        try:
+            async for chunk in response.aiter_bytes():
+                for item in parser.feed(chunk):
+                    yield item
+            parser.close()
+        finally:
+            await response.aclose()
+            _record_response(response, response_bytes=parser.bytes_received)
+
+class RawResponse:
+    """
+    Body of a Sitefinity response passed on without being decoded.
+
+    Iterate it once to receive the body as it arrives; the upstream connection
+    is released when the iteration ends or aclose() is called.
+    """
+
+    def __init__(self, content_type: str, chunks: AsyncIterator[bytes], length: Optional[int] = None):
+        self.content_type = content_type
+        self.length = length
+        self._chunks = chunks
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks
+
+    async def aclose(self) -> None:
+        await self._chunks.aclose()
+
+async def _single_chunk(body: bytes) -> AsyncIterator[bytes]:
+    yield body
+
+async def make_raw_request(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> RawResponse:
+    """
+    Make an HTTP GET request and return the response body as received, for callers
+    that forward Sitefinity JSON unchanged. Errors are raised (and retried) before
+    this returns, so callers can still report them.
+    
+    With caching enabled the body is cached as bytes, sharing one upstream request
+    between concurrent callers; otherwise it is streamed.
+    
+    Args:
+        url: The URL to make the request to
+        headers: Optional headers to include in the request
+        params: Optional query parameters
+        
+    Returns:
+        RawResponse: The content type and body of the response
+        
+    Raises:
+        httpx.HTTPStatusError: If the request fails after all retry attempts
+        ValueError: If the Sitefinity settings are incomplete
+        KeyError: If the selected tenant is not configured
+    """
+    tenant = current_tenant()
+    tenant.validate()
+    url = tenant.rebase(url)
+    
+    if tenant.cache_ttl_seconds > 0:
+        async def load() -> Tuple[str, bytes]:
+            return await _with_retries("GET", tenant, url, lambda: _get_bytes(tenant, url, headers, params))
+        
+        # bytes stands in for the decode function, keeping raw bodies apart from decoded ones
+        content_type, body = await response_cache.get_or_load(
+            tenant.name, _cache_key(url, params, headers, bytes), tenant.cache_ttl_seconds, load
+        )
+        return RawResponse(content_type, _single_chunk(body), len(body))
+    
+    stack = AsyncExitStack()
+    await stack.enter_async_context(get_pool(tenant).limit())
+    try:
+        response = await _with_retries("GET", tenant, url, lambda: _open_stream(tenant, url, headers, params))
+    except BaseException:
+        await stack.aclose()
+        raise
+    
+    async def chunks() -> AsyncIterator[bytes]:
+        received = 0
+        try:
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                yield chunk
+        finally:
+            await response.aclose()
+            # The body may be sent after the caller's tenant selection has ended
+            with use_tenant(tenant.name):
+                _record_response(response, response_bytes=received)
+            await stack.aclose()
+    
+    # The body is decompressed on the way through, so the upstream length no longer applies
+    length = None if "content-encoding" in response.headers else int(response.headers.get("content-length", 0)) or None
+    return RawResponse(response.headers.get("content-type", "application/json"), chunks(), length)
+
+async def _get_bytes(
+    tenant: Tenant,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Tuple[str, bytes]:
+    """Perform a single GET attempt returning the content type and undecoded body"""
+    request_headers = _request_headers(tenant, headers, await get_auth_token(tenant))
+    pool = get_pool(tenant)
+    
+    try:
+        async with pool.limit():
+            logger.debug(f"Making GET request to {url}")
+            response = await pool.client.get(url, headers=request_headers, params=params)
+            _record_response(response)
+            response.raise_for_status()
+            return response.headers.get("content-type", "application/json"), response.content
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred: {e}")
+        _forget_rejected_token(tenant, e.response)
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Request error occurred: {e}")
+        metrics.counter("sitefinity.http.errors", error=type(e).__name__).inc()
+        raise
+
+async def make_conditional_request(
+    url: str,
+    validators: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Optional[Tuple[bytes, Dict[str, str]]]:
+    """
+    Make an HTTP GET request that may be answered with 304 Not Modified, for
+    documents the caller caches itself. The response cache is not used.
+    
+    Args:
+        url: The URL to make the request to
+        validators: ETag and Last-Modified of the cached copy, as returned by an earlier call
+        headers: Optional headers to include in the request
+        
+    Returns:
+        Optional[Tuple[bytes, Dict[str, str]]]: The body and the validators of the new
+            response, or None if the cached copy is still current
+        
+    Raises:
+        httpx.HTTPStatusError: If the request fails after all retry attempts
+        ValueError: If the Sitefinity settings are incomplete
+        KeyError: If the selected tenant is not configured
+    """
+    tenant = current_tenant()
+    tenant.validate()
+    url = tenant.rebase(url)
+    
+    request_headers = dict(headers or {})
+    if validators and validators.get("etag"):
+        request_headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last-modified"):
+        request_headers["If-Modified-Since"] = validators["last-modified"]
+    return await _with_retries("GET", tenant, url, lambda: _get_conditional(tenant, url, request_headers))
+
+async def _get_conditional(
+    tenant: Tenant,
+    url: str,
+    headers: Dict[str, str]
+) -> Optional[Tuple[bytes, Dict[str, str]]]:
+    """Perform a single conditional GET attempt. Retries are handled by make_conditional_request."""
+    request_headers = _request_headers(tenant, headers, await get_auth_token(tenant))
+    pool = get_pool(tenant)
+    
+    try:
+        async with pool.limit():
+            logger.debug(f"Making conditional GET request to {url}")
+            response = await pool.client.get(url, headers=request_headers)
+            _record_response(response)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            validators = {name: response.headers[name] for name in ("etag", "last-modified") if name in response.headers}
+            return response.content, validators
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred: {e}")
+        _forget_rejected_token(tenant, e.response)
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Request error occurred: {e}")
+        metrics.counter("sitefinity.http.errors", error=type(e).__name__).inc()
+        raise
+
+async def _open_stream(
+    tenant: Tenant,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> httpx.Response:
+    """Send a single streamed GET attempt and return the response once its headers arrive"""
+    request_headers = _request_headers(tenant, headers, await get_auth_token(tenant))
+    client = get_pool(tenant).client
+    
+    try:
+        logger.debug(f"Making streaming GET request to {url}")
+        request = client.build_request("GET", url, headers=request_headers, params=params)
+        response = await client.send(request, stream=True)
+        if response.is_error:
+            # Read the (small) error body so it is logged and the connection is released
+            await response.aread()
+            _record_response(response)
+            response.raise_for_status()
+        return response
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred: {e}")
+        _forget_rejected_token(tenant, e.response)
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Request error occurred: {e}")
+        metrics.counter("sitefinity.http.errors", error=type(e).__name__).inc()
+        raise
+
 async def make_post_request(
     url: str,
     data: Dict[str, Any],
@@ -141,45 +724,58 @@ async def make_post_request(
         
     Raises:
         httpx.HTTPStatusError: If the request fails after all retry attempts
+        ValueError: If the Sitefinity settings are incomplete
+        KeyError: If the selected tenant is not configured
     """
-    # Start with default headers
-    request_headers = dict(DEFAULT_HEADERS)
+    tenant = current_tenant()
+    tenant.validate()
+    url = tenant.rebase(url)
     
-    # Add any custom headers
-    if headers:
-        request_headers.update(headers)
-    
-    # Add authentication headers if needed
-    auth_headers = await get_auth_token()
-    if auth_headers:
-        request_headers.update(auth_headers)
+    result = await _with_retries("POST", tenant, url, lambda: _post(tenant, url, data, headers))
+    invalidate_collection(tenant, url)
+    for listener in _write_listeners:
+        listener(tenant, url)
+    return result
+
+async def _post(
+    tenant: Tenant,
+    url: str,
+    data: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Perform a single POST attempt. Retries are handled by make_post_request."""
+    request_headers = _request_headers(tenant, headers, await get_auth_token(tenant))
+    pool = get_pool(tenant)
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with pool.limit():
             logger.debug(f"Making POST request to {url}")
             logger.debug(f"Request headers: {request_headers}")
             logger.debug(f"Request data: {data}")
             
-            response = await client.post(
+            response = await pool.client.post(
                 url, 
-                json=data, 
+                content=codec.dumps(data), 
                 headers=request_headers
             )
+            _record_response(response)
             response.raise_for_status()
             
             # Some POST responses may not include JSON content
             if response.headers.get("content-type", "").startswith("application/json"):
-                return response.json()
+                return codec.loads(response.content)
             else:
                 logger.debug(f"Response status: {response.status_code}")
                 return {"status": "success", "status_code": response.status_code}
                 
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error occurred: {e}")
+        _forget_rejected_token(tenant, e.response)
         logger.error(f"Response content: {e.response.content.decode() if hasattr(e, 'response') else 'No response'}")
         raise
     except httpx.RequestError as e:
         logger.error(f"Request error occurred: {e}")
+        metrics.counter("sitefinity.http.errors", error=type(e).__name__).inc()
         raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
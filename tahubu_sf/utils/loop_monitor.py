@@ -0,0 +1,130 @@
+"""
+Event-loop lag monitor and blocking-call detector
+
+A task on the loop sleeps LOOP_MONITOR_INTERVAL_MS at a time and records
+how late it wakes up in the event_loop.lag_ms histogram. That is the delay
+every other request on the loop suffered at the same moment. A watchdog
+thread checks the task's heartbeat. When the loop has not run it for
+LOOP_BLOCK_THRESHOLD_MS, whatever is running is blocking the loop. The
+watchdog counts it in event_loop.blocked and, with LOOP_MONITOR_STACKS on,
+logs the loop thread's stack while the blocking call is still on it.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from tahubu_sf.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_MONITOR_STACKS = os.getenv("LOOP_MONITOR_STACKS", "false").lower() in ("1", "true", "yes")
+
+LAG_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, float("inf"))
+
+class LoopMonitor:
+    """
+    Measure the running loop's scheduling lag and report calls blocking it.
+
+    Args:
+        interval_ms: Time between lag measurements
+        threshold_ms: How long the loop may go without running the monitor before it counts as blocked
+        dump_stacks: Log the loop thread's stack for every blocking call
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = LOOP_MONITOR_INTERVAL_MS,
+        threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS,
+        dump_stacks: bool = LOOP_MONITOR_STACKS,
+    ):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.dump_stacks = dump_stacks
+        self.max_lag_ms = 0.0
+        self.blocked = 0
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread = 0
+
+    def start(self) -> None:
+        """Start monitoring the running event loop"""
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        if self.threshold > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the measuring task and the watchdog"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            # The watchdog may be mid-way through logging a stack; wait for it off the loop
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        lag = metrics.histogram("event_loop.lag_ms", buckets=LAG_BUCKETS)
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag_ms = max(0.0, now - expected) * 1000
+            lag.observe(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            # The measuring task sleeps for up to one interval between heartbeats
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            self.blocked += 1
+            metrics.counter("event_loop.blocked").inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            if self.dump_stacks and frame is not None:
+                stack = "".join(traceback.format_stack(frame))
+                logger.warning(f"Event loop blocked for at least {stalled * 1000:.0f} ms by:\n{stack}")
+            else:
+                logger.warning(f"Event loop blocked for at least {stalled * 1000:.0f} ms")
+
+@asynccontextmanager
+async def monitor_event_loop():
+    """
+    Run a LoopMonitor for the duration of an application's lifespan.
+
+    Does nothing when LOOP_MONITOR_INTERVAL_MS is 0.
+
+    Yields:
+        Optional[LoopMonitor]: The running monitor, or None when disabled
+    """
+    if LOOP_MONITOR_INTERVAL_MS <= 0:
+        yield None
+        return
+    monitor = LoopMonitor()
+    monitor.start()
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
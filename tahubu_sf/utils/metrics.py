@@ -0,0 +1,135 @@
+"""
+In-process metrics registry for counters and latency histograms
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Tuple, Optional
+
+# Upper bounds (in milliseconds or bytes, depending on the metric) for histogram buckets
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf")
+)
+SIZE_BUCKETS: Tuple[float, ...] = (
+    1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, float("inf")
+)
+
+class Counter:
+    """A monotonically increasing value"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"type": "counter", "value": self._value}
+
+class Gauge:
+    """A value that can go up and down"""
+
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"type": "gauge", "value": self._value}
+
+class Histogram:
+    """
+    Bucketed distribution of observed values.
+
+    Percentiles are estimated from bucket upper bounds, which keeps memory constant
+    no matter how many values are observed.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._count += 1
+            self._sum += value
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the q-th percentile (0-100) from the bucket counts"""
+        if not self._count:
+            return None
+        rank = q / 100 * self._count
+        seen = 0
+        for bound, count in zip(self.buckets, self._counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self._max)
+        return self._max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": "histogram",
+            "count": self._count,
+            "sum": round(self._sum, 3),
+            "min": self._min,
+            "max": self._max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+class MetricsRegistry:
+    """Holds named metrics, each optionally split by labels"""
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, factory, name: str, labels: Dict[str, Any]):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+    def counter(self, name: str, **labels: Any) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, **labels: Any) -> Gauge:
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> Histogram:
+        return self._get(lambda: Histogram(buckets), name, labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return every metric as a JSON-serializable dictionary.
+
+        Returns:
+            Dict[str, Any]: Metrics keyed by name, with labels rendered as name{key=value}
+        """
+        result = {}
+        for (name, labels), metric in sorted(self._metrics.items()):
+            key = name
+            if labels:
+                key += "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+            result[key] = metric.snapshot()
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+# Global registry shared by all modules
+metrics = MetricsRegistry()
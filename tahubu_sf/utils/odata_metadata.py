@@ -0,0 +1,309 @@
+"""
+The OData $metadata document of a Sitefinity service, parsed and cached
+
+The document describes every entity set the service exposes, including the
+types of dynamic modules, which have no dedicated tool. It is fetched once per
+tenant and revalidated with If-None-Match / If-Modified-Since after
+ODATA_METADATA_TTL_SECONDS, so an unchanged schema costs a 304 response and is
+not parsed again.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from tahubu_sf.config.settings import ENDPOINTS
+from tahubu_sf.config.tenants import current_tenant
+from tahubu_sf.utils.http import make_conditional_request
+from tahubu_sf.utils.metrics import metrics
+from tahubu_sf.utils.workers import OFFLOAD_MIN_CHARS, offload
+
+logger = logging.getLogger(__name__)
+
+# Time a fetched $metadata document is used before it is revalidated
+ODATA_METADATA_TTL_SECONDS = float(os.getenv("ODATA_METADATA_TTL_SECONDS", "3600"))
+# Long text properties left out of the default $select of generic queries
+ODATA_LONG_TEXT_PROPERTIES = frozenset(
+    name.strip() for name in os.getenv("ODATA_LONG_TEXT_PROPERTIES", "Content").split(",") if name.strip()
+)
+
+METADATA_ENDPOINT = f"{ENDPOINTS.content}/$metadata"
+
+_INTEGER_TYPES = {"Edm.Byte", "Edm.SByte", "Edm.Int16", "Edm.Int32", "Edm.Int64"}
+_NUMBER_TYPES = _INTEGER_TYPES | {"Edm.Double", "Edm.Single", "Edm.Decimal"}
+_GUID = re.compile(r"^[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATE_TIME_OFFSET = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})$")
+
+def parse_datetime_offset(value: str) -> datetime:
+    """
+    Parse an OData DateTimeOffset such as 2024-05-01T09:00:00.1234567Z.
+
+    .NET writes up to seven fraction digits; datetime.fromisoformat accepts only
+    three or six before Python 3.11, so the fraction is cut or padded to six.
+
+    Raises:
+        ValueError: If the value is not a valid date and time
+    """
+    value = re.sub(r"\.(\d+)", lambda match: "." + match.group(1)[:6].ljust(6, "0"), value.replace("Z", "+00:00"), count=1)
+    return datetime.fromisoformat(value)
+
+class ODataSchemaError(ValueError):
+    """A content type or property the service does not have, or a value it would reject"""
+
+@dataclass(frozen=True)
+class PropertyInfo:
+    """A structural property of an entity type"""
+    name: str
+    # EDM type of the property, or of its elements for collections
+    type: str
+    nullable: bool = True
+    collection: bool = False
+    max_length: Optional[int] = None
+
+    @property
+    def primitive(self) -> bool:
+        return self.type.startswith("Edm.") and self.type != "Edm.Stream"
+
+@dataclass(frozen=True)
+class EntityInfo:
+    """An entity set with the properties of its entity type"""
+    name: str
+    type_name: str
+    key: Tuple[str, ...]
+    properties: Dict[str, PropertyInfo]
+    navigation: Tuple[str, ...] = ()
+
+    def default_select(self) -> List[str]:
+        """Properties read when a query does not name any: single primitive values other than long text"""
+        return [
+            prop.name for prop in self.properties.values()
+            if prop.primitive and not prop.collection and prop.name not in ODATA_LONG_TEXT_PROPERTIES
+        ]
+
+    def required(self) -> List[str]:
+        """
+        Properties a new item must have: non-nullable strings other than the key.
+
+        Sitefinity also declares value types such as dates and booleans
+        non-nullable, but fills in their defaults when they are omitted.
+        """
+        return [
+            prop.name for prop in self.properties.values()
+            if not prop.nullable and prop.type == "Edm.String" and not prop.collection and prop.name not in self.key
+        ]
+
+@dataclass(frozen=True)
+class Schema:
+    """The entity sets of an OData service"""
+    entity_sets: Dict[str, EntityInfo] = field(default_factory=dict)
+
+    def entity(self, name: str) -> EntityInfo:
+        """
+        Return an entity set by name.
+
+        Raises:
+            ODataSchemaError: If the service has no such entity set
+        """
+        entity = self.entity_sets.get(name)
+        if entity is None:
+            raise ODataSchemaError(
+                f"Unknown content type '{name}'. Available types: {', '.join(sorted(self.entity_sets))}"
+            )
+        return entity
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _children(element: ElementTree.Element, name: str) -> List[ElementTree.Element]:
+    return [child for child in element if _local(child.tag) == name]
+
+def parse_metadata(document: bytes) -> Schema:
+    """
+    Parse a CSDL $metadata document.
+
+    Args:
+        document: The XML document
+
+    Returns:
+        Schema: The entity sets, with properties inherited from base types resolved
+
+    Raises:
+        ODataSchemaError: If the document is not valid XML
+    """
+    try:
+        root = ElementTree.fromstring(document)
+    except ElementTree.ParseError as e:
+        raise ODataSchemaError(f"Invalid $metadata document: {e}") from None
+
+    types: Dict[str, ElementTree.Element] = {}
+    containers = []
+    for schema in root.iter():
+        if _local(schema.tag) != "Schema":
+            continue
+        prefixes = [schema.get("Namespace", "")] + ([schema.get("Alias")] if schema.get("Alias") else [])
+        for element in schema:
+            if _local(element.tag) == "EntityType":
+                for prefix in prefixes:
+                    types[f"{prefix}.{element.get('Name')}"] = element
+            elif _local(element.tag) == "EntityContainer":
+                containers.append(element)
+
+    def resolve(type_name: str, seen: Tuple[str, ...] = ()) -> Tuple[Tuple[str, ...], Dict[str, PropertyInfo], Tuple[str, ...]]:
+        element = types.get(type_name)
+        if element is None or type_name in seen:
+            return (), {}, ()
+        key, properties, navigation = resolve(element.get("BaseType", ""), seen + (type_name,))
+        keys = [ref.get("Name") for key_element in _children(element, "Key") for ref in _children(key_element, "PropertyRef")]
+        properties = dict(properties)
+        for prop in _children(element, "Property"):
+            edm_type = prop.get("Type", "Edm.String")
+            collection = edm_type.startswith("Collection(")
+            max_length = prop.get("MaxLength")
+            properties[prop.get("Name")] = PropertyInfo(
+                name=prop.get("Name"),
+                type=edm_type[len("Collection("):-1] if collection else edm_type,
+                nullable=prop.get("Nullable", "true").lower() != "false",
+                collection=collection,
+                max_length=int(max_length) if max_length and max_length.isdigit() else None,
+            )
+        navigation = navigation + tuple(prop.get("Name") for prop in _children(element, "NavigationProperty"))
+        return tuple(keys) or key, properties, navigation
+
+    entity_sets = {}
+    for container in containers:
+        for entity_set in _children(container, "EntitySet"):
+            key, properties, navigation = resolve(entity_set.get("EntityType", ""))
+            entity_sets[entity_set.get("Name")] = EntityInfo(
+                name=entity_set.get("Name"),
+                type_name=entity_set.get("EntityType", ""),
+                key=key,
+                properties=properties,
+                navigation=navigation,
+            )
+    return Schema(entity_sets)
+
+def _value_error(prop: PropertyInfo, value: Any) -> Optional[str]:
+    """Describe why a single value does not fit a property's type, or return None"""
+    if prop.type == "Edm.String":
+        if not isinstance(value, str):
+            return "must be a string"
+        if prop.max_length is not None and len(value) > prop.max_length:
+            return f"must be at most {prop.max_length} characters long (got {len(value)})"
+    elif prop.type == "Edm.Boolean":
+        if not isinstance(value, bool):
+            return "must be true or false"
+    elif prop.type in _NUMBER_TYPES:
+        expected = int if prop.type in _INTEGER_TYPES else (int, float)
+        if isinstance(value, bool) or not isinstance(value, expected):
+            return "must be an integer" if prop.type in _INTEGER_TYPES else "must be a number"
+    elif prop.type == "Edm.Guid":
+        if not isinstance(value, str) or not _GUID.match(value):
+            return "must be a GUID such as 2b5e4f1c-0000-4000-8000-000000000000"
+    elif prop.type == "Edm.DateTimeOffset":
+        if not isinstance(value, str) or not _DATE_TIME_OFFSET.match(value):
+            return "must be an ISO 8601 date and time with a time zone, e.g. 2024-05-01T09:00:00Z"
+        try:
+            parse_datetime_offset(value)
+        except ValueError:
+            return "is not a valid date and time"
+    elif prop.type == "Edm.Date":
+        try:
+            if not isinstance(value, str) or not _DATE.match(value):
+                raise ValueError(value)
+            date.fromisoformat(value)
+        except ValueError:
+            return "must be a date such as 2024-05-01"
+    return None
+
+def validate_payload(entity: EntityInfo, payload: Dict[str, Any], strict: bool = True) -> List[str]:
+    """
+    Check a new item against its entity type before it is sent to Sitefinity.
+
+    Args:
+        entity: The entity set the item is created in
+        payload: The item's properties
+        strict: Report properties the entity type does not have
+
+    Returns:
+        List[str]: The problems found, empty if Sitefinity should accept the item
+    """
+    problems = [f"{name} is required" for name in entity.required() if payload.get(name) is None]
+    for name, value in payload.items():
+        prop = entity.properties.get(name)
+        if prop is None:
+            if strict:
+                problems.append(f"{name} is not a property of {entity.name}")
+            continue
+        if value is None:
+            # Missing required properties were reported above
+            continue
+        if prop.collection:
+            if not isinstance(value, list):
+                problems.append(f"{name} must be a list")
+                continue
+            errors = [_value_error(prop, item) if item is not None else "must not be null" for item in value]
+            problems.extend(f"{name}[{index}] {error}" for index, error in enumerate(errors) if error)
+            continue
+        error = _value_error(prop, value)
+        if error:
+            problems.append(f"{name} {error}")
+    return problems
+
+@dataclass
+class _CachedSchema:
+    schema: Schema
+    validators: Dict[str, str]
+    checked: float
+
+_schemas: Dict[str, _CachedSchema] = {}
+_loading: Dict[str, asyncio.Task] = {}
+
+async def _load(tenant_name: str, cached: Optional[_CachedSchema]) -> Schema:
+    result = await make_conditional_request(METADATA_ENDPOINT, cached.validators if cached else None)
+    if result is None and cached is not None:
+        metrics.counter("odata.metadata.revalidated", tenant=tenant_name).inc()
+        cached.checked = time.monotonic()
+        return cached.schema
+    document, validators = result
+    # Sitefinity's document runs to megabytes on sites with many modules
+    schema = await offload(parse_metadata, document, size=len(document), threshold=OFFLOAD_MIN_CHARS)
+    metrics.counter("odata.metadata.loaded", tenant=tenant_name).inc()
+    logger.info(f"Loaded OData metadata with {len(schema.entity_sets)} entity sets")
+    _schemas[tenant_name] = _CachedSchema(schema, validators, time.monotonic())
+    return schema
+
+async def get_schema(refresh: bool = False) -> Schema:
+    """
+    Return the current tenant's OData schema, fetching or revalidating $metadata when due.
+
+    Concurrent callers share one request.
+
+    Args:
+        refresh: Revalidate the cached document even if it is not due yet
+
+    Returns:
+        Schema: The entity sets of the content service
+
+    Raises:
+        httpx.HTTPStatusError: If $metadata cannot be fetched
+    """
+    tenant = current_tenant()
+    cached = _schemas.get(tenant.name)
+    if cached is not None and not refresh and time.monotonic() - cached.checked < ODATA_METADATA_TTL_SECONDS:
+        return cached.schema
+    task = _loading.get(tenant.name)
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_load(tenant.name, cached))
+        _loading[tenant.name] = task
+    return await task
+
+def clear_schemas() -> None:
+    """Forget the cached documents of all tenants"""
+    _schemas.clear()
+    _loading.clear()
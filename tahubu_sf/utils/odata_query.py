@@ -0,0 +1,192 @@
+"""
+Validation and normalization of OData query options for the read-only proxy
+
+Queries are rewritten to one canonical form, so that queries differing only in
+spacing, keyword case, $select order or default values share a cache entry.
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Largest $top the proxy forwards; queries without $top get this page size
+ODATA_PROXY_MAX_TOP = int(os.getenv("ODATA_PROXY_MAX_TOP", "500"))
+
+# Sitefinity options selecting the culture, site or provider of the content
+PASSTHROUGH_OPTIONS = ("sf_culture", "sf_site", "sf_provider")
+QUERY_OPTIONS = ("$filter", "$select", "$orderby", "$top", "$skip", "$count") + PASSTHROUGH_OPTIONS
+
+# Operators and literals whose case OData ignores; function names are lowercased too
+_KEYWORDS = {
+    "eq", "ne", "gt", "ge", "lt", "le", "has", "in", "and", "or", "not",
+    "add", "sub", "mul", "div", "mod", "true", "false", "null",
+}
+_LOGICAL = {"and", "or", "not"}
+_TOKEN = re.compile(r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<punct>[(),])|(?P<word>[\w.:+\-/]+))")
+_PROPERTY = re.compile(r"^[A-Za-z_]\w*(?:/[A-Za-z_]\w*)*$")
+_GUID = re.compile(r"^[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$")
+
+class ODataQueryError(ValueError):
+    """A query option the proxy does not forward, reported to the client as 400 Bad Request"""
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        if match is None:
+            raise ODataQueryError(f"Unsupported character in $filter at position {pos}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "word" and text.lower() in _KEYWORDS:
+            text = text.lower()
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+def normalize_filter(expression: str) -> str:
+    """
+    Rewrite a $filter expression with canonical spacing and keyword case.
+
+    Property names and string literals are kept as written, since both are
+    case-sensitive.
+
+    Args:
+        expression: The $filter option
+
+    Returns:
+        str: The normalized expression
+
+    Raises:
+        ODataQueryError: If the expression contains unsupported characters or unbalanced parentheses
+    """
+    tokens = _tokenize(expression)
+    depth = 0
+    parts: List[str] = []
+    previous = None
+    for index, (kind, text) in enumerate(tokens):
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+            if depth < 0:
+                raise ODataQueryError("Unbalanced parentheses in $filter")
+        calls = kind == "word" and text not in _LOGICAL and index + 1 < len(tokens) and tokens[index + 1][1] == "("
+        if calls:
+            # Function names such as contains and startswith are case-insensitive
+            text = text.lower()
+        if previous is not None and not (
+            previous[1] in ("(", ",") or text in (")", ",") or (text == "(" and previous[0] == "call")
+        ):
+            parts.append(" ")
+        parts.append(text)
+        previous = ("call" if calls else kind, text)
+    if depth:
+        raise ODataQueryError("Unbalanced parentheses in $filter")
+    return "".join(parts)
+
+def _normalize_select(value: str) -> str:
+    properties = {part.strip() for part in value.split(",") if part.strip()}
+    for name in properties:
+        if name != "*" and not _PROPERTY.match(name):
+            raise ODataQueryError(f"Invalid property in $select: {name}")
+    return ",".join(sorted(properties))
+
+def _normalize_orderby(value: str) -> str:
+    clauses = []
+    for clause in value.split(","):
+        words = clause.split()
+        if not words:
+            continue
+        if not _PROPERTY.match(words[0]) or len(words) > 2 or (len(words) == 2 and words[1].lower() not in ("asc", "desc")):
+            raise ODataQueryError(f"Invalid $orderby clause: {clause.strip()}")
+        # Ascending is the default direction
+        clauses.append(words[0] + (" desc" if len(words) == 2 and words[1].lower() == "desc" else ""))
+    return ",".join(clauses)
+
+def _integer(option: str, value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise ODataQueryError(f"{option} must be an integer") from None
+    if number < 0:
+        raise ODataQueryError(f"{option} must not be negative")
+    return number
+
+def normalize_query(items: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Validate and normalize the query options of a proxied OData read.
+
+    Only the options in QUERY_OPTIONS are accepted, each at most once. Options
+    equal to their default ($skip=0, $count=false, an empty $filter) are dropped
+    and $top is capped at ODATA_PROXY_MAX_TOP.
+
+    Args:
+        items: Query parameters as (name, value) pairs
+
+    Returns:
+        Dict[str, str]: The normalized options, ready to send to Sitefinity
+
+    Raises:
+        ODataQueryError: If an option is unknown, repeated or invalid
+    """
+    query: Dict[str, str] = {}
+    for name, value in items:
+        option = name.lower()
+        if option not in QUERY_OPTIONS:
+            raise ODataQueryError(f"Unsupported query option: {name}")
+        if option in query:
+            raise ODataQueryError(f"Query option {name} given more than once")
+        query[option] = value
+
+    params: Dict[str, str] = {}
+    if query.get("$filter", "").strip():
+        params["$filter"] = normalize_filter(query["$filter"])
+    if "$select" in query:
+        select = _normalize_select(query["$select"])
+        if select and select != "*":
+            params["$select"] = select
+    if query.get("$orderby", "").strip():
+        params["$orderby"] = _normalize_orderby(query["$orderby"])
+    top = _integer("$top", query["$top"]) if "$top" in query else ODATA_PROXY_MAX_TOP
+    if top > ODATA_PROXY_MAX_TOP:
+        raise ODataQueryError(f"$top must not exceed {ODATA_PROXY_MAX_TOP}")
+    params["$top"] = str(top)
+    skip = _integer("$skip", query["$skip"]) if "$skip" in query else 0
+    if skip:
+        params["$skip"] = str(skip)
+    if "$count" in query:
+        count = query["$count"].strip().lower()
+        if count not in ("true", "false"):
+            raise ODataQueryError("$count must be true or false")
+        if count == "true":
+            params["$count"] = "true"
+    for option in PASSTHROUGH_OPTIONS:
+        if query.get(option):
+            params[option] = query[option]
+    return params
+
+def referenced_properties(params: Dict[str, str]) -> Set[str]:
+    """
+    Return the properties a query refers to in $filter, $select and $orderby.
+
+    For paths such as Author/Name only the first segment is returned.
+
+    Args:
+        params: Options as returned by normalize_query
+
+    Returns:
+        Set[str]: The property names
+    """
+    names = set()
+    if params.get("$filter"):
+        tokens = _tokenize(params["$filter"])
+        for index, (kind, text) in enumerate(tokens):
+            calls = index + 1 < len(tokens) and tokens[index + 1][1] == "("
+            if kind == "word" and text not in _KEYWORDS and not calls and _PROPERTY.match(text) and not _GUID.match(text):
+                names.add(text.split("/", 1)[0])
+    for option in ("$select", "$orderby"):
+        for clause in params.get(option, "").split(","):
+            if clause.strip() and clause.strip() != "*":
+                names.add(clause.split()[0].split("/", 1)[0])
+    return names
@@ -0,0 +1,94 @@
+"""
+Size budgets and continuation cursors for the listing tools
+
+A budget caps how much of a collection one tool call returns. When a budget is
+reached the result is cut at an item boundary and carries an opaque cursor; the
+same call with that cursor resumes at the first item that was left out.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Rough characters-per-token ratio used to turn a token budget into a size budget
+CHARS_PER_TOKEN = 4
+
+# Size budget applied when a call sets none; 0 leaves results unbounded
+DEFAULT_MAX_CHARS = int(os.getenv("TOOL_MAX_CHARS", "0"))
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    Limits for one tool call; None means unlimited.
+
+    Args:
+        max_items: Maximum number of items
+        max_chars: Maximum size of the rendered items, in characters
+        max_tokens: Approximate maximum size in LLM tokens
+    """
+    max_items: Optional[int] = None
+    max_chars: Optional[int] = None
+    max_tokens: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("max_items", "max_chars", "max_tokens"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be a positive number")
+
+    @classmethod
+    def from_args(
+        cls,
+        max_items: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> "Budget":
+        """Build a budget from tool arguments, applying TOOL_MAX_CHARS when no limit is given"""
+        if max_items is None and max_chars is None and max_tokens is None and DEFAULT_MAX_CHARS:
+            max_chars = DEFAULT_MAX_CHARS
+        return cls(max_items, max_chars, max_tokens)
+
+    @property
+    def char_limit(self) -> Optional[int]:
+        """The tighter of max_chars and the token budget converted to characters"""
+        limits = [limit for limit in (self.max_chars, self.max_tokens and self.max_tokens * CHARS_PER_TOKEN) if limit]
+        return min(limits) if limits else None
+
+    def __bool__(self) -> bool:
+        return any(limit is not None for limit in (self.max_items, self.max_chars, self.max_tokens))
+
+def _fingerprint(resource: str) -> str:
+    return hashlib.sha1(resource.encode("utf-8")).hexdigest()[:12]
+
+def encode_cursor(resource: str, offset: int) -> str:
+    """
+    Build the cursor resuming a collection at an item offset.
+
+    Args:
+        resource: Identifies the collection, so a cursor cannot be replayed against another tool
+        offset: Index of the first item of the next page
+    """
+    state = json.dumps({"r": _fingerprint(resource), "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(state.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str], resource: str) -> int:
+    """
+    Return the item offset a cursor resumes at; 0 when there is no cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another collection
+    """
+    if not cursor:
+        return 0
+    try:
+        state: Dict[str, Any] = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(state["o"])
+        fingerprint = state["r"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if fingerprint != _fingerprint(resource) or offset < 0:
+        raise ValueError("Cursor was issued for a different collection")
+    return offset
@@ -0,0 +1,194 @@
+"""
+Local validation of new content items before they are posted to Sitefinity
+
+The create_* tools check an item against the cached OData schema (required
+properties, types, lengths and date formats), check that its parent exists and
+that its UrlName is not taken. Parents and UrlNames are looked up in per-tenant
+indexes of the collections, loaded once and kept for
+PREFLIGHT_INDEX_TTL_SECONDS, so a valid item is checked without a round trip.
+Only a failed lookup is confirmed with Sitefinity before the item is rejected,
+because the index may be older than the content.
+
+When $metadata cannot be loaded the item is checked against a few built-in
+rules instead; when an index cannot be loaded that check is left to Sitefinity.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Union
+
+from tahubu_sf.config.settings import ENDPOINTS
+from tahubu_sf.config.tenants import current_tenant
+from tahubu_sf.utils.cache import response_cache
+from tahubu_sf.utils.http import make_streaming_request
+from tahubu_sf.utils.metrics import metrics
+from tahubu_sf.utils.odata_metadata import EntityInfo, PropertyInfo, get_schema, parse_datetime_offset, validate_payload
+
+logger = logging.getLogger(__name__)
+
+# Time a collection index is used before it is loaded again
+PREFLIGHT_INDEX_TTL_SECONDS = float(os.getenv("PREFLIGHT_INDEX_TTL_SECONDS", "300"))
+# Largest collection kept in an index; larger ones are checked with a query per item
+PREFLIGHT_INDEX_MAX_ITEMS = int(os.getenv("PREFLIGHT_INDEX_MAX_ITEMS", "20000"))
+
+# Items read per request while loading an index
+INDEX_PAGE_SIZE = 500
+# Longest UrlName Sitefinity accepts when $metadata does not say
+URL_NAME_MAX_LENGTH = 255
+
+# Rules applied when the content type's schema is not available
+_FALLBACK_PROPERTIES = {
+    prop.name: prop for prop in (
+        PropertyInfo("Title", "Edm.String", nullable=False),
+        PropertyInfo("UrlName", "Edm.String", max_length=URL_NAME_MAX_LENGTH),
+        PropertyInfo("ParentId", "Edm.Guid"),
+        PropertyInfo("PublicationDate", "Edm.DateTimeOffset"),
+        PropertyInfo("EventStart", "Edm.DateTimeOffset"),
+        PropertyInfo("EventEnd", "Edm.DateTimeOffset"),
+    )
+}
+
+class PreflightError(ValueError):
+    """A new item Sitefinity would reject, found before it was sent"""
+
+def odata_datetime(value: Union[datetime, str, None]) -> Optional[str]:
+    """
+    Format a datetime as an OData DateTimeOffset in UTC.
+
+    Naive datetimes are taken to be in UTC. Strings are returned unchanged, to be
+    checked by preflight().
+    """
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+@dataclass
+class _Index:
+    """Ids and UrlNames of a collection; UrlNames map to the ParentIds they are used under"""
+    ids: Set[str] = field(default_factory=set)
+    url_names: Dict[str, Set[Optional[str]]] = field(default_factory=dict)
+    complete: bool = True
+
+    def add(self, item: Dict[str, Any]) -> None:
+        if item.get("Id"):
+            self.ids.add(item["Id"])
+        if item.get("UrlName"):
+            self.url_names.setdefault(item["UrlName"], set()).add(item.get("ParentId"))
+
+def _url(collection: str) -> str:
+    return f"{ENDPOINTS.content}/{collection}"
+
+def _select(entity: EntityInfo) -> str:
+    return ",".join(name for name in ("Id", "UrlName", "ParentId") if name in entity.properties or name == "Id")
+
+async def _index(collection: str, entity: EntityInfo) -> Optional[_Index]:
+    """Return the collection's index, loading it when needed, or None if it cannot be loaded"""
+
+    async def load() -> _Index:
+        index = _Index()
+        params = {"$select": _select(entity), "$orderby": "Id", "$top": INDEX_PAGE_SIZE, "$skip": 0}
+        while params["$skip"] < PREFLIGHT_INDEX_MAX_ITEMS:
+            received = 0
+            async for item in make_streaming_request(_url(collection), params=params):
+                index.add(item)
+                received += 1
+            if received < INDEX_PAGE_SIZE:
+                return index
+            params["$skip"] += INDEX_PAGE_SIZE
+        index.complete = False
+        return index
+
+    try:
+        return await response_cache.get_or_load(
+            current_tenant().name, ("preflight-index", collection), PREFLIGHT_INDEX_TTL_SECONDS, load
+        )
+    except Exception as e:
+        logger.warning(f"Could not index {collection} for pre-flight checks: {e}")
+        return None
+
+async def _query(collection: str, entity: EntityInfo, filter: str) -> List[Dict[str, Any]]:
+    params = {"$select": _select(entity), "$filter": filter, "$top": INDEX_PAGE_SIZE}
+    return [item async for item in make_streaming_request(_url(collection), params=params)]
+
+async def _parent_exists(collection: str, entity: EntityInfo, parent_id: str) -> bool:
+    index = await _index(collection, entity)
+    if index is None or parent_id in index.ids:
+        return True
+    # The parent may have been created after the index was loaded
+    found = await _query(collection, entity, f"Id eq {parent_id}")
+    for item in found:
+        index.add(item)
+    return bool(found)
+
+async def _url_name_taken(collection: str, entity: EntityInfo, url_name: str, parent_id: Optional[str]) -> bool:
+    index = await _index(collection, entity)
+    if index is None:
+        return False
+    if index.complete and parent_id not in index.url_names.get(url_name, ()):
+        return False
+    # The item holding it may have been deleted since the index was loaded
+    literal = url_name.replace("'", "''")
+    items = await _query(collection, entity, f"UrlName eq '{literal}'")
+    parents = {item.get("ParentId") for item in items}
+    if index.complete:
+        index.url_names[url_name] = parents
+    return parent_id in parents
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    try:
+        parsed = parse_datetime_offset(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+    # Times without a zone were reported by the schema check and cannot be compared
+    return parsed if parsed and parsed.tzinfo else None
+
+async def _entity(collection: str) -> EntityInfo:
+    try:
+        schema = await get_schema()
+        if collection in schema.entity_sets:
+            return schema.entity(collection)
+    except Exception as e:
+        logger.warning(f"Could not load the OData schema for pre-flight checks: {e}")
+    return EntityInfo(collection, "", ("Id",), _FALLBACK_PROPERTIES)
+
+async def preflight(collection: str, payload: Dict[str, Any], parent: Optional[str] = None) -> None:
+    """
+    Check a new item before it is posted.
+
+    Args:
+        collection: The collection the item is created in, e.g. "blogposts"
+        payload: The item's properties
+        parent: The collection ParentId must point into, e.g. "blogs"
+
+    Raises:
+        PreflightError: Listing every problem found
+    """
+    entity = await _entity(collection)
+    problems = validate_payload(entity, payload, strict=False)
+    if "UrlName" in payload and payload["UrlName"] == "":
+        problems.append("UrlName must not be empty; the title needs at least one letter or digit")
+    start, end = _parse_datetime(payload.get("EventStart")), _parse_datetime(payload.get("EventEnd"))
+    if start and end and end < start:
+        problems.append("EventEnd must not be before EventStart")
+
+    # Lookups only make sense for otherwise valid items
+    if not problems and parent and payload.get("ParentId"):
+        if not await _parent_exists(parent, await _entity(parent), payload["ParentId"]):
+            problems.append(f"ParentId {payload['ParentId']} is not an item of {parent}")
+    if not problems and payload.get("UrlName"):
+        if await _url_name_taken(collection, entity, payload["UrlName"], payload.get("ParentId")):
+            scope = " under the same parent" if payload.get("ParentId") else ""
+            problems.append(f"UrlName '{payload['UrlName']}' is already used in {collection}{scope}")
+
+    if problems:
+        metrics.counter("preflight.rejected", collection=collection).inc()
+        raise PreflightError(f"Invalid {collection} item: {'; '.join(problems)}")
+
+def remember_created(collection: str, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+    """Add a created item to the collection's index, so its UrlName counts as taken"""
+    index = response_cache.get(current_tenant().name, ("preflight-index", collection))
+    if index is not None:
+        index.add({**payload, **response})
@@ -0,0 +1,203 @@
+"""
+Opt-in sampling profiler for individual tool calls
+
+A profiled call runs while a background thread samples the event loop
+thread's stack every PROFILING_INTERVAL_MS. Samples whose stack passes
+through the profiled call are attributed to it frame by frame. All other
+samples count as time the call spent waiting (on Sitefinity, or while
+other tasks held the loop). Profiles are kept in memory, keyed by request
+id. They use the collapsed-stack format read by flamegraph.pl, speedscope
+and inferno.
+
+Nothing is wrapped or checked unless profiling is configured:
+- PROFILING_TOKEN enables the X-Profile-Token header on /api/run-tool and
+  guards the /admin/profiles endpoints
+- PROFILE_TOOLS lists MCP tools (or "*") whose every call is profiled
+"""
+import functools
+import hmac
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_TOOLS = {name.strip() for name in os.getenv("PROFILE_TOOLS", "").split(",") if name.strip()}
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "1"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+# Directory that also receives every profile as <id>.collapsed (e.g. for the stdio transport)
+PROFILING_DIR = os.getenv("PROFILING_DIR", "")
+
+# Request ids accepted as profile ids; they double as file names in PROFILING_DIR
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Stack recorded for samples taken while the profiled call was not running
+WAITING_FRAME = "[waiting: I/O or other tasks]"
+
+@dataclass
+class Profile:
+    """Stack samples of one tool call"""
+    id: str
+    tool: str
+    started: float
+    interval_ms: float
+    duration_ms: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """The samples in collapsed-stack format: one "frame;frame;frame count" line per stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        """Metadata of the profile, without its samples"""
+        waiting = self.samples.get(WAITING_FRAME, 0)
+        total = sum(self.samples.values())
+        return {
+            "id": self.id,
+            "tool": self.tool,
+            "started": self.started,
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": total,
+            "running_samples": total - waiting,
+            "interval_ms": self.interval_ms,
+        }
+
+def _frame_name(frame) -> str:
+    # co_qualname is new in Python 3.11
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+
+class SamplingProfiler:
+    """
+    Sample one thread's stack on a background thread.
+
+    Only frames called from `root` are recorded, so concurrent calls sharing
+    the event loop do not end up in each other's profiles.
+
+    Args:
+        root: Frame of the coroutine whose work is profiled
+        thread_id: Thread running root (the event loop thread)
+        interval: Seconds between samples
+    """
+
+    def __init__(self, root, thread_id: int, interval: float):
+        self.root = root
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tool-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None and frame is not self.root:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if frame is None:
+                self.samples[WAITING_FRAME] += 1
+            else:
+                stack.append(_frame_name(frame))
+                self.samples[";".join(reversed(stack))] += 1
+
+class ProfileStore:
+    """Most recent profiles, keyed by request id"""
+
+    def __init__(self, max_profiles: int = PROFILING_MAX_PROFILES, directory: str = PROFILING_DIR):
+        self.max_profiles = max_profiles
+        self.directory = directory
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+
+    def add(self, profile: Profile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"{profile.id}.collapsed"), "w", encoding="utf-8") as f:
+                f.write(profile.collapsed())
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self._profiles
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored profiles, newest first"""
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+
+profiles = ProfileStore()
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    """Whether a request presented the configured profiling token"""
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+async def run_profiled(tool: str, call: Callable[[], Awaitable[Any]], request_id: Optional[str] = None) -> Tuple[Any, Profile]:
+    """
+    Await call() under the sampling profiler and store its profile.
+
+    Args:
+        tool: Tool name recorded on the profile
+        call: Starts the tool call
+        request_id: Key of the profile; a random id is used when it is omitted, is not
+            1-64 letters, digits, "-" or "_", or already names a stored profile
+
+    Returns:
+        Tuple[Any, Profile]: The call's result and its profile
+    """
+    valid = request_id is not None and _PROFILE_ID.match(request_id) and request_id not in profiles
+    profile = Profile(
+        id=request_id if valid else secrets.token_hex(8), tool=tool, started=time.time(), interval_ms=PROFILING_INTERVAL_MS
+    )
+    profiler = SamplingProfiler(sys._getframe(), threading.get_ident(), PROFILING_INTERVAL_MS / 1000)
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        return await call(), profile
+    finally:
+        profile.samples = profiler.stop()
+        profile.duration_ms = (time.perf_counter() - started) * 1000
+        profiles.add(profile)
+        logger.info(f"Stored profile {profile.id} of {tool} ({profile.duration_ms:.1f} ms)")
+
+def profiled_tool(func: Callable) -> Callable:
+    """
+    Profile every call of a tool listed in PROFILE_TOOLS.
+
+    Other tools are returned unchanged, so profiling costs nothing when off.
+
+    Args:
+        func: The async tool implementation
+
+    Returns:
+        Callable: The tool, wrapped when it is selected for profiling
+    """
+    if not (PROFILE_TOOLS & {"*", func.__name__}):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        result, _ = await run_profiled(func.__name__, lambda: func(*args, **kwargs))
+        return result
+
+    return wrapper
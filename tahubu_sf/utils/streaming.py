@@ -0,0 +1,145 @@
+"""
+Incremental parsing of OData collection responses
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from tahubu_sf.utils import codec
+
+# A whole string (group 2 is empty if its closing quote has not arrived yet) or a
+# bracket; everything in between is skipped in bulk
+_TOKEN = re.compile(rb'"([^"\\]*(?:\\.[^"\\]*)*)("?)|[{}\[\]]', re.DOTALL)
+_SEPARATORS = re.compile(r"[\s,]*")
+
+class ValueArrayParser:
+    """
+    Extract the items of a response's top-level "value" array as bytes arrive.
+
+    Each item is decoded as soon as it has been received in full and its text is
+    then discarded, so memory stays proportional to one item rather than the whole
+    collection. Items must be JSON objects or arrays, which is what OData entity
+    collections contain; they are decoded with the standard library's C scanner,
+    which can resume at an offset in the buffer.
+    """
+
+    def __init__(self, key: str = "value"):
+        self._key = key.encode("utf-8")
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._last_string: Optional[bytes] = None
+        self._last_string_end = 0
+        # Text of the array received but not yet decoded
+        self._text = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        # Bytes of the enclosing object before and after the array, for metadata()
+        self._head = b""
+        self._tail = bytearray()
+        self.in_array = False
+        self.done = False
+        self.bytes_received = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Add received bytes and return the items they completed.
+
+        Raises:
+            ValueError: If an item is not a JSON object or array
+        """
+        self.bytes_received += len(chunk)
+        if self.done:
+            self._tail += chunk
+            return []
+        if not self.in_array:
+            self._buffer += chunk
+            if not self._find_array():
+                return []
+            chunk, self._buffer = bytes(self._buffer), bytearray()
+        self._text += self._utf8.decode(chunk)
+        return self._decode_items()
+
+    def _find_array(self) -> bool:
+        """Scan the response prefix for the opening bracket of the array"""
+        buffer = self._buffer
+        while True:
+            match = _TOKEN.search(buffer, self._pos)
+            if match is None:
+                self._pos = len(buffer)
+                return False
+            pos = match.start()
+            if buffer[pos] == 0x22:  # '"'
+                if not match.group(2):
+                    # Wait for the rest of the string
+                    self._pos = pos
+                    return False
+                if self._depth == 1:
+                    self._last_string = match.group(1)
+                    self._last_string_end = match.end()
+                self._pos = match.end()
+            elif buffer[pos] in (0x7B, 0x5B):  # '{' '['
+                if (
+                    buffer[pos] == 0x5B and self._depth == 1
+                    and self._last_string == self._key
+                    and buffer[self._last_string_end:pos].strip() == b":"
+                ):
+                    self.in_array = True
+                    self._head = bytes(buffer[:pos])
+                    del buffer[:pos + 1]
+                    return True
+                self._depth += 1
+                self._pos = pos + 1
+            else:
+                self._depth -= 1
+                self._pos = pos + 1
+
+    def _decode_items(self) -> List[Any]:
+        items = []
+        text = self._text
+        pos = 0
+        while True:
+            pos = _SEPARATORS.match(text, pos).end()
+            if pos == len(text):
+                break
+            if text[pos] == "]":
+                self.done = True
+                self._tail += text[pos + 1:].encode("utf-8")
+                pos = len(text)
+                break
+            if text[pos] not in "{[":
+                raise ValueError(f'Expected an object in the "{self._key.decode()}" array, got {text[pos:pos + 20]!r}')
+            try:
+                item, pos = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                # The item has not been received in full yet
+                break
+            items.append(item)
+        self._text = text[pos:]
+        return items
+
+    def close(self) -> None:
+        """
+        Check that the whole array was received.
+
+        Raises:
+            ValueError: If the body ended before the array was complete or an item is invalid
+        """
+        if self.done:
+            return
+        if self._text.strip():
+            try:
+                self._decoder.raw_decode(self._text.lstrip())
+            except json.JSONDecodeError as e:
+                raise ValueError(f'Invalid or truncated item in the "{self._key.decode()}" array: {e}') from e
+        raise ValueError(f'Response ended before the "{self._key.decode()}" array was complete')
+
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Return the members of the response object other than the array,
+        such as @odata.count or @odata.nextLink. Only valid after close().
+        """
+        document = codec.loads(self._head + b"null" + bytes(self._tail))
+        document.pop(self._key.decode(), None)
+        return document
@@ -0,0 +1,252 @@
+"""
+Lightweight span tracing for tool calls and Sitefinity HTTP requests
+"""
+import functools
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+@dataclass
+class Span:
+    """A single timed operation within a trace"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Duration of the span in milliseconds, or None while it is still open"""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span"""
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """Render the W3C trace-context header value for this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span for exporters"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+class SpanExporter(ABC):
+    """Base class for span exporters. Subclasses receive every finished span."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Handle one finished span"""
+
+    def shutdown(self) -> None:
+        """Flush and release any resources held by the exporter"""
+
+class ConsoleSpanExporter(SpanExporter):
+    """
+    Write finished spans as JSON lines to stderr.
+
+    stdout is reserved for the MCP STDIO transport, so spans never go there.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def export(self, span: Span) -> None:
+        self.stream.write(json.dumps(span.to_dict(), default=str) + "\n")
+        self.stream.flush()
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans as JSON lines to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+class InMemorySpanExporter(SpanExporter):
+    """Keep finished spans in a list, mainly for tests and debugging"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("tahubu_sf_current_span", default=None)
+_exporter: Optional[SpanExporter] = None
+
+def _exporter_from_env() -> Optional[SpanExporter]:
+    """Build the exporter selected by the TRACING_EXPORTER environment variable"""
+    kind = os.getenv("TRACING_EXPORTER", "none").lower()
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        return FileSpanExporter(os.getenv("TRACING_FILE", "traces.jsonl"))
+    if kind not in ("", "none"):
+        logger.warning(f"Unsupported tracing exporter: {kind}")
+    return None
+
+def configure_tracing(exporter: Optional[SpanExporter]) -> None:
+    """
+    Install the exporter that receives finished spans.
+
+    Args:
+        exporter: The exporter to use, or None to disable tracing
+    """
+    global _exporter
+    if _exporter is not None and _exporter is not exporter:
+        _exporter.shutdown()
+    _exporter = exporter
+
+def tracing_enabled() -> bool:
+    """Whether an exporter is installed"""
+    return _exporter is not None
+
+def current_span() -> Optional[Span]:
+    """Return the active span for the current task, if any"""
+    return _current_span.get()
+
+def parse_traceparent(value: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Parse a W3C traceparent header.
+
+    Returns:
+        Optional[Dict[str, str]]: trace_id and span_id, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return {"trace_id": parts[1].lower(), "span_id": parts[2].lower()}
+
+@contextmanager
+def start_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open a span as a child of the current span.
+
+    When tracing is disabled this yields None and costs a single check.
+
+    Args:
+        name: The span name
+        traceparent: Optional incoming W3C traceparent used when there is no active span
+        **attributes: Attributes attached to the span
+    """
+    if _exporter is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        remote = parse_traceparent(traceparent)
+        if remote:
+            trace_id, parent_id = remote["trace_id"], remote["span_id"]
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+
+    span = Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        start_time=time.time(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end_time = time.time()
+        _current_span.reset(token)
+        exporter = _exporter
+        if exporter is not None:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Failed to export span {span.name}: {e}")
+
+def inject_trace_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add the W3C traceparent header for the current span to outgoing headers.
+
+    Args:
+        headers: The headers to update in place
+
+    Returns:
+        Dict[str, str]: The same headers dictionary
+    """
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.traceparent()
+    return headers
+
+def traced_tool(func: Callable, transport: str = "mcp") -> Callable:
+    """
+    Wrap an async tool function in a span, keeping its signature for tool registration.
+
+    Args:
+        func: The async tool implementation
+        transport: Label recorded on the span
+
+    Returns:
+        Callable: The wrapped tool
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with start_span(f"tool.{func.__name__}", tool=func.__name__, transport=transport):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+configure_tracing(_exporter_from_env())
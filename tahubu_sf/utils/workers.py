@@ -0,0 +1,68 @@
+"""
+Worker pool for CPU-bound post-processing
+
+Rendering large collections and extracting text from long HTML run on the
+event loop thread and delay every concurrent request. offload() runs such
+work in a thread or process pool once its input is large enough to be worth
+the hand-off, and inline otherwise.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from tahubu_sf.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# "thread" keeps the loop responsive between GIL switches; "process" also runs in
+# parallel but pickles arguments and results; "none" always runs inline
+WORKER_POOL_KIND = os.getenv("WORKER_POOL_KIND", "thread").lower()
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+# Inputs at least this large are processed in the pool; sizes are measured in
+# characters of HTML for text extraction and in items for rendering
+OFFLOAD_MIN_CHARS = int(os.getenv("OFFLOAD_MIN_CHARS", "65536"))
+OFFLOAD_MIN_ITEMS = int(os.getenv("OFFLOAD_MIN_ITEMS", "500"))
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Optional[Executor]:
+    """Return the shared pool, creating it on first use, or None when offloading is off"""
+    global _executor
+    if _executor is None and WORKER_POOL_KIND != "none" and WORKER_POOL_SIZE > 0:
+        if WORKER_POOL_KIND == "process":
+            _executor = ProcessPoolExecutor(max_workers=WORKER_POOL_SIZE)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix="tahubu-worker")
+        logger.info(f"Started {WORKER_POOL_KIND} worker pool with {WORKER_POOL_SIZE} workers")
+    return _executor
+
+def shutdown_workers() -> None:
+    """Stop the shared pool; it is recreated on the next offload"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def offload(func: Callable[..., Any], *args: Any, size: int, threshold: int) -> Any:
+    """
+    Run func(*args) in the worker pool when size reaches threshold, inline otherwise.
+
+    With a process pool, func must be a module-level function and its arguments
+    and result must be picklable.
+
+    Args:
+        func: The CPU-bound function
+        *args: Its arguments
+        size: Size of the input, in the unit of threshold
+        threshold: Smallest size worth running in the pool
+
+    Returns:
+        Any: The result of func
+    """
+    executor = get_executor() if size >= threshold else None
+    if executor is None:
+        return func(*args)
+    metrics.counter("workers.offloaded", function=func.__name__).inc()
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)